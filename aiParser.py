@@ -3,6 +3,69 @@ import json
 import re
 import os
 import requests
+from metrics import PARSER_UPSTREAM_DURATION, PARSER_FALLBACK
+from amountNormalizer import normalize_amounts
+
+# 金額格式：數字加上可選的貨幣單位
+AMOUNT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(?:元|塊|圓|dollars?|NT\$?)?')
+
+# 多筆交易之間的分隔詞
+SEGMENT_PREFIX_PATTERN = re.compile(r'^(?:[\s,，、。;；]|還有|然後|以及|另外)+')
+
+# 數量詞：後面接著量詞的數字是數量而不是金額，例如「買了 1 個 蘋果 30」
+QUANTITY_PATTERN = re.compile(r'\s*[個个杯份張张件碗盒包瓶罐本支隻只條条雙双顆颗片台斤]')
+
+# 一次解析多筆交易的提示詞
+MULTI_TRANSACTION_PROMPT = """
+            請解析以下交易文本，文本可能包含多筆交易，並以 JSON 陣列格式返回結果。
+            文本: "{text}"
+            
+            請返回以下格式的 JSON 陣列，每筆交易一個物件，順序與文本相同:
+            [
+                {{
+                    "type": "expense" 或 "income" (支出或收入),
+                    "item": "項目名稱",
+                    "category": "類別",
+                    "amount": 金額 (數字)
+                }}
+            ]
+            
+            規則:
+            1. 如果交易包含「收入」、「薪水」、「薪資」、「工資」、「獎金」、「紅包」等關鍵詞，則 type 為 "income"，否則為 "expense"
+            2. 每筆交易的項目名稱應該是該筆金額前的文字
+            3. 類別應根據項目名稱猜測，例如「咖啡」屬於 "food"，「房租」屬於 "housing" 等
+            4. 金額應該是文本中的數字
+            
+            只返回 JSON 陣列，不要有其他文字。
+            """
+
+def split_utterance(text):
+    """
+    將一段語音文本切分為多筆交易的文本
+    以金額作為每筆交易的結尾，一次線性掃描完成，例如「早餐 60 午餐 120 捷運 30」切分為三段；
+    後面接著量詞的數字是數量，不會結束一筆交易，例如「買了 1 個 蘋果 30」是一筆
+
+    Args:
+        text (str): 語音識別文本
+
+    Returns:
+        list: 每筆交易的文本，口語金額已轉為阿拉伯數字
+    """
+    text = normalize_amounts(text)
+    segments = []
+    start = 0
+    for match in AMOUNT_PATTERN.finditer(text):
+        if QUANTITY_PATTERN.match(text, match.end()):
+            continue
+        segment = SEGMENT_PREFIX_PATTERN.sub('', text[start:match.end()]).strip()
+        if segment:
+            segments.append(segment)
+        start = match.end()
+    # 最後一個金額之後還有文字時作為獨立的一筆
+    rest = SEGMENT_PREFIX_PATTERN.sub('', text[start:]).strip()
+    if rest or not segments:
+        segments.append(rest or text.strip())
+    return segments
 
 class AIParser(ABC):
     """
@@ -22,26 +85,122 @@ class AIParser(ABC):
             dict: 解析後的交易數據，包含 type, item, category, amount
         """
         pass
+    
+    def parse_transactions(self, text):
+        """
+        解析可能包含多筆交易的文本
+        
+        預設實現將文本切分後逐段解析，子類可以在一次呼叫中解析全部交易
+        
+        Args:
+            text (str): 語音識別文本，例如「早餐 60 午餐 120」
+            
+        Returns:
+            list: 解析後的交易數據列表，順序與文本相同
+        """
+        return [self.parse_transaction(segment) for segment in split_utterance(text)]
+    
+    def _parse_transactions_by_chat(self, text, provider, model):
+        """
+        使用相容 OpenAI Chat Completions 格式的 API 一次解析多筆交易
+        
+        子類需要提供 api_key、api_url、session 和 _fallback_parse；API 調用失敗時逐段使用備用方法解析
+        
+        Args:
+            text (str): 語音識別文本，例如「早餐 60 午餐 120」
+            provider (str): 指標中的提供者名稱
+            model (str): 使用的模型名稱
+            
+        Returns:
+            list: 解析後的交易數據列表
+        """
+        try:
+            # 構建 API 請求
+            headers = {
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {self.api_key}"
+            }
+            
+            data = {
+                "model": model,
+                "messages": [{"role": "user", "content": MULTI_TRANSACTION_PROMPT.format(text=text)}],
+                "temperature": 0.3
+            }
+            
+            # 發送請求
+            with PARSER_UPSTREAM_DURATION.labels(provider=provider).time():
+                response = self.session.post(self.api_url, headers=headers, json=data)
+                response.raise_for_status()
+            
+            # 解析回應
+            result = response.json()
+            content = result["choices"][0]["message"]["content"]
+            
+            # 提取 JSON 部分，只有一筆交易時模型可能返回單一物件
+            json_match = re.search(r'(\[.*\]|{.*})', content, re.DOTALL)
+            transactions = json.loads(json_match.group(1) if json_match else content)
+            if isinstance(transactions, dict):
+                transactions = [transactions]
+            
+            # 確保數據格式正確
+            for transaction_data in transactions:
+                transaction_data["amount"] = float(transaction_data["amount"])
+            
+            return transactions
+            
+        except Exception as e:
+            print(f"{provider} 解析錯誤: {str(e)}")
+            PARSER_FALLBACK.labels(provider=provider).inc()
+            # 如果 API 調用失敗，使用備用方法逐段解析
+            return [self._fallback_parse(segment) for segment in split_utterance(text)]
+    
+    def warm_up(self):
+        """
+        預先建立解析器需要的資源，例如連線，讓切換後的第一個請求不需要承擔建立時間
+        預設不做任何事
+        """
+        pass
+    
+    def close(self):
+        """
+        釋放解析器使用的資源，例如工作行程或連線
+        預設不做任何事
+        """
+        pass
 
 class OpenAIParser(AIParser):
     """
     使用 OpenAI API 解析交易文本
     """
     
-    def __init__(self, api_key=None, model="gpt-3.5-turbo"):
+    def __init__(self, api_key=None, model="gpt-3.5-turbo", api_url=None):
         """
         初始化 OpenAI 解析器
         
         Args:
             api_key (str): OpenAI API 密鑰，如果為 None，則從環境變量獲取
             model (str): 使用的模型名稱
+            api_url (str): OpenAI API URL，如果為 None，則使用預設值
         """
         self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OpenAI API 密鑰未提供，請設置 OPENAI_API_KEY 環境變量或在初始化時提供")
         
         self.model = model
-        self.api_url = "https://api.openai.com/v1/chat/completions"
+        self.api_url = api_url or "https://api.openai.com/v1/chat/completions"
+        # 重用連線，避免每個請求重新建立 TCP 和 TLS 連線
+        self.session = requests.Session()
+    
+    def warm_up(self):
+        """預先建立到 API 的連線（TCP 和 TLS），之後的請求重用連線池中的連線"""
+        try:
+            self.session.head(self.api_url, timeout=5)
+        except Exception as e:
+            print(f"OpenAI 連線預熱錯誤: {str(e)}")
+    
+    def close(self):
+        """關閉連線池"""
+        self.session.close()
     
     def parse_transaction(self, text):
         """
@@ -89,8 +248,9 @@ class OpenAIParser(AIParser):
             }
             
             # 發送請求
-            response = requests.post(self.api_url, headers=headers, json=data)
-            response.raise_for_status()
+            with PARSER_UPSTREAM_DURATION.labels(provider="openai").time():
+                response = self.session.post(self.api_url, headers=headers, json=data)
+                response.raise_for_status()
             
             # 解析回應
             result = response.json()
@@ -110,9 +270,22 @@ class OpenAIParser(AIParser):
             
         except Exception as e:
             print(f"OpenAI 解析錯誤: {str(e)}")
+            PARSER_FALLBACK.labels(provider="openai").inc()
             # 如果 API 調用失敗，使用備用方法解析
             return self._fallback_parse(text)
     
+    def parse_transactions(self, text):
+        """
+        使用 OpenAI API 解析可能包含多筆交易的文本，一次請求返回全部交易
+        
+        Args:
+            text (str): 語音識別文本，例如「早餐 60 午餐 120」
+            
+        Returns:
+            list: 解析後的交易數據列表
+        """
+        return self._parse_transactions_by_chat(text, "openai", self.model)
+    
     def _fallback_parse(self, text):
         """
         備用解析方法，當 API 調用失敗時使用
@@ -123,6 +296,9 @@ class OpenAIParser(AIParser):
         Returns:
             dict: 解析後的交易數據
         """
+        # 將口語金額轉為阿拉伯數字
+        text = normalize_amounts(text)
+        
         # 預設為支出
         transaction_type = "expense"
         
@@ -215,6 +391,19 @@ class XAIGrokParser(AIParser):
             raise ValueError("XAI Grok API 密鑰未提供，請設置 XAI_GROK_API_KEY 環境變量或在初始化時提供")
         
         self.api_url = api_url or "https://api.groq.com/openai/v1/chat/completions"
+        # 重用連線，避免每個請求重新建立 TCP 和 TLS 連線
+        self.session = requests.Session()
+    
+    def warm_up(self):
+        """預先建立到 API 的連線（TCP 和 TLS），之後的請求重用連線池中的連線"""
+        try:
+            self.session.head(self.api_url, timeout=5)
+        except Exception as e:
+            print(f"XAI Grok 連線預熱錯誤: {str(e)}")
+    
+    def close(self):
+        """關閉連線池"""
+        self.session.close()
     
     def parse_transaction(self, text):
         """
@@ -262,8 +451,9 @@ class XAIGrokParser(AIParser):
             }
             
             # 發送請求
-            response = requests.post(self.api_url, headers=headers, json=data)
-            response.raise_for_status()
+            with PARSER_UPSTREAM_DURATION.labels(provider="xai_grok").time():
+                response = self.session.post(self.api_url, headers=headers, json=data)
+                response.raise_for_status()
             
             # 解析回應
             result = response.json()
@@ -283,9 +473,22 @@ class XAIGrokParser(AIParser):
             
         except Exception as e:
             print(f"XAI Grok 解析錯誤: {str(e)}")
+            PARSER_FALLBACK.labels(provider="xai_grok").inc()
             # 如果 API 調用失敗，使用備用方法解析
             return self._fallback_parse(text)
     
+    def parse_transactions(self, text):
+        """
+        使用 XAI Grok API 解析可能包含多筆交易的文本，一次請求返回全部交易
+        
+        Args:
+            text (str): 語音識別文本，例如「早餐 60 午餐 120」
+            
+        Returns:
+            list: 解析後的交易數據列表
+        """
+        return self._parse_transactions_by_chat(text, "xai_grok", "mixtral-8x7b-32768")
+    
     def _fallback_parse(self, text):
         """
         備用解析方法，當 API 調用失敗時使用
@@ -296,6 +499,9 @@ class XAIGrokParser(AIParser):
         Returns:
             dict: 解析後的交易數據
         """
+        # 將口語金額轉為阿拉伯數字
+        text = normalize_amounts(text)
+        
         # 預設為支出
         transaction_type = "expense"
         
@@ -376,6 +582,16 @@ class LocalRuleParser(AIParser):
     不需要 API 調用，作為備用方案
     """
     
+    def __init__(self, classifier=None):
+        """
+        初始化本地規則解析器
+        
+        Args:
+            classifier (NaiveBayesCategoryClassifier): 從歷史交易訓練的類別分類器，
+                提供時優先使用，信心不足時才使用關鍵詞規則
+        """
+        self.classifier = classifier
+    
     def parse_transaction(self, text):
         """
         使用本地規則解析交易文本
@@ -386,6 +602,9 @@ class LocalRuleParser(AIParser):
         Returns:
             dict: 解析後的交易數據
         """
+        # 將口語金額轉為阿拉伯數字
+        text = normalize_amounts(text)
+        
         # 預設為支出
         transaction_type = "expense"
         
@@ -433,6 +652,12 @@ class LocalRuleParser(AIParser):
         if transaction_type == "income":
             return "income"
         
+        # 優先使用學習到的分類器
+        if self.classifier is not None:
+            prediction = self.classifier.predict(item)
+            if prediction is not None:
+                return prediction[0]
+        
         # 食物類別關鍵詞
         food_keywords = ["咖啡", "飯", "餐", "食", "麵", "早餐", "午餐", "晚餐", "宵夜", "飲料", "水果"]
         for keyword in food_keywords:
@@ -477,4 +702,4 @@ def create_parser(parser_type="local", **kwargs):
     elif parser_type == "xai_grok":
         return XAIGrokParser(**kwargs)
     else:  # 預設使用本地規則
-        return LocalRuleParser() 
\ No newline at end of file
+        return LocalRuleParser(classifier=kwargs.get("classifier")) 
\ No newline at end of file
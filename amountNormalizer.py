@@ -0,0 +1,148 @@
+import re
+
+# 中文數字
+CHINESE_DIGITS = {
+    '零': 0, '〇': 0, '一': 1, '二': 2, '兩': 2, '两': 2, '三': 3, '四': 4,
+    '五': 5, '六': 6, '七': 7, '八': 8, '九': 9,
+}
+
+# 小單位和大單位
+SMALL_UNITS = {'十': 10, '百': 100, '千': 1000}
+LARGE_UNITS = {'萬': 10000, '万': 10000, '億': 100000000, '亿': 100000000}
+
+# 全形數字和小數點轉為半形
+_FULLWIDTH = str.maketrans('０１２３４５６７８９．', '0123456789.')
+
+_DIGIT_CHARS = ''.join(CHINESE_DIGITS)
+_NUMERAL_CHARS = _DIGIT_CHARS + ''.join(SMALL_UNITS) + ''.join(LARGE_UNITS)
+
+# 可以接在小數後面的單位，例如「一點五萬」「三點二千」
+_FRACTION_UNITS = {'百': 100, '千': 1000, **LARGE_UNITS}
+_FRACTION_UNIT_CHARS = ''.join(_FRACTION_UNITS)
+
+# 口語金額：數字部分至少包含一個中文數字或單位，以數字或「十」開頭（單獨的「萬」「千」「百」不是金額），
+# 可以有「點」小數、貨幣單位以及「塊五」「五毛」之類的角數；數字在第一個非數字字元結束，
+# 語音識別常見的「早餐六十午餐一百二十」不需要空白也能切開
+_AMOUNT_PATTERN = re.compile(
+    rf'(?P<number>(?=[0-9.]*[{_NUMERAL_CHARS}])[0-9{_DIGIT_CHARS}十][0-9.{_NUMERAL_CHARS}]*'
+    rf'(?:[點点][0-9{_DIGIT_CHARS}]+[{_FRACTION_UNIT_CHARS}]?)?)'
+    rf'(?:\s*(?P<unit>[元塊块圓圆])(?P<dime>[0-9{_DIGIT_CHARS}])?[毛角]?|(?P<dime_only>[毛角]))?'
+)
+
+# 金額後的分隔字元
+_BOUNDARY_CHARS = ',，。、;；!！?？'
+
+# 千分位逗號
+_THOUSANDS_PATTERN = re.compile(r'(?<=\d),(?=\d{3}(?!\d))')
+
+# 將數字部分切成阿拉伯數字、中文數字和單位
+_TOKEN_PATTERN = re.compile(rf'\d+(?:\.\d+)?|[{_NUMERAL_CHARS}]')
+
+def parse_chinese_number(text):
+    """
+    將中文數字轉為數值，可以混用阿拉伯數字
+
+    支援「一百五十」「兩千三」（兩千三百）「一萬五」「3萬」「1.5萬」「一百零五」「三點五」「一點五萬」等寫法
+
+    Args:
+        text (str): 數字文字
+
+    Returns:
+        float: 數值，無法解析時返回 None
+    """
+    text = text.translate(_FULLWIDTH)
+    for separator in ('點', '点'):
+        if separator in text:
+            integer, fraction = text.split(separator, 1)
+            # 小數後的單位作用於整個數字，例如「一點五萬」是 1.5 萬
+            unit = _FRACTION_UNITS.get(fraction[-1:], 1)
+            if unit != 1:
+                fraction = fraction[:-1]
+            whole = parse_chinese_number(integer) if integer else 0
+            digits = ''.join(str(CHINESE_DIGITS[c]) if c in CHINESE_DIGITS else c for c in fraction)
+            if whole is None or not digits.isdigit():
+                return None
+            return (whole + float('0.' + digits)) * unit
+
+    tokens = _TOKEN_PATTERN.findall(text)
+    if not tokens or ''.join(tokens) != text:
+        return None
+
+    total = 0        # 萬、億以上的部分
+    section = 0      # 目前萬以下的部分
+    number = None    # 尚未乘上單位的數字
+    last_unit = None # 最近一個單位，用來判斷「兩千三」這種省略單位的寫法
+    zero_seen = False
+    for token in tokens:
+        if token in SMALL_UNITS:
+            unit = SMALL_UNITS[token]
+            section += (number if number is not None else 1) * unit
+            number, last_unit, zero_seen = None, unit, False
+        elif token in LARGE_UNITS:
+            unit = LARGE_UNITS[token]
+            value = section + (number or 0)
+            if unit > 10000:
+                total = (total + value) * unit
+            else:
+                total += (value or 1) * unit
+            section, number, last_unit, zero_seen = 0, None, unit, False
+        else:
+            digit = CHINESE_DIGITS.get(token)
+            if digit is None:
+                digit = float(token)
+            if digit == 0 and token in CHINESE_DIGITS:
+                zero_seen = True
+            # 連續的中文數字依位數組合，例如「二零二五」
+            number = digit if number is None else number * 10 + digit
+
+    if number is not None:
+        if last_unit is not None and not zero_seen and number < 10:
+            # 「兩千三」「一萬五」：省略了下一級單位
+            number *= last_unit / 10
+        section += number
+    return float(total + section)
+
+def _is_standalone(match):
+    """
+    判斷沒有貨幣單位的單一數字字元是否為金額
+
+    「三明治」「一月房租」「十全大補湯」之類的項目名稱以單一數字字元開頭且後面緊接其他文字，
+    只有後面是空白、標點或文本結尾時才當作金額
+    """
+    if match.group('unit') or match.group('dime_only') or len(match.group('number')) > 1:
+        return True
+    end = match.end()
+    return end == len(match.string) or match.string[end].isspace() or match.string[end] in _BOUNDARY_CHARS
+
+def _replace(match):
+    """將一個口語金額替換為阿拉伯數字"""
+    if not _is_standalone(match):
+        return match.group(0)
+    value = parse_chinese_number(match.group('number'))
+    if value is None:
+        return match.group(0)
+    dime = match.group('dime')
+    if dime is not None:
+        # 「三塊五」：單位後的數字是角
+        value += (CHINESE_DIGITS[dime] if dime in CHINESE_DIGITS else int(dime)) / 10
+    elif match.group('dime_only') is not None:
+        # 「五毛」
+        value /= 10
+    text = str(int(value)) if float(value).is_integer() else str(round(value, 2))
+    return f"{text} 元" if match.group('unit') or match.group('dime_only') else text
+
+def normalize_amounts(text):
+    """
+    將文本中的口語金額轉為阿拉伯數字，一次掃描完成
+
+    全形數字轉為半形、移除千分位逗號，中文數字和萬千百單位轉為數值，
+    例如「午餐一百五十元」→「午餐150 元」、「紅包 兩千三」→「紅包 2300」、「車費三塊五」→「車費3.5 元」
+
+    Args:
+        text (str): 語音識別文本
+
+    Returns:
+        str: 正規化後的文本
+    """
+    text = _THOUSANDS_PATTERN.sub('', text.translate(_FULLWIDTH))
+    return _AMOUNT_PATTERN.sub(_replace, text)
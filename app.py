@@ -1,120 +1,446 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Blueprint, Response, current_app, g, request, jsonify, make_response, render_template, send_from_directory
 import re
-import json
+import datetime
+import secrets
 import os
-from localJsonStorage import LocalJsonStorage
+import time
+import functools
+import threading
+from dataStorage import create_storage, IDEMPOTENCY_KEY
 from aiParser import create_parser
-
-app = Flask(__name__)
-data_storage = LocalJsonStorage()
+from categoryClassifier import load_classifier
+from lazyLoader import LazyInstance
+from searchIndex import NgramSearchIndex
+from itemMemo import ItemMemo, MemoizedParser
+from parserPool import ParserPool
+from speculativeParser import SpeculativeParseCache
+from parseSession import ParseSessionStore
+from ledgerExport import EXPORT_FORMATS, export_chunks
+from recurringScheduler import RecurringScheduler, FREQUENCIES, new_rule
+from configService import ConfigService, load_config, save_config
+import metrics
+import tracing
 
 # 配置檔案路徑
 CONFIG_FILE = 'config.json'
 
-# 讀取配置檔案
-def load_config():
+# 可以在設定頁面選擇的解析器類型
+PARSER_TYPES = ("local", "openai", "xai_grok")
+
+# 影響解析器建立的配置鍵
+PARSER_CONFIG_KEYS = ("parser_type", "openai_api_key", "xai_grok_api_key", "openai_model",
+                      "category_model_path", "item_memo", "parser_pool_workers")
+
+# 替換後等待多少秒才關閉舊的解析器，讓已經取得舊解析器的請求完成
+PARSER_RETIRE_DELAY = 60
+
+def build_parser(config):
+    """
+    根據配置創建解析器
+    優先使用環境變量，其次使用配置檔案
+    
+    Args:
+        config (ConfigSnapshot): 配置快照，也可以是一般的配置字典
+        
+    Returns:
+        AIParser: 解析器實例
+    """
+    parser_type = os.environ.get("AI_PARSER_TYPE", config.get("parser_type", "local"))
+    pool_workers = int(config.get("parser_pool_workers") or 0)
+    
+    # 準備解析器參數
+    parser_kwargs = {}
+    if parser_type == "openai":
+        api_key = os.environ.get("OPENAI_API_KEY", config.get("openai_api_key"))
+        model = os.environ.get("OPENAI_MODEL", config.get("openai_model", "gpt-3.5-turbo"))
+        if api_key:
+            parser_kwargs["api_key"] = api_key
+            parser_kwargs["model"] = model
+    elif parser_type == "xai_grok":
+        api_key = os.environ.get("XAI_GROK_API_KEY", config.get("xai_grok_api_key"))
+        if api_key:
+            parser_kwargs["api_key"] = api_key
+    elif not pool_workers:
+        # 本地解析器使用離線訓練的類別模型，只在建立解析器時載入一次
+        parser_kwargs["classifier"] = load_classifier(config.get("category_model_path"))
+    
+    try:
+        # 嘗試創建指定類型的解析器
+        if parser_type not in ("openai", "xai_grok") and pool_workers > 0:
+            # 本地解析在工作行程中執行，類別模型由各工作行程自行載入
+            parser = ParserPool(pool_workers, "local", classifier_path=config.get("category_model_path"))
+        else:
+            parser = create_parser(parser_type, **parser_kwargs)
+    except Exception as e:
+        print(f"無法創建 {parser_type} 解析器: {str(e)}，使用本地規則解析器作為備用")
+        parser = create_parser("local", classifier=load_classifier(config.get("category_model_path")))
+    
+    # 已知項目先查詢歷史記錄，不需要經過解析器
+    if config.get("item_memo", True):
+        parser = MemoizedParser(parser, item_memo)
+    return parser
+
+def parser_env_overrides(settings):
+    """
+    獲取會覆蓋解析器設定的環境變量，build_parser 優先使用環境變量
+    
+    Args:
+        settings (dict): 設定頁面送出的解析器設定，包含 type，可以包含 model
+        
+    Returns:
+        list: 已設定且會覆蓋這些設定的環境變量名稱
+    """
+    names = ["AI_PARSER_TYPE"]
+    if settings["type"] == "openai":
+        names.append("OPENAI_API_KEY")
+        if settings.get("model"):
+            names.append("OPENAI_MODEL")
+    elif settings["type"] == "xai_grok":
+        names.append("XAI_GROK_API_KEY")
+    return [name for name in names if name in os.environ]
+
+def build_storage(config):
+    """
+    根據配置創建存儲
+    
+    Args:
+        config (ConfigSnapshot): 配置快照，也可以是一般的配置字典
+        
+    Returns:
+        DataStorage: 存儲實例
+    """
+    storage_type = os.environ.get("FINTRACK_STORAGE_TYPE", config.get("storage_type", "json"))
+    return create_storage(storage_type, config.get("storage_path"))
+
+# 配置服務在背景監看配置檔案，請求路徑只讀取快取的快照
+config_service = ConfigService(CONFIG_FILE)
+
+# 解析器和存儲在第一次使用時才建立，避免匯入模組時讀取檔案
+transaction_parser = LazyInstance(lambda: build_parser(config_service.get()))
+data_storage = LazyInstance(lambda: build_storage(config_service.get()))
+
+def build_search_index():
+    """
+    建立交易項目的搜尋索引
+    以存儲中現有的交易建立索引，之後每次保存交易時增量更新
+    
+    Returns:
+        NgramSearchIndex: 搜尋索引
+    """
+    index = NgramSearchIndex()
+    data_storage.add_save_listener(index.add_transactions, replay=True)
+    return index
+
+# 搜尋索引在第一次搜尋時才建立
+search_index = LazyInstance(build_search_index)
+
+def build_item_memo():
     """
-    讀取配置檔案
+    建立項目查詢表
+    以存儲中現有的交易建立，之後每次保存交易時增量更新
     
     Returns:
-        dict: 配置數據
-    """
-    default_config = {
-        "parser_type": "local",
-        "openai_api_key": None,
-        "xai_grok_api_key": None,
-        "openai_model": "gpt-3.5-turbo"
-    }
-    
-    try:
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                # 合併預設配置和讀取的配置
-                for key, value in default_config.items():
-                    if key not in config:
-                        config[key] = value
-                return config
-    except Exception as e:
-        print(f"讀取配置檔案錯誤: {str(e)}")
-    
-    return default_config
-
-# 載入配置
-config = load_config()
-
-# 創建解析器
-# 優先使用環境變量，其次使用配置檔案
-parser_type = os.environ.get("AI_PARSER_TYPE", config.get("parser_type", "local"))
-
-# 準備解析器參數
-parser_kwargs = {}
-if parser_type == "openai":
-    api_key = os.environ.get("OPENAI_API_KEY", config.get("openai_api_key"))
-    model = os.environ.get("OPENAI_MODEL", config.get("openai_model", "gpt-3.5-turbo"))
-    if api_key:
-        parser_kwargs["api_key"] = api_key
-        parser_kwargs["model"] = model
-elif parser_type == "xai_grok":
-    api_key = os.environ.get("XAI_GROK_API_KEY", config.get("xai_grok_api_key"))
-    if api_key:
-        parser_kwargs["api_key"] = api_key
-
-try:
-    # 嘗試創建指定類型的解析器
-    transaction_parser = create_parser(parser_type, **parser_kwargs)
-except Exception as e:
-    print(f"無法創建 {parser_type} 解析器: {str(e)}，使用本地規則解析器作為備用")
-    transaction_parser = create_parser("local")
-
-@app.route('/')
+        ItemMemo: 項目查詢表
+    """
+    memo = ItemMemo()
+    data_storage.add_save_listener(memo.add_transactions, replay=True)
+    return memo
+
+# 項目查詢表在第一次解析時才建立
+item_memo = LazyInstance(build_item_memo)
+
+# 語音識別中間結果的推測解析，最終結果相同時重用
+speculative_parses = SpeculativeParseCache(lambda text: transaction_parser.parse_transactions(text))
+
+# 等待使用者確認的解析結果
+parse_sessions = ParseSessionStore()
+
+# 定期交易在背景執行緒中保存，第一個請求時啟動
+recurring_scheduler = RecurringScheduler(data_storage)
+
+def on_config_change(old, new):
+    """
+    配置變更時的處理
+    解析器相關的配置變更時，先建立並預熱新的解析器再原子地替換，
+    替換前的請求仍由舊的解析器處理；舊的解析器在 PARSER_RETIRE_DELAY 秒後才關閉，進行中的解析不受影響
+    
+    Args:
+        old (ConfigSnapshot): 舊的配置快照
+        new (ConfigSnapshot): 新的配置快照
+    """
+    if not transaction_parser.initialized:
+        return
+    if all(old.get(key) == new.get(key) for key in PARSER_CONFIG_KEYS):
+        return
+    print(f"配置檔案已變更（版本 {new.version}），重新建立解析器")
+    parser = build_parser(new)
+    parser.warm_up()
+    old_parser = transaction_parser.swap(parser)
+    # 舊解析器的推測結果不再使用
+    speculative_parses.clear()
+    if old_parser is not None:
+        retire = threading.Timer(PARSER_RETIRE_DELAY, old_parser.close)
+        retire.daemon = True
+        retire.start()
+
+config_service.subscribe(on_config_change)
+
+def traced_view(name):
+    """
+    依配置的取樣率追蹤請求的裝飾器
+    取樣的追蹤會輸出到 trace_export_path，啟用 trace_debug_header 時會附加到回應標頭，
+    並且可以用請求標頭 X-Trace: 1 強制取樣
+    
+    Args:
+        name (str): 根 span 名稱
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            config = config_service.get()
+            debug_header = bool(config.get("trace_debug_header"))
+            root = tracing.tracer.start_trace(
+                name,
+                sample_rate=float(config.get("trace_sample_rate") or 0),
+                force=debug_header and request.headers.get("X-Trace") == "1"
+            )
+            if root is None:
+                return view(*args, **kwargs)
+            
+            try:
+                response = make_response(view(*args, **kwargs))
+                root.set_attribute("status", response.status_code)
+            finally:
+                trace = tracing.tracer.finish_trace(root, config.get("trace_export_path"))
+            
+            if debug_header:
+                response.headers["X-Trace-Id"] = trace.trace_id
+                response.headers["Server-Timing"] = trace.server_timing()
+            return response
+        return wrapper
+    return decorator
+
+bp = Blueprint('fintrack', __name__)
+
+@bp.before_app_request
+def start_request_timer():
+    """記錄請求開始時間"""
+    g.request_start = time.perf_counter()
+
+@bp.before_app_request
+def start_recurring_scheduler():
+    """啟動定期交易排程器，測試時不啟動"""
+    if not recurring_scheduler.running and not current_app.testing and config_service.get().get("recurring_scheduler", True):
+        recurring_scheduler.start()
+
+@bp.after_app_request
+def observe_request_duration(response):
+    """記錄請求處理時間到指標"""
+    start = g.pop('request_start', None)
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.HTTP_REQUEST_DURATION.labels(
+            method=request.method, endpoint=endpoint, status=response.status_code
+        ).observe(time.perf_counter() - start)
+    return response
+
+@bp.route('/metrics')
+def get_metrics():
+    """以 Prometheus 文字格式輸出指標"""
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+@bp.route('/')
 def index():
     """渲染主頁"""
     return render_template('index.html')
 
-@app.route('/api/parse', methods=['POST'])
+@bp.route('/sw.js')
+def service_worker():
+    """
+    service worker 腳本
+    從網站根目錄提供，作用範圍才能涵蓋首頁；不快取腳本本身，更新後瀏覽器可以立即取得新版本
+    """
+    response = send_from_directory(os.path.join(bp.root_path, 'static', 'js'), 'sw.js',
+                                   mimetype='application/javascript')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@bp.route('/api/parse', methods=['POST'])
+@traced_view("POST /api/parse")
 def parse_text():
     """
     解析語音文本
     
     接收語音識別的文本，解析為交易數據
+    請求包含 "multiple": true 時，文本可以包含多筆交易，返回 {"transactions": [...], "token": "..."}；
+    文本與先前推測解析的中間結果相同時，直接使用推測解析的結果（單筆解析只在結果是一筆交易時使用）；
+    token 可以用於 /api/confirm，確認時不需要再送一次交易數據
     """
     try:
         data = request.json
         text = data.get('text', '')
         
-        # 使用 AI 解析器解析文本
-        transaction = transaction_parser.parse_transaction(text)
+        if data.get('multiple'):
+            with tracing.span("parser.parse_transactions"):
+                transactions = speculative_parses.get(text)
+            return jsonify({"transactions": transactions, "token": parse_sessions.create(transactions)})
+        
+        # 推測解析的結果只有一筆交易時直接使用，否則使用 AI 解析器解析文本
+        with tracing.span("parser.parse_transaction"):
+            transactions = speculative_parses.peek(text)
+            if transactions is not None and len(transactions) == 1:
+                transaction = transactions[0]
+            else:
+                transaction = transaction_parser.parse_transaction(text)
         
         return jsonify(transaction)
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
-@app.route('/api/record', methods=['POST'])
+@bp.route('/api/parse/speculative', methods=['POST'])
+@traced_view("POST /api/parse/speculative")
+def speculative_parse():
+    """
+    推測解析
+    
+    接收語音識別的中間結果，在背景解析後立即返回；之後 /api/parse 收到相同的最終文本時重用結果
+    """
+    try:
+        data = request.json
+        text = data.get('text', '') if isinstance(data, dict) else ''
+        if not text.strip():
+            return jsonify({"accepted": False, "error": "文本不能為空"}), 400
+        
+        return jsonify({"accepted": speculative_parses.speculate(text)}), 202
+    except Exception as e:
+        return jsonify({"accepted": False, "error": str(e)}), 500
+
+@bp.route('/api/record', methods=['POST'])
+@traced_view("POST /api/record")
 def record_transaction():
     """
     記錄交易
     
-    接收交易數據並保存
+    接收單筆交易數據並保存，多筆交易使用 /api/record/batch
+    
+    可以用 Idempotency-Key 標頭或交易的 idempotency_key 欄位提供冪等鍵，冪等鍵與交易一起保存；
+    逾時後重送的請求不會重複保存，直接返回與第一次相同的結果
+    
+    支出使類別的當月支出超過預算的門檻時，回應中包含 alerts，由保存時更新的累計支出得出，不需要額外查詢
     """
     try:
         transaction = request.json
+        idempotency_key = request.headers.get('Idempotency-Key')
+        
+        if idempotency_key is not None and not (0 < len(idempotency_key) <= 64 and idempotency_key.isprintable()):
+            return jsonify({"success": False, "message": "無效的冪等鍵"}), 400
+        
+        if idempotency_key is not None and isinstance(transaction, dict):
+            transaction.setdefault(IDEMPOTENCY_KEY, idempotency_key)
         
         # 驗證交易數據
         if not validate_transaction(transaction):
             return jsonify({"success": False, "message": "無效的交易數據"}), 400
         
         # 保存交易
-        success = data_storage.save_transaction(transaction)
+        alerts = []
+        success = data_storage.save_transaction(transaction, alerts)
         
         if success:
-            return jsonify({"success": True})
+            return jsonify(with_alerts({"success": True}, alerts))
         else:
             return jsonify({"success": False, "message": "保存交易失敗"}), 500
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
 
-@app.route('/api/data', methods=['GET'])
+@bp.route('/api/confirm', methods=['POST'])
+@traced_view("POST /api/confirm")
+def confirm_transactions():
+    """
+    確認解析結果
+    
+    以 /api/parse 返回的 token 保存解析結果，回應中包含更新後的首頁數據，前端不需要再重新載入
+    
+    請求可以包含 idempotency_keys，依順序作為每筆交易的冪等鍵；
+    回應遺失時前端以相同的冪等鍵放入離線佇列重送，已經保存的交易不會重複保存
+    """
+    try:
+        data = request.json
+        token = data.get('token') if isinstance(data, dict) else None
+        keys = data.get('idempotency_keys') if isinstance(data, dict) else None
+        if keys is not None and not isinstance(keys, list):
+            return jsonify({"success": False, "message": "無效的冪等鍵"}), 400
+        transactions = parse_sessions.pop(token) if token else None
+        
+        if transactions is None:
+            return jsonify({"success": False, "message": "解析結果不存在或已過期"}), 404
+        
+        if keys is not None:
+            if len(keys) != len(transactions):
+                parse_sessions.restore(token, transactions)
+                return jsonify({"success": False, "message": "冪等鍵數量與交易數量不符"}), 400
+            for transaction, key in zip(transactions, keys):
+                transaction[IDEMPOTENCY_KEY] = key
+        
+        if not transactions or not all(validate_transaction(t) for t in transactions):
+            return jsonify({"success": False, "message": "無效的交易數據"}), 400
+        
+        alerts = []
+        if not data_storage.save_transactions(transactions, alerts):
+            # 保存失敗時保留解析結果，使用者可以重試
+            parse_sessions.restore(token, transactions)
+            return jsonify({"success": False, "message": "保存交易失敗"}), 500
+        
+        return jsonify(with_alerts({
+            "success": True,
+            "count": len(transactions),
+            "dashboard": data_storage.get_dashboard(5)
+        }, alerts))
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
+@bp.route('/api/record/batch', methods=['POST'])
+@traced_view("POST /api/record/batch")
+def record_transactions_batch():
+    """
+    批次記錄交易
+    
+    接收交易列表，逐筆驗證後在一次存儲寫入中保存所有有效的交易，遊戲化數據只更新一次；
+    無效的交易不影響其他交易，回應中包含每一筆的結果；
+    帶有冪等鍵的交易重送時不會重複保存，離線佇列同步時使用
+    """
+    try:
+        transactions = request.json
+        
+        if not isinstance(transactions, list):
+            return jsonify({"success": False, "message": "請求內容必須是交易列表"}), 400
+        
+        results = []
+        valid = []
+        for index, transaction in enumerate(transactions):
+            if validate_transaction(transaction):
+                results.append({"index": index, "success": True})
+                valid.append(transaction)
+            else:
+                results.append({"index": index, "success": False, "message": "無效的交易數據"})
+        
+        alerts = []
+        if valid and not data_storage.save_transactions(valid, alerts):
+            for result in results:
+                if result["success"]:
+                    result.update(success=False, message="保存交易失敗")
+            return jsonify({"success": False, "saved": 0, "results": results}), 500
+        
+        return jsonify(with_alerts({
+            "success": len(valid) == len(transactions),
+            "saved": len(valid),
+            "results": results
+        }, alerts))
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
+@bp.route('/api/data', methods=['GET'])
+@traced_view("GET /api/data")
 def get_data():
     """
     獲取數據
@@ -127,6 +453,244 @@ def get_data():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@bp.route('/api/config/parser', methods=['POST'])
+@traced_view("POST /api/config/parser")
+def update_parser_config():
+    """
+    切換解析器
+    
+    將解析器設定寫入配置檔案，由背景執行緒建立並預熱新的解析器後替換；
+    切換完成前請求繼續由目前的解析器處理，不需要重新啟動
+    """
+    try:
+        settings = request.json
+        if not isinstance(settings, dict) or settings.get("type") not in PARSER_TYPES:
+            return jsonify({"success": False, "message": "無效的解析器類型"}), 400
+        
+        # 環境變量優先於配置檔案，寫入配置檔案不會改變解析器
+        overrides = parser_env_overrides(settings)
+        if overrides:
+            return jsonify({"success": False, "message": f"解析器由環境變量 {', '.join(overrides)} 設定，無法在這裡切換"}), 409
+        
+        parser_type = settings["type"]
+        config = load_config(config_service.config_file)
+        config["parser_type"] = parser_type
+        if parser_type == "openai":
+            if not settings.get("api_key"):
+                return jsonify({"success": False, "message": "請提供 OpenAI API 密鑰"}), 400
+            config["openai_api_key"] = settings["api_key"]
+            config["openai_model"] = settings.get("model") or config.get("openai_model")
+        elif parser_type == "xai_grok":
+            if not settings.get("api_key"):
+                return jsonify({"success": False, "message": "請提供 XAI Grok API 密鑰"}), 400
+            config["xai_grok_api_key"] = settings["api_key"]
+        
+        save_config(config, config_service.config_file)
+        
+        # 喚醒配置服務的監看執行緒，由 on_config_change 在背景建立新的解析器
+        config_service.wake()
+        
+        return jsonify({"success": True, "message": "設定已保存，新的解析器準備好後會自動切換"}), 202
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
+@bp.route('/api/dashboard', methods=['GET'])
+@traced_view("GET /api/dashboard")
+def get_dashboard():
+    """
+    獲取首頁數據
+    
+    只返回首頁顯示的最新交易、當月總覽和遊戲化數據，可用 limit 查詢參數（1-50）指定交易筆數
+    """
+    try:
+        try:
+            limit = int(request.args.get('limit', 5))
+        except ValueError:
+            return jsonify({"error": "limit 必須是整數"}), 400
+        if not 1 <= limit <= 50:
+            return jsonify({"error": "limit 必須在 1 到 50 之間"}), 400
+        
+        return jsonify(data_storage.get_dashboard(limit))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/budgets', methods=['GET'])
+@traced_view("GET /api/budgets")
+def get_budgets():
+    """
+    獲取預算
+    
+    返回當月每個有預算的類別的預算、支出和剩餘金額
+    """
+    try:
+        return jsonify({"budgets": data_storage.get_budget_status()})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/budgets', methods=['POST'])
+@traced_view("POST /api/budgets")
+def set_budget():
+    """
+    設定預算
+    
+    接收 category 和每月預算 limit，limit 為 0 時移除該類別的預算
+    """
+    try:
+        data = request.json
+        if not isinstance(data, dict) or not isinstance(data.get('category'), str) or not data['category'].strip():
+            return jsonify({"success": False, "message": "請提供類別"}), 400
+        limit = data.get('limit')
+        if isinstance(limit, bool) or not isinstance(limit, (int, float)) or limit < 0:
+            return jsonify({"success": False, "message": "預算必須是非負數"}), 400
+        
+        budgets = data_storage.set_budget(data['category'].strip(), limit)
+        return jsonify({"success": True, "budgets": budgets})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
+@bp.route('/api/recurring', methods=['GET'])
+@traced_view("GET /api/recurring")
+def list_recurring_rules():
+    """
+    獲取定期交易規則
+    """
+    try:
+        return jsonify({"rules": data_storage.get_recurring_rules()})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/recurring', methods=['POST'])
+@traced_view("POST /api/recurring")
+def add_recurring_rule():
+    """
+    新增定期交易規則
+    
+    接收交易欄位 type, item, category, amount，以及 frequency（daily, weekly, monthly）
+    和第一次發生的日期 start_date（YYYY-MM-DD，預設為今天）；
+    到期的交易由背景排程器保存，start_date 早於今天時會補上之前的每一期
+    """
+    try:
+        data = request.json
+        if not validate_transaction(data) or data.get('frequency') not in FREQUENCIES:
+            return jsonify({"success": False, "message": "無效的定期交易規則"}), 400
+        start_date = data.get('start_date') or datetime.datetime.now().strftime('%Y-%m-%d')
+        try:
+            datetime.datetime.strptime(start_date, '%Y-%m-%d')
+        except (TypeError, ValueError):
+            return jsonify({"success": False, "message": "日期格式應為 YYYY-MM-DD"}), 400
+        
+        rule = new_rule(secrets.token_hex(8), data, data['frequency'], start_date)
+        data_storage.add_recurring_rule(rule)
+        recurring_scheduler.wake()
+        return jsonify({"success": True, "rule": rule}), 201
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
+@bp.route('/api/recurring/<rule_id>', methods=['DELETE'])
+@traced_view("DELETE /api/recurring")
+def remove_recurring_rule(rule_id):
+    """
+    移除定期交易規則，已經保存的交易不受影響
+    """
+    try:
+        if not data_storage.remove_recurring_rule(rule_id):
+            return jsonify({"success": False, "message": "規則不存在"}), 404
+        return jsonify({"success": True})
+    except Exception as e:
+        return jsonify({"success": False, "message": str(e)}), 500
+
+@bp.route('/api/transactions', methods=['GET'])
+@traced_view("GET /api/transactions")
+def list_transactions():
+    """
+    獲取交易列表
+    
+    可用 from 和 to 查詢參數（YYYY-MM-DD）篩選日期範圍
+    """
+    try:
+        start_date = request.args.get('from') or None
+        end_date = request.args.get('to') or None
+        for value in (start_date, end_date):
+            if value and not re.fullmatch(r'\d{4}-\d{2}-\d{2}', value):
+                return jsonify({"error": "日期格式應為 YYYY-MM-DD"}), 400
+        
+        transactions = data_storage.get_transactions(start_date, end_date)
+        return jsonify({"transactions": transactions})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/export', methods=['GET'])
+@traced_view("GET /api/export")
+def export_transactions():
+    """
+    匯出交易
+    
+    以 format 查詢參數（csv 或 jsonl，預設 csv）指定格式，可用 from 和 to（YYYY-MM-DD）篩選日期範圍；
+    交易由舊到新從存儲逐段讀取並以分塊傳輸輸出，不在記憶體中建立完整的匯出內容
+    """
+    try:
+        export_format = request.args.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({"error": "format 應為 csv 或 jsonl"}), 400
+        start_date = request.args.get('from') or None
+        end_date = request.args.get('to') or None
+        for value in (start_date, end_date):
+            if value and not re.fullmatch(r'\d{4}-\d{2}-\d{2}', value):
+                return jsonify({"error": "日期格式應為 YYYY-MM-DD"}), 400
+        
+        transactions = data_storage.iter_transactions(start_date, end_date)
+        response = Response(export_chunks(transactions, export_format), content_type=EXPORT_FORMATS[export_format])
+        response.headers["Content-Disposition"] = f'attachment; filename="fintrack-export.{export_format}"'
+        return response
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@bp.route('/api/search', methods=['GET'])
+@traced_view("GET /api/search")
+def search_transactions():
+    """
+    搜尋交易
+    
+    以 q 查詢參數搜尋交易項目，依相關度排列，可用 page 和 page_size 分頁
+    """
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({"error": "缺少搜尋文字"}), 400
+        try:
+            page = int(request.args.get('page', 1))
+            page_size = int(request.args.get('page_size', 20))
+        except ValueError:
+            return jsonify({"error": "page 和 page_size 應為整數"}), 400
+        if page < 1 or not 1 <= page_size <= 100:
+            return jsonify({"error": "page 應大於 0，page_size 應在 1 到 100 之間"}), 400
+        
+        result = search_index.search(query, page, page_size)
+        return jsonify({
+            "query": query,
+            "page": page,
+            "page_size": page_size,
+            "total": result["total"],
+            "results": result["results"]
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def with_alerts(result, alerts):
+    """
+    有預算提醒時加入回應
+    
+    Args:
+        result (dict): 回應內容
+        alerts (list): 保存交易時產生的預算提醒
+        
+    Returns:
+        dict: 回應內容
+    """
+    if alerts:
+        result["alerts"] = alerts
+    return result
+
 def validate_transaction(transaction):
     """
     驗證交易數據
@@ -137,6 +701,9 @@ def validate_transaction(transaction):
     Returns:
         bool: 是否有效
     """
+    if not isinstance(transaction, dict):
+        return False
+    
     required_fields = ["type", "item", "category", "amount"]
     
     # 檢查必要欄位
@@ -156,7 +723,35 @@ def validate_transaction(transaction):
     except (ValueError, TypeError):
         return False
     
+    # 檢查冪等鍵：可以省略，提供時必須是不超過 64 個字元的字串
+    key = transaction.get(IDEMPOTENCY_KEY)
+    if key is not None and not (isinstance(key, str) and 0 < len(key) <= 64 and key.isprintable()):
+        return False
+    
+    # 檢查日期：可以省略（使用今天），提供時必須是 YYYY-MM-DD；
+    # 離線記錄的日期來自客戶端，容許時區造成的一天差距
+    if transaction.get("date") is not None:
+        try:
+            date = datetime.datetime.strptime(transaction["date"], '%Y-%m-%d').date()
+        except (ValueError, TypeError):
+            return False
+        if date > datetime.date.today() + datetime.timedelta(days=1):
+            return False
+    
     return True
 
+def create_app():
+    """
+    應用程式工廠
+    
+    Returns:
+        Flask: 設置好路由的 Flask 應用程式
+    """
+    flask_app = Flask(__name__)
+    flask_app.register_blueprint(bp)
+    return flask_app
+
+app = create_app()
+
 if __name__ == '__main__':
     app.run(debug=True) 
\ No newline at end of file
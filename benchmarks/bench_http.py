@@ -0,0 +1,117 @@
+"""
+HTTP 負載測試
+
+在本地啟動 Flask 應用程式和模擬 LLM 服務，以多個並行客戶端測試各路由的延遲和吞吐量
+
+用法:
+    python -m benchmarks.bench_http [--requests 500] [--concurrency 8] [--llm-latency 0.02]
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from werkzeug.serving import make_server
+
+from benchmarks.common import summarize_latencies, environment
+from benchmarks.mock_llm import MockLLMServer
+from benchmarks.synthetic import write_ledger, generate_phrases
+from aiParser import OpenAIParser
+from localJsonStorage import LocalJsonStorage
+import app as app_module
+
+def load_test(name, call, total, concurrency, params):
+    """
+    以多個執行緒並行呼叫並收集延遲
+
+    Args:
+        name (str): 基準測試名稱
+        call (callable): 接收 (requests.Session, 序號) 的請求函數
+        total (int): 請求總數
+        concurrency (int): 並行數
+        params (dict): 測試參數
+
+    Returns:
+        dict: 基準測試結果
+    """
+    local = threading.local()
+
+    def timed(i):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        response = call(session, i)
+        response.raise_for_status()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(timed, range(total)))
+    elapsed = time.perf_counter() - start
+    return summarize_latencies(name, latencies, dict(params, concurrency=concurrency), elapsed)
+
+def run(total=500, concurrency=8, llm_latency=0.02, ledger_size=1000):
+    """
+    執行 HTTP 負載測試
+
+    Args:
+        total (int): 每個路由的請求數
+        concurrency (int): 並行客戶端數
+        llm_latency (float): 模擬 LLM 的延遲（秒）
+        ledger_size (int): 合成帳本的交易筆數
+
+    Returns:
+        list: 基準測試結果
+    """
+    phrases = generate_phrases(total)
+    params = {"ledger_size": ledger_size, "llm_latency": llm_latency}
+    results = []
+    with tempfile.TemporaryDirectory() as workdir, MockLLMServer(latency=llm_latency) as llm:
+        ledger_path = os.path.join(workdir, "transactions.json")
+        write_ledger(ledger_path, ledger_size)
+        app_module.data_storage.swap(LocalJsonStorage(ledger_path))
+        app_module.transaction_parser.swap(OpenAIParser(api_key="bench", api_url=llm.url))
+
+        # 關閉每個請求的存取日誌，避免輸出影響測量
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)
+        server = make_server("127.0.0.1", 0, app_module.create_app(), threaded=True)
+        thread = threading.Thread(target=server.serve_forever, name="bench-http", daemon=True)
+        thread.start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        try:
+            results.append(load_test(
+                "http.post_api_parse",
+                lambda session, i: session.post(f"{base_url}/api/parse", json={"text": phrases[i]}),
+                total, concurrency, params))
+            results.append(load_test(
+                "http.post_api_record",
+                lambda session, i: session.post(f"{base_url}/api/record", json={
+                    "type": "expense", "item": "咖啡", "category": "food", "amount": 65.0}),
+                total, concurrency, params))
+            results.append(load_test(
+                "http.get_api_data",
+                lambda session, i: session.get(f"{base_url}/api/data"),
+                total, concurrency, params))
+        finally:
+            server.shutdown()
+            thread.join()
+    return results
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="FinTrack HTTP 負載測試")
+    arg_parser.add_argument("--requests", type=int, default=500, help="每個路由的請求數")
+    arg_parser.add_argument("--concurrency", type=int, default=8, help="並行客戶端數")
+    arg_parser.add_argument("--llm-latency", type=float, default=0.02, help="模擬 LLM 延遲（秒）")
+    arg_parser.add_argument("--ledger-size", type=int, default=1000, help="合成帳本的交易筆數")
+    args = arg_parser.parse_args()
+    results = run(args.requests, args.concurrency, args.llm_latency, args.ledger_size)
+    print(json.dumps({"environment": environment(), "results": results}, ensure_ascii=False, indent=2))
+
+if __name__ == '__main__':
+    main()
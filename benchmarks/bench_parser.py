@@ -0,0 +1,42 @@
+"""
+解析器基準測試
+
+測量 LocalRuleParser.parse_transaction 的吞吐量和延遲
+
+用法:
+    python -m benchmarks.bench_parser [--phrases 20000]
+"""
+import argparse
+import json
+
+from benchmarks.common import measure, environment
+from benchmarks.synthetic import generate_phrases
+from aiParser import LocalRuleParser
+
+def run(phrase_count=20000):
+    """
+    執行解析器基準測試
+
+    Args:
+        phrase_count (int): 測試文本數量
+
+    Returns:
+        list: 基準測試結果
+    """
+    phrases = generate_phrases(phrase_count)
+    parser = LocalRuleParser()
+    return [measure(
+        "parser.local.parse_transaction",
+        lambda i: parser.parse_transaction(phrases[i]),
+        len(phrases),
+        {"phrases": phrase_count},
+    )]
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="FinTrack 解析器基準測試")
+    arg_parser.add_argument("--phrases", type=int, default=20000, help="測試文本數量")
+    args = arg_parser.parse_args()
+    print(json.dumps({"environment": environment(), "results": run(args.phrases)}, ensure_ascii=False, indent=2))
+
+if __name__ == '__main__':
+    main()
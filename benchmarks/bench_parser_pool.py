@@ -0,0 +1,113 @@
+"""
+解析器行程池擴展性基準測試
+
+以多個執行緒同時解析，比較在目前的行程中解析和不同工作行程數的 ParserPool 的吞吐量和延遲；
+本地解析器預設使用以合成帳本訓練的類別模型，模擬較重的解析工作
+
+用法:
+    python -m benchmarks.bench_parser_pool [--workers 1,2,4] [--threads 16] [--phrases 20000]
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.common import summarize_latencies, environment
+from benchmarks.synthetic import generate_phrases, generate_transactions
+from aiParser import create_parser
+from categoryClassifier import NaiveBayesCategoryClassifier, load_classifier
+from parserPool import ParserPool
+
+def parse_workers(value):
+    """解析以逗號分隔的工作行程數"""
+    return [int(part) for part in value.split(",") if part]
+
+def load_test(name, parser, phrases, threads, params):
+    """
+    以多個執行緒同時解析所有文本
+
+    Args:
+        name (str): 基準測試名稱
+        parser (AIParser): 解析器
+        phrases (list): 文本列表
+        threads (int): 並行執行緒數
+        params (dict): 測試參數
+
+    Returns:
+        dict: 基準測試結果
+    """
+    latencies = []
+    lock = threading.Lock()
+    next_index = [0]
+
+    def client():
+        local_latencies = []
+        while True:
+            with lock:
+                index = next_index[0]
+                next_index[0] += 1
+            if index >= len(phrases):
+                break
+            start = time.perf_counter()
+            parser.parse_transaction(phrases[index])
+            local_latencies.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local_latencies)
+
+    workers = [threading.Thread(target=client) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    return summarize_latencies(name, latencies, params, elapsed)
+
+def run(worker_counts=(1, 2, 4), threads=16, phrase_count=20000, classifier=True):
+    """
+    執行行程池擴展性基準測試
+
+    Args:
+        worker_counts (list): 要測試的工作行程數
+        threads (int): 並行執行緒數
+        phrase_count (int): 測試文本數量
+        classifier (bool): 是否使用以合成帳本訓練的類別模型
+
+    Returns:
+        list: 基準測試結果
+    """
+    phrases = generate_phrases(phrase_count)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        model_path = None
+        if classifier:
+            model_path = os.path.join(temp_dir, "category_model.json.gz")
+            NaiveBayesCategoryClassifier().fit(generate_transactions(20000)).save(model_path)
+
+        params = {"threads": threads, "phrases": phrase_count, "classifier": classifier}
+        results = [load_test(
+            "parser_pool.in_process",
+            create_parser("local", classifier=load_classifier(model_path)),
+            phrases, threads, dict(params, workers=0),
+        )]
+        for workers in worker_counts:
+            pool = ParserPool(workers, "local", classifier_path=model_path)
+            try:
+                results.append(load_test("parser_pool.pool", pool, phrases, threads, dict(params, workers=workers)))
+            finally:
+                pool.close()
+    return results
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="FinTrack 解析器行程池擴展性基準測試")
+    arg_parser.add_argument("--workers", type=parse_workers, default=[1, 2, 4], help="工作行程數，例如 1,2,4,8")
+    arg_parser.add_argument("--threads", type=int, default=16, help="並行執行緒數")
+    arg_parser.add_argument("--phrases", type=int, default=20000, help="測試文本數量")
+    arg_parser.add_argument("--no-classifier", action="store_true", help="不使用類別模型")
+    args = arg_parser.parse_args()
+    results = run(args.workers, args.threads, args.phrases, not args.no_classifier)
+    print(json.dumps({"environment": environment(), "results": results}, ensure_ascii=False, indent=2))
+
+if __name__ == '__main__':
+    main()
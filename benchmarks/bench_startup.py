@@ -0,0 +1,82 @@
+"""
+啟動時間基準測試
+
+測量匯入 app 模組所需的時間，以及第一個請求（觸發解析器和存儲的延遲初始化）的延遲
+每次測量都在新的 Python 行程中執行，避免模組快取影響結果
+
+用法:
+    python benchmarks/bench_startup.py [--runs 10]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 在子行程中執行的測量程式
+PROBE = r"""
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+client.post('/api/parse', json={"text": "咖啡 5 元"})
+first_parse = time.perf_counter()
+client.get('/api/data')
+first_data = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_parse_ms": (first_parse - imported) * 1000,
+    "first_data_ms": (first_data - first_parse) * 1000,
+}))
+"""
+
+def run_once(workdir):
+    """
+    在新行程中執行一次測量
+
+    Args:
+        workdir (str): 子行程的工作目錄，交易檔案會建立在這裡
+
+    Returns:
+        dict: 各階段耗時（毫秒）
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    # 只取最後一行，忽略解析器或存儲的 print 輸出
+    return json.loads(output.strip().splitlines()[-1])
+
+def summarize(samples):
+    """計算每個指標的中位數、最小值和最大值"""
+    result = {}
+    for key in samples[0]:
+        values = [sample[key] for sample in samples]
+        result[key] = {
+            "median": statistics.median(values),
+            "min": min(values),
+            "max": max(values),
+        }
+    return result
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="FinTrack 啟動時間基準測試")
+    arg_parser.add_argument("--runs", type=int, default=10, help="測量次數")
+    args = arg_parser.parse_args()
+
+    samples = []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as workdir:
+            samples.append(run_once(workdir))
+
+    print(json.dumps({"benchmark": "startup", "runs": args.runs, "results": summarize(samples)},
+                     ensure_ascii=False, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+存儲基準測試
+
+在不同大小的合成帳本上測量 save_transaction、get_data 和 get_monthly_summary
+
+用法:
+    python -m benchmarks.bench_storage [--sizes 1000,10000,100000]
+"""
+import argparse
+import datetime
+import json
+import os
+import tempfile
+
+from benchmarks.common import measure, scaled_iterations, environment
+from benchmarks.synthetic import build_ledger
+from localJsonStorage import LocalJsonStorage
+from binaryLogStorage import BinaryLogStorage
+from partitionedJsonStorage import PartitionedJsonStorage
+
+def open_json_storage(workdir, ledger):
+    """建立載入合成帳本的 LocalJsonStorage"""
+    path = os.path.join(workdir, "transactions.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(ledger, f, ensure_ascii=False, indent=2)
+    return LocalJsonStorage(path)
+
+def open_binary_log_storage(workdir, ledger):
+    """建立載入合成帳本的 BinaryLogStorage"""
+    storage = BinaryLogStorage(os.path.join(workdir, "log"))
+    with storage._lock:
+        # 日誌依寫入順序存放，最舊的交易先寫入
+        storage._append(list(reversed(ledger["transactions"])))
+        storage._meta["user"] = ledger["user"]
+        storage._write_meta(storage._meta)
+    return storage
+
+def open_partitioned_storage(workdir, ledger):
+    """建立載入合成帳本的 PartitionedJsonStorage"""
+    storage = PartitionedJsonStorage(os.path.join(workdir, "parts"))
+    months = {}
+    for transaction in ledger["transactions"]:
+        months.setdefault(transaction["date"][:7], []).append(transaction)
+    with storage._lock:
+        for month, transactions in months.items():
+            storage._write_json(storage._partition_path(month), transactions)
+            storage._manifest["partitions"][month] = {
+                "count": len(transactions),
+                "income": sum(t["amount"] for t in transactions if t["type"] == "income"),
+                "expense": sum(t["amount"] for t in transactions if t["type"] == "expense"),
+            }
+        storage._manifest["user"] = ledger["user"]
+        storage._write_json(storage.manifest_path, storage._manifest)
+    return storage
+
+# 可測試的存儲引擎，接收 (工作目錄, 帳本) 並返回存儲實例
+ENGINES = {
+    "json": open_json_storage,
+    "binary_log": open_binary_log_storage,
+    "partitioned": open_partitioned_storage,
+}
+
+def run(sizes, engines=None):
+    """
+    執行存儲基準測試
+
+    Args:
+        sizes (list): 帳本交易筆數列表
+        engines (list): 要測試的存儲引擎名稱，預設全部
+
+    Returns:
+        list: 基準測試結果
+    """
+    results = []
+    week_start = (datetime.date.today() - datetime.timedelta(days=7)).strftime('%Y-%m-%d')
+    sample = {"type": "expense", "item": "咖啡", "category": "food", "amount": 65.0}
+    for engine in engines or list(ENGINES):
+        for size in sizes:
+            ledger = build_ledger(size)
+            with tempfile.TemporaryDirectory() as workdir:
+                storage = ENGINES[engine](workdir, ledger)
+                params = {"engine": engine, "size": size}
+                iterations = scaled_iterations(size)
+                results.append(measure(
+                    "storage.get_data", lambda i: storage.get_data(), iterations, params))
+                results.append(measure(
+                    "storage.get_monthly_summary", lambda i: storage.get_monthly_summary(), iterations, params))
+                results.append(measure(
+                    "storage.get_recent_transactions", lambda i: storage.get_recent_transactions(5), iterations, params))
+                results.append(measure(
+                    "storage.get_transactions_last_7_days", lambda i: storage.get_transactions(week_start), iterations, params))
+                results.append(measure(
+                    "storage.save_transaction", lambda i: storage.save_transaction(dict(sample)), iterations, params))
+    return results
+
+def parse_sizes(value):
+    """解析以逗號分隔的帳本大小"""
+    return [int(size) for size in value.split(",") if size]
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="FinTrack 存儲基準測試")
+    arg_parser.add_argument("--sizes", type=parse_sizes, default=[1000, 10000, 100000],
+                            help="以逗號分隔的帳本大小，例如 1000,10000,1000000")
+    arg_parser.add_argument("--engines", default=",".join(ENGINES), help="以逗號分隔的存儲引擎")
+    args = arg_parser.parse_args()
+    results = run(args.sizes, args.engines.split(","))
+    print(json.dumps({"environment": environment(), "results": results}, ensure_ascii=False, indent=2))
+
+if __name__ == '__main__':
+    main()
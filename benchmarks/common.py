@@ -0,0 +1,109 @@
+"""
+基準測試共用工具
+
+提供計時、統計和結果格式，所有基準測試都輸出相同結構的結果，方便跨 commit 比較
+"""
+import datetime
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 讓基準測試可以匯入專案根目錄的模組
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+def percentile(sorted_values, fraction):
+    """
+    計算百分位數（最近秩法）
+
+    Args:
+        sorted_values (list): 已排序的數值
+        fraction (float): 0 到 1 之間的百分位
+
+    Returns:
+        float: 百分位數
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def summarize_latencies(name, latencies, params=None, elapsed=None, operations=None):
+    """
+    將延遲樣本整理為結果字典
+
+    Args:
+        name (str): 基準測試名稱
+        latencies (list): 每次操作的耗時（秒）
+        params (dict): 測試參數，例如資料量
+        elapsed (float): 總耗時（秒），為 None 時使用延遲總和
+        operations (int): 操作次數，為 None 時使用樣本數
+
+    Returns:
+        dict: 基準測試結果
+    """
+    ordered = sorted(latencies)
+    elapsed = elapsed if elapsed is not None else sum(ordered)
+    operations = operations if operations is not None else len(ordered)
+    return {
+        "name": name,
+        "params": params or {},
+        "operations": operations,
+        "seconds": elapsed,
+        "ops_per_sec": operations / elapsed if elapsed > 0 else None,
+        "mean_ms": statistics.fmean(ordered) * 1000 if ordered else None,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+    }
+
+def measure(name, func, iterations, params=None, setup=None):
+    """
+    重複執行函數並記錄每次耗時
+
+    Args:
+        name (str): 基準測試名稱
+        func (callable): 要測量的函數，接收迭代序號
+        iterations (int): 執行次數
+        params (dict): 測試參數
+        setup (callable): 每次執行前呼叫的準備函數，不計入耗時
+
+    Returns:
+        dict: 基準測試結果
+    """
+    latencies = []
+    for i in range(iterations):
+        if setup is not None:
+            setup(i)
+        start = time.perf_counter()
+        func(i)
+        latencies.append(time.perf_counter() - start)
+    return summarize_latencies(name, latencies, params)
+
+def scaled_iterations(size, budget=200000, minimum=3, maximum=200):
+    """依資料量調整迭代次數，避免大型帳本的測試跑太久"""
+    return max(minimum, min(maximum, budget // max(size, 1)))
+
+def git_revision():
+    """獲取目前的 git commit，無法取得時返回 None"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def environment():
+    """收集執行環境資訊，寫入結果檔案方便比較"""
+    return {
+        "commit": git_revision(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
@@ -0,0 +1,80 @@
+"""
+比較兩次基準測試的結果
+
+以名稱和參數配對結果，輸出吞吐量和 p99 延遲的變化；解析器評估結果另外輸出全部欄位準確率的變化
+
+用法:
+    python -m benchmarks.compare baseline.json candidate.json [--threshold 0.1]
+"""
+import argparse
+import json
+import sys
+
+def result_key(result):
+    """以名稱和參數作為配對鍵"""
+    return (result["name"], json.dumps(result["params"], sort_keys=True))
+
+def load_results(path):
+    """讀取結果檔案"""
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    return report.get("environment", {}), {result_key(result): result for result in report["results"]}
+
+def ratio(new, old):
+    """計算變化比例，無法計算時返回 None"""
+    if not old or new is None:
+        return None
+    return (new - old) / old
+
+def compare(baseline, candidate, threshold):
+    """
+    比較兩組結果
+
+    Args:
+        baseline (dict): 基準結果
+        candidate (dict): 候選結果
+        threshold (float): 視為退步的 p99 延遲增加比例；準確率下降一律視為退步
+
+    Returns:
+        tuple: (輸出的各行, 是否有退步)
+    """
+    lines = [f"{'benchmark':<40} {'params':<40} {'ops/s':>10} {'p99 ms':>10} {'accuracy':>10}"]
+    regressed = False
+    for key in sorted(set(baseline) & set(candidate)):
+        old, new = baseline[key], candidate[key]
+        throughput = ratio(new["ops_per_sec"], old["ops_per_sec"])
+        latency = ratio(new["p99_ms"], old["p99_ms"])
+        accuracy = None
+        if "accuracy" in old and "accuracy" in new:
+            accuracy = new["accuracy"]["all"] - old["accuracy"]["all"]
+        flag = ""
+        if (latency is not None and latency > threshold) or (accuracy is not None and accuracy < 0):
+            flag = "  <-- 退步"
+            regressed = True
+        accuracy_text = "" if accuracy is None else f"{accuracy * 100:+.1f}pp"
+        lines.append(f"{key[0]:<40} {key[1]:<40} {_format(throughput):>10} {_format(latency):>10} {accuracy_text:>10}{flag}")
+    for key in sorted(set(baseline) - set(candidate)):
+        lines.append(f"{key[0]:<40} {key[1]:<40} {'(只在基準結果)':>21}")
+    for key in sorted(set(candidate) - set(baseline)):
+        lines.append(f"{key[0]:<40} {key[1]:<40} {'(新增)':>21}")
+    return lines, regressed
+
+def _format(value):
+    return "n/a" if value is None else f"{value:+.1%}"
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="比較 FinTrack 基準測試結果")
+    arg_parser.add_argument("baseline", help="基準結果檔案")
+    arg_parser.add_argument("candidate", help="候選結果檔案")
+    arg_parser.add_argument("--threshold", type=float, default=0.1, help="p99 延遲增加超過此比例視為退步")
+    args = arg_parser.parse_args()
+
+    baseline_env, baseline = load_results(args.baseline)
+    candidate_env, candidate = load_results(args.candidate)
+    print(f"基準: {baseline_env.get('commit')}  候選: {candidate_env.get('commit')}")
+    lines, regressed = compare(baseline, candidate, args.threshold)
+    print("\n".join(lines))
+    sys.exit(1 if regressed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+解析器準確度和延遲評估
+
+以標註好的語音文本語料執行 create_parser 可建立的每一種解析器，
+遠端解析器連到本地的模擬 LLM 服務，輸出各欄位的準確率以及吞吐量和 p50/p99 延遲
+
+模擬 LLM 預設以語料的標註回答（oracle），遠端解析器的準確率反映的是請求和回應處理是否正確，
+延遲則包含 HTTP 往返和 --llm-latency 設定的模擬延遲；也可以用 --llm-responder local 改以本地規則回答
+
+用法:
+    python -m benchmarks.eval_parser [--llm-latency 0.05] [--classifier category_model.json.gz]
+"""
+import argparse
+import json
+import os
+import time
+
+from benchmarks.common import ROOT, summarize_latencies, environment
+from benchmarks.mock_llm import MockLLMServer
+from aiParser import LocalRuleParser, create_parser
+from categoryClassifier import load_classifier
+
+# 預設的標註語料
+DEFAULT_CORPUS = os.path.join(ROOT, "benchmarks", "data", "parser_corpus.jsonl")
+
+# 評估的欄位
+FIELDS = ("type", "item", "category", "amount")
+
+# create_parser 支援的解析器類型
+PARSER_TYPES = ("local", "openai", "xai_grok")
+
+def load_corpus(path=DEFAULT_CORPUS):
+    """
+    讀取標註語料
+
+    Args:
+        path (str): JSON lines 檔案，每行包含 text 以及 type, item, category, amount 標註
+
+    Returns:
+        list: 標註列表
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def field_matches(expected, actual):
+    """
+    比較解析結果和標註
+
+    Args:
+        expected (dict): 標註
+        actual (dict): 解析結果
+
+    Returns:
+        dict: 每個欄位是否正確
+    """
+    matches = {}
+    for field in FIELDS:
+        if field == "amount":
+            try:
+                matches[field] = abs(float(actual.get(field)) - expected[field]) < 0.005
+            except (TypeError, ValueError):
+                matches[field] = False
+        else:
+            matches[field] = actual.get(field) == expected[field]
+    return matches
+
+def evaluate(name, parser, corpus, repeat=1, params=None):
+    """
+    以語料評估解析器
+
+    Args:
+        name (str): 結果名稱
+        parser (AIParser): 解析器
+        corpus (list): 標註語料
+        repeat (int): 重複執行語料的次數，只有第一次計入準確率
+        params (dict): 測試參數
+
+    Returns:
+        dict: 基準測試結果，另外包含 accuracy（各欄位及全部欄位正確的比例）和 mismatches（錯誤範例）
+    """
+    correct = dict.fromkeys(FIELDS + ("all",), 0)
+    mismatches = []
+    latencies = []
+    start = time.perf_counter()
+    for round_index in range(repeat):
+        for sample in corpus:
+            begin = time.perf_counter()
+            result = parser.parse_transaction(sample["text"])
+            latencies.append(time.perf_counter() - begin)
+            if round_index:
+                continue
+
+            matches = field_matches(sample, result)
+            for field, ok in matches.items():
+                correct[field] += ok
+            if all(matches.values()):
+                correct["all"] += 1
+            elif len(mismatches) < 10:
+                mismatches.append({"text": sample["text"], "expected": {f: sample[f] for f in FIELDS},
+                                   "actual": {f: result.get(f) for f in FIELDS}})
+    elapsed = time.perf_counter() - start
+
+    summary = summarize_latencies(name, latencies, dict(params or {}, samples=len(corpus)), elapsed)
+    summary["accuracy"] = {field: count / len(corpus) for field, count in correct.items()}
+    summary["mismatches"] = mismatches
+    return summary
+
+def oracle_responder(corpus):
+    """以語料標註回答的模擬 LLM 回應函數，語料以外的文本使用本地規則"""
+    labels = {sample["text"]: {f: sample[f] for f in FIELDS} for sample in corpus}
+    fallback = LocalRuleParser().parse_transaction
+    return lambda text: labels.get(text) or fallback(text)
+
+def run(corpus_path=DEFAULT_CORPUS, llm_latency=0.0, responder="oracle", classifier_path=None, repeat=1):
+    """
+    評估所有解析器
+
+    Args:
+        corpus_path (str): 標註語料路徑
+        llm_latency (float): 模擬 LLM 延遲（秒）
+        responder (str): 模擬 LLM 的回答方式，"oracle" 或 "local"
+        classifier_path (str): 類別模型路徑，提供時另外評估使用分類器的本地解析器
+        repeat (int): 重複執行語料的次數
+
+    Returns:
+        list: 評估結果
+    """
+    corpus = load_corpus(corpus_path)
+    params = {"llm_latency": llm_latency, "responder": responder}
+    results = []
+    with MockLLMServer(latency=llm_latency,
+                       responder=oracle_responder(corpus) if responder == "oracle" else None) as llm:
+        for parser_type in PARSER_TYPES:
+            if parser_type == "local":
+                parser = create_parser("local")
+            else:
+                parser = create_parser(parser_type, api_key="eval", api_url=llm.url)
+            results.append(evaluate(f"parser_eval.{parser_type}", parser, corpus, repeat, params))
+
+    if classifier_path:
+        parser = create_parser("local", classifier=load_classifier(classifier_path))
+        results.append(evaluate("parser_eval.local+classifier", parser, corpus, repeat,
+                                {"classifier": os.path.basename(classifier_path)}))
+    return results
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="FinTrack 解析器準確度和延遲評估")
+    arg_parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="標註語料路徑")
+    arg_parser.add_argument("--llm-latency", type=float, default=0.0, help="模擬 LLM 延遲（秒）")
+    arg_parser.add_argument("--llm-responder", choices=("oracle", "local"), default="oracle",
+                            help="模擬 LLM 的回答方式")
+    arg_parser.add_argument("--classifier", help="另外評估使用此類別模型的本地解析器")
+    arg_parser.add_argument("--repeat", type=int, default=1, help="重複執行語料的次數")
+    args = arg_parser.parse_args()
+    results = run(args.corpus, args.llm_latency, args.llm_responder, args.classifier, args.repeat)
+    print(json.dumps({"environment": environment(), "results": results}, ensure_ascii=False, indent=2))
+
+if __name__ == '__main__':
+    main()
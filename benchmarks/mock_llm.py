@@ -0,0 +1,115 @@
+"""
+本地模擬 LLM 服務
+
+提供與 OpenAI chat completions 相容的 API，以 LocalRuleParser 產生回應，
+可設定固定延遲，讓遠端解析器的基準測試不需要網路和 API 密鑰
+"""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks import common  # noqa: F401  設置匯入路徑
+from aiParser import LocalRuleParser
+
+# 從解析器的提示詞中取出原始文本
+PROMPT_TEXT_PATTERN = re.compile(r'文本: "(.*?)"')
+
+class MockLLMServer:
+    """
+    在背景執行緒中執行的模擬 LLM 服務
+
+    用法:
+        with MockLLMServer(latency=0.05) as server:
+            parser = OpenAIParser(api_key="bench", api_url=server.url)
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, responder=None):
+        """
+        初始化模擬服務
+
+        Args:
+            host (str): 監聽位址
+            port (int): 監聽埠號，0 表示自動選擇
+            latency (float): 每個請求的模擬延遲（秒）
+            responder (callable): 接收文本並返回交易字典的函數，預設使用 LocalRuleParser
+        """
+        self.latency = latency
+        self.responder = responder or LocalRuleParser().parse_transaction
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """chat completions API 的 URL"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/chat/completions"
+
+    def start(self):
+        """啟動服務"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服務"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def _respond(self, body):
+        """依請求內容產生 chat completions 回應"""
+        with self._count_lock:
+            self.request_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+        prompt = body["messages"][-1]["content"]
+        match = PROMPT_TEXT_PATTERN.search(prompt)
+        text = match.group(1) if match else prompt
+        content = json.dumps(self.responder(text), ensure_ascii=False)
+        return {
+            "id": "mock",
+            "object": "chat.completion",
+            "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 標頭和內容分兩次寫入，保持連線時 Nagle 演算法會等待延遲 ACK，每個請求多出約 40 毫秒
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                payload = json.dumps(server._respond(body), ensure_ascii=False).encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_HEAD(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
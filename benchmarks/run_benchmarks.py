@@ -0,0 +1,51 @@
+"""
+執行所有基準測試並輸出機器可讀的結果
+
+結果包含執行環境和 git commit，可以用 benchmarks/compare.py 比較兩次執行
+
+用法:
+    python -m benchmarks.run_benchmarks --output results.json
+    python -m benchmarks.run_benchmarks --suites storage,parser --sizes 1000,1000000
+"""
+import argparse
+import json
+import sys
+
+from benchmarks.common import environment
+from benchmarks import bench_storage, bench_parser, bench_http, eval_parser, bench_parser_pool
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="FinTrack 基準測試")
+    arg_parser.add_argument("--suites", default="storage,parser,http",
+                            help="以逗號分隔的測試套件：storage, parser, parser_eval, parser_pool, http")
+    arg_parser.add_argument("--sizes", type=bench_storage.parse_sizes, default=[1000, 10000, 100000],
+                            help="存儲測試的帳本大小，例如 1000,10000,100000,1000000")
+    arg_parser.add_argument("--phrases", type=int, default=20000, help="解析器測試的文本數量")
+    arg_parser.add_argument("--requests", type=int, default=500, help="HTTP 測試每個路由的請求數")
+    arg_parser.add_argument("--concurrency", type=int, default=8, help="HTTP 測試的並行客戶端數")
+    arg_parser.add_argument("--llm-latency", type=float, default=0.02, help="模擬 LLM 延遲（秒）")
+    arg_parser.add_argument("--output", help="結果輸出檔案，預設輸出到標準輸出")
+    args = arg_parser.parse_args()
+
+    suites = args.suites.split(",")
+    results = []
+    if "storage" in suites:
+        results.extend(bench_storage.run(args.sizes))
+    if "parser" in suites:
+        results.extend(bench_parser.run(args.phrases))
+    if "parser_eval" in suites:
+        results.extend(eval_parser.run(llm_latency=args.llm_latency))
+    if "parser_pool" in suites:
+        results.extend(bench_parser_pool.run(phrase_count=args.phrases))
+    if "http" in suites:
+        results.extend(bench_http.run(args.requests, args.concurrency, args.llm_latency))
+
+    report = json.dumps({"environment": environment(), "results": results}, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + "\n")
+    else:
+        sys.stdout.write(report + "\n")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+合成帳本產生器
+
+產生指定筆數的交易，格式與 LocalJsonStorage 的檔案相同，供基準測試使用
+"""
+import datetime
+import json
+import random
+
+# 依類別區分的項目名稱和金額範圍
+CATALOG = {
+    "food": (["咖啡", "早餐", "午餐", "晚餐", "宵夜", "飲料", "水果", "便當", "牛肉麵"], (30, 400)),
+    "transport": (["捷運", "公車", "計程車", "高鐵票", "加油", "火車票"], (20, 1500)),
+    "housing": (["房租", "水電費", "網路費", "瓦斯費"], (300, 20000)),
+    "entertainment": (["電影", "遊戲", "旅遊", "演唱會門票"], (200, 8000)),
+    "other": (["文具", "衣服", "雨傘", "禮物", "剪頭髮"], (50, 3000)),
+}
+INCOME_ITEMS = ["薪水", "獎金", "紅包", "兼職收入"]
+
+def generate_transactions(count, seed=42, end_date=None, days=365):
+    """
+    產生合成交易，最新的交易在最前面
+
+    Args:
+        count (int): 交易筆數
+        seed (int): 亂數種子，相同種子產生相同帳本
+        end_date (datetime.date): 最新交易的日期，預設為今天
+        days (int): 交易分布的天數
+
+    Returns:
+        list: 交易列表
+    """
+    rng = random.Random(seed)
+    end_date = end_date or datetime.date.today()
+    categories = list(CATALOG)
+    transactions = []
+    for i in range(count):
+        # 依序往前分布日期，讓交易保持新到舊的順序
+        date = end_date - datetime.timedelta(days=(i * days) // max(count, 1))
+        if rng.random() < 0.05:
+            transactions.append({
+                "type": "income",
+                "item": rng.choice(INCOME_ITEMS),
+                "category": "income",
+                "amount": float(rng.randrange(1000, 60000, 100)),
+                "date": date.strftime('%Y-%m-%d'),
+            })
+            continue
+        category = rng.choice(categories)
+        items, (low, high) = CATALOG[category]
+        transactions.append({
+            "type": "expense",
+            "item": rng.choice(items),
+            "category": category,
+            "amount": float(rng.randint(low, high)),
+            "date": date.strftime('%Y-%m-%d'),
+        })
+    return transactions
+
+def build_ledger(count, seed=42):
+    """
+    產生完整的帳本數據
+
+    Args:
+        count (int): 交易筆數
+        seed (int): 亂數種子
+
+    Returns:
+        dict: 包含 transactions 和 user 的帳本
+    """
+    transactions = generate_transactions(count, seed)
+    return {
+        "transactions": transactions,
+        "user": {
+            "points": 10 * min(count, 365),
+            "streak": 1,
+            "last_record_date": transactions[0]["date"] if transactions else None,
+        },
+    }
+
+def write_ledger(path, count, seed=42):
+    """
+    將合成帳本寫入 JSON 檔案
+
+    Args:
+        path (str): 檔案路徑
+        count (int): 交易筆數
+        seed (int): 亂數種子
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(build_ledger(count, seed), f, ensure_ascii=False, indent=2)
+
+def generate_phrases(count, seed=42):
+    """
+    產生語音輸入風格的交易文本
+
+    Args:
+        count (int): 文本數量
+        seed (int): 亂數種子
+
+    Returns:
+        list: 文本列表，例如「午餐 120 元」
+    """
+    rng = random.Random(seed)
+    phrases = []
+    for transaction in generate_transactions(count, seed):
+        amount = int(transaction["amount"])
+        unit = rng.choice([" 元", "元", " 塊", ""])
+        phrases.append(f"{transaction['item']} {amount}{unit}")
+    return phrases
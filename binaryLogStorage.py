@@ -0,0 +1,526 @@
+import datetime
+import heapq
+import json
+import mmap
+import os
+import struct
+import threading
+from dataStorage import DataStorage, IDEMPOTENCY_KEY, SAVED_AT
+from metrics import STORAGE_OPERATION_DURATION, STORAGE_BYTES
+from tracing import traced
+
+# 檔案標頭：魔術字串、格式版本、保留欄位
+HEADER = struct.Struct('<4sHH')
+MAGIC = b'FTLG'
+FORMAT_VERSION = 1
+
+# 固定寬度的交易記錄：
+# 金額 (double)、日期序數 (uint32)、類型 (uint8)、保留 (uint8)、類別編號 (uint16)、
+# 項目名稱在字串堆中的位移 (uint64) 和長度 (uint32)
+RECORD = struct.Struct('<dIBBHQI')
+
+# 記錄欄位位置
+AMOUNT, DAY, TYPE, _RESERVED, CATEGORY, ITEM_OFFSET, ITEM_LENGTH = range(7)
+
+# 交易類型編碼
+TYPE_CODES = {"expense": 0, "income": 1}
+TYPE_NAMES = {code: name for name, code in TYPE_CODES.items()}
+
+class BinaryLogStorage(DataStorage):
+    """
+    記憶體映射的固定寬度交易日誌存儲
+    交易以固定寬度的二進位記錄依寫入順序附加到 records.bin，項目名稱存放在另一個字串堆檔案，
+    類別名稱表和用戶遊戲化數據存放在 meta.json
+
+    讀取時以 mmap 映射檔案，最新 N 筆和範圍掃描直接返回記錄區的 memoryview 切片，不複製數據；
+    月度總覽直接在映射的緩衝區上計算，不建立交易字典
+
+    補記較早日期的交易時，記錄區分成數段各自依日期排序的區段，meta.json 的 runs 保存每段的起始序號；
+    範圍掃描在每段中以二分搜尋定位，不需要掃描整個日誌
+
+    只保存 type, item, category, amount, date 五個欄位；交易的冪等鍵、日期和保存時間另外附加到 idempotency.keys，每行一筆
+    """
+
+    def __init__(self, data_dir="transactions_log"):
+        """
+        初始化二進位日誌存儲
+
+        Args:
+            data_dir (str): 存放日誌檔案的目錄
+        """
+        self.data_dir = data_dir
+        self.records_path = os.path.join(data_dir, "records.bin")
+        self.heap_path = os.path.join(data_dir, "items.heap")
+        self.meta_path = os.path.join(data_dir, "meta.json")
+        self.keys_path = os.path.join(data_dir, "idempotency.keys")
+        self._lock = threading.RLock()
+        self._records_map = None
+        self._heap_map = None
+        self._ensure_files_exist()
+        self._meta = self._read_meta()
+        self._category_ids = {name: i for i, name in enumerate(self._meta['categories'])}
+        if 'runs' not in self._meta:
+            self._migrate_runs()
+
+    def _ensure_files_exist(self):
+        """確保日誌檔案存在，如果不存在則創建"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        if not os.path.exists(self.records_path):
+            with open(self.records_path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0))
+        if not os.path.exists(self.heap_path):
+            open(self.heap_path, 'wb').close()
+        if not os.path.exists(self.meta_path):
+            self._write_meta({
+                "categories": [],
+                # 各段依日期排序的記錄區段的起始序號，用於範圍掃描的二分搜尋
+                "runs": [0],
+                "user": {
+                    "points": 0,
+                    "streak": 0,
+                    "last_record_date": None
+                }
+            })
+
+    def _migrate_runs(self):
+        """將舊格式的 sorted 旗標轉為排序區段，未排序的日誌掃描一次找出區段邊界"""
+        runs = [0]
+        if not self._meta.pop('sorted', True):
+            previous = None
+            for index, record in enumerate(RECORD.iter_unpack(self.records())):
+                if previous is not None and record[DAY] < previous:
+                    runs.append(index)
+                previous = record[DAY]
+        self._meta['runs'] = runs
+        self._write_meta(self._meta)
+
+    def _read_meta(self):
+        """讀取中繼數據"""
+        with open(self.meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(self.records_path, 'rb') as f:
+            magic, version, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"不支援的日誌格式: {self.records_path}")
+        return meta
+
+    def _write_meta(self, meta):
+        """寫入中繼數據，先寫入暫存檔再替換，避免寫到一半的檔案"""
+        temp_path = self.meta_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(temp_path, self.meta_path)
+
+    def _category_id(self, category):
+        """獲取類別編號，新類別會加入類別表"""
+        category_id = self._category_ids.get(category)
+        if category_id is None:
+            category_id = len(self._meta['categories'])
+            self._meta['categories'].append(category)
+            self._category_ids[category] = category_id
+        return category_id
+
+    def _remap(self):
+        """檔案大小變更時重新映射，返回 (記錄映射, 字串堆映射)"""
+        records_size = os.path.getsize(self.records_path)
+        if self._records_map is None or len(self._records_map) != records_size:
+            with open(self.records_path, 'rb') as f:
+                # 舊的映射不主動關閉，呼叫者持有的切片釋放後會自動回收
+                self._records_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        heap_size = os.path.getsize(self.heap_path)
+        if heap_size and (self._heap_map is None or len(self._heap_map) != heap_size):
+            with open(self.heap_path, 'rb') as f:
+                self._heap_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._records_map, self._heap_map
+
+    def record_count(self):
+        """
+        獲取交易記錄數
+
+        Returns:
+            int: 記錄數
+        """
+        return (os.path.getsize(self.records_path) - HEADER.size) // RECORD.size
+
+    @traced("storage.read_records")
+    def records(self, start=0, stop=None):
+        """
+        獲取依寫入順序排列的記錄區間，不複製數據
+
+        Args:
+            start (int): 起始記錄序號
+            stop (int): 結束記錄序號（不包含），為 None 時到最後一筆
+
+        Returns:
+            memoryview: 記錄區間的唯讀切片，可用 RECORD.iter_unpack 逐筆解析
+        """
+        with self._lock:
+            records_map, _ = self._remap()
+        count = (len(records_map) - HEADER.size) // RECORD.size
+        start, stop, _ = slice(start, stop).indices(count)
+        stop = max(start, stop)
+        return memoryview(records_map)[HEADER.size + start * RECORD.size:HEADER.size + stop * RECORD.size]
+
+    def recent_records(self, limit):
+        """
+        獲取最新的 limit 筆記錄，不複製數據
+
+        Args:
+            limit (int): 記錄數
+
+        Returns:
+            memoryview: 記錄區間的唯讀切片，最新的記錄在最後
+        """
+        count = self.record_count()
+        return self.records(max(0, count - limit), count)
+
+    def _run_slices(self, view, first_day, last_day):
+        """
+        獲取每個排序區段中日期範圍內的記錄切片
+
+        Args:
+            view (memoryview): 全部記錄
+            first_day (int): 起始日期序數（包含）
+            last_day (int): 結束日期序數（包含）
+
+        Returns:
+            list: 非空的 memoryview 切片，依區段順序排列
+        """
+        count = len(view) // RECORD.size
+        runs = [start for start in self._meta['runs'] if start < count]
+        slices = []
+        for start, stop in zip(runs, runs[1:] + [count]):
+            run = view[start * RECORD.size:stop * RECORD.size]
+            low = _lower_bound(run, first_day)
+            high = _lower_bound(run, last_day + 1)
+            if low < high:
+                slices.append(run[low * RECORD.size:high * RECORD.size])
+        return slices
+
+    def records_between(self, start_date, end_date):
+        """
+        獲取日期範圍內的記錄
+
+        在每個排序區段中以二分搜尋定位；只有一個區段時返回不複製數據的切片，
+        否則返回依日期合併各區段的記錄元組列表
+
+        Args:
+            start_date (datetime.date): 起始日期（包含）
+            end_date (datetime.date): 結束日期（包含）
+
+        Returns:
+            memoryview 或 list: 範圍內的記錄
+        """
+        view = self.records()
+        slices = self._run_slices(view, start_date.toordinal(), end_date.toordinal())
+        if len(slices) <= 1:
+            return slices[0] if slices else view[:0]
+        return list(_merge_runs(slices))
+
+    def _to_transaction(self, record, heap_map):
+        """將記錄元組轉換為交易字典"""
+        offset, length = record[ITEM_OFFSET], record[ITEM_LENGTH]
+        item = heap_map[offset:offset + length].decode('utf-8') if length else ""
+        return {
+            "type": TYPE_NAMES[record[TYPE]],
+            "item": item,
+            "category": self._meta['categories'][record[CATEGORY]],
+            "amount": record[AMOUNT],
+            "date": datetime.date.fromordinal(record[DAY]).strftime('%Y-%m-%d')
+        }
+
+    def _to_transactions(self, view):
+        """將記錄區間轉換為交易列表，最新的在最前面"""
+        with self._lock:
+            _, heap_map = self._remap()
+        records = list(RECORD.iter_unpack(view))
+        records.reverse()
+        return [self._to_transaction(record, heap_map) for record in records]
+
+    @traced("storage.write_records")
+    def _append(self, transactions):
+        """
+        附加交易到日誌
+
+        Args:
+            transactions (list): 已設定日期的交易列表
+        """
+        heap_offset = os.path.getsize(self.heap_path)
+        last_day = self._last_day()
+        count = self.record_count()
+        categories = len(self._meta['categories'])
+        runs = self._meta['runs']
+        new_runs = len(runs)
+        heap_chunks = []
+        record_chunks = []
+        for index, transaction in enumerate(transactions):
+            item = str(transaction['item']).encode('utf-8')
+            day = datetime.datetime.strptime(transaction['date'], '%Y-%m-%d').date().toordinal()
+            if last_day is not None and day < last_day and runs[-1] != count + index:
+                # 較早的日期開始新的排序區段
+                runs.append(count + index)
+            last_day = day
+            record_chunks.append(RECORD.pack(
+                float(transaction['amount']),
+                day,
+                TYPE_CODES[transaction['type']],
+                0,
+                self._category_id(transaction['category']),
+                heap_offset,
+                len(item)
+            ))
+            heap_chunks.append(item)
+            heap_offset += len(item)
+
+        heap_bytes = b"".join(heap_chunks)
+        record_bytes = b"".join(record_chunks)
+        if len(self._meta['categories']) != categories or len(runs) != new_runs:
+            # 先保存新的類別和區段，寫入記錄後引用的類別編號一定存在；
+            # 記錄寫入前中斷時，多出的區段起始序號只會多分出一段仍然排序的區段
+            self._write_meta(self._meta)
+        with STORAGE_OPERATION_DURATION.labels(operation="write").time():
+            # 先寫入字串堆，記錄寫入後引用的字串一定存在
+            with open(self.heap_path, 'ab') as f:
+                f.write(heap_bytes)
+            with open(self.records_path, 'ab') as f:
+                f.write(record_bytes)
+        STORAGE_BYTES.labels(operation="write").inc(len(heap_bytes) + len(record_bytes))
+
+        keys = [f"{transaction[IDEMPOTENCY_KEY]}\t{transaction['date']}\t{transaction.get(SAVED_AT, '')}\n"
+                for transaction in transactions if transaction.get(IDEMPOTENCY_KEY)]
+        if keys:
+            with open(self.keys_path, 'a', encoding='utf-8') as f:
+                f.write("".join(keys))
+
+    def _load_idempotency_keys(self, start_date=None):
+        """從 idempotency.keys 讀取已保存的冪等鍵，舊格式的行沒有保存時間"""
+        if not os.path.exists(self.keys_path):
+            return []
+        entries = []
+        with open(self.keys_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                key, _, rest = line.rstrip("\n").partition("\t")
+                date, _, saved_at = rest.partition("\t")
+                if key and (start_date is None or date >= start_date):
+                    entries.append((key, date, float(saved_at) if saved_at else None))
+        return entries
+
+    def _last_day(self):
+        """獲取最後一筆記錄的日期序數，沒有記錄時返回 None"""
+        view = self.recent_records(1)
+        if not len(view):
+            return None
+        return RECORD.unpack(view)[DAY]
+
+    def _read_metadata(self):
+        """返回記憶體中的中繼數據，預算與用戶數據保存在一起"""
+        return self._meta
+
+    def _write_metadata(self, data):
+        """寫入中繼數據"""
+        self._write_meta(data)
+
+    def save_transaction(self, transaction, alerts=None):
+        """
+        保存交易數據
+
+        Args:
+            transaction (dict): 交易數據，包含 type, item, category, amount
+            alerts (list): 不為 None 時加入這筆交易造成的預算提醒
+
+        Returns:
+            bool: 是否成功保存
+        """
+        # 添加日期
+        transaction['date'] = datetime.datetime.now().strftime('%Y-%m-%d')
+        return self.save_transactions([transaction], alerts)
+
+    def save_transactions(self, transactions, alerts=None):
+        """
+        在一次附加寫入中保存多筆交易數據
+
+        Args:
+            transactions (list): 交易數據列表，由舊到新排列
+            alerts (list): 不為 None 時加入這些交易造成的預算提醒
+
+        Returns:
+            bool: 是否成功保存
+        """
+        try:
+            # 沒有日期的交易使用今天，金額轉為數字
+            self._prepare_transactions(transactions)
+
+            with self._lock:
+                # 略過已經保存過的重送交易
+                transactions = self._remove_duplicates(transactions)
+                if not transactions:
+                    return True
+                # 更新預算的累計支出，需要在附加新記錄前進行
+                budget_alerts = self._update_budgets_internal(self._meta, transactions)
+                self._append(transactions)
+                self._update_gamification_internal(self._meta, self._activity_dates(transactions))
+                self._write_meta(self._meta)
+                self._notify_saved(transactions)
+
+            if alerts is not None:
+                alerts.extend(budget_alerts)
+            return True
+        except Exception as e:
+            print(f"保存交易錯誤: {str(e)}")
+            return False
+
+    def get_data(self):
+        """
+        獲取所有數據，包括交易和用戶遊戲化數據
+
+        Returns:
+            dict: 包含 transactions 和 user 的字典
+        """
+        try:
+            view = self.records()
+            with STORAGE_OPERATION_DURATION.labels(operation="read").time():
+                transactions = self._to_transactions(view)
+            STORAGE_BYTES.labels(operation="read").inc(len(view))
+            return {
+                "transactions": transactions,
+                "user": dict(self._meta['user']),
+                "summary": self.get_monthly_summary()
+            }
+        except Exception as e:
+            print(f"獲取數據錯誤: {str(e)}")
+            return {"transactions": [], "user": {"points": 0, "streak": 0}, "summary": {"income": 0, "expense": 0, "savings": 0}}
+
+    def get_recent_transactions(self, limit):
+        """
+        獲取最新的交易，只讀取最後 limit 筆記錄
+
+        Args:
+            limit (int): 最多返回的交易筆數
+
+        Returns:
+            list: 交易列表，最新的在最前面
+        """
+        return self._to_transactions(self.recent_records(limit))
+
+    def get_transactions(self, start_date=None, end_date=None):
+        """
+        獲取日期範圍內的交易，只轉換範圍內的記錄
+
+        Args:
+            start_date (str): 起始日期 YYYY-MM-DD（包含），為 None 時不限制
+            end_date (str): 結束日期 YYYY-MM-DD（包含），為 None 時不限制
+
+        Returns:
+            list: 交易列表，最新的在最前面
+        """
+        first = datetime.datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else datetime.date.min
+        last = datetime.datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else datetime.date.max
+        records = self.records_between(first, last)
+        if isinstance(records, memoryview):
+            return self._to_transactions(records)
+        with self._lock:
+            _, heap_map = self._remap()
+        return [self._to_transaction(record, heap_map) for record in reversed(records)]
+
+    def iter_transactions(self, start_date=None, end_date=None):
+        """
+        逐筆獲取日期範圍內的交易，直接走訪映射的記錄區，每次只建立一筆交易字典
+
+        在每個排序區段中以二分搜尋定位範圍，再依日期合併各區段；
+        走訪開始時的記錄區為快照，之後附加的記錄不會出現
+
+        Args:
+            start_date (str): 起始日期 YYYY-MM-DD（包含），為 None 時不限制
+            end_date (str): 結束日期 YYYY-MM-DD（包含），為 None 時不限制
+
+        Yields:
+            dict: 交易，依日期由舊到新排列
+        """
+        first_day = datetime.datetime.strptime(start_date, '%Y-%m-%d').date().toordinal() if start_date else 1
+        last_day = datetime.datetime.strptime(end_date, '%Y-%m-%d').date().toordinal() if end_date else datetime.date.max.toordinal()
+        with self._lock:
+            view = self.records()
+            # 字串堆先於記錄寫入，在記錄區之後映射的字串堆包含所有引用的項目名稱
+            _, heap_map = self._remap()
+            slices = self._run_slices(view, first_day, last_day)
+        for record in _merge_runs(slices):
+            yield self._to_transaction(record, heap_map)
+
+    def get_monthly_summary(self):
+        """
+        獲取當月交易總覽，直接在映射的記錄上計算
+
+        Returns:
+            dict: 包含 income, expense, savings 的字典
+        """
+        try:
+            today = datetime.date.today()
+            first_day = today.replace(day=1)
+            if first_day.month == 12:
+                next_month = first_day.replace(year=first_day.year + 1, month=1)
+            else:
+                next_month = first_day.replace(month=first_day.month + 1)
+            last_day = next_month - datetime.timedelta(days=1)
+
+            income = 0
+            expense = 0
+            income_code = TYPE_CODES["income"]
+            for record in _iter_records(self.records_between(first_day, last_day)):
+                if record[TYPE] == income_code:
+                    income += record[AMOUNT]
+                else:
+                    expense += record[AMOUNT]
+
+            return {
+                "income": income,
+                "expense": expense,
+                "savings": income - expense
+            }
+        except Exception as e:
+            print(f"獲取月度總覽錯誤: {str(e)}")
+            return {"income": 0, "expense": 0, "savings": 0}
+
+    def update_gamification(self, rebuild=False):
+        """
+        更新遊戲化數據，包括點數和連續記錄天數
+
+        Args:
+            rebuild (bool): 是否以所有交易的日期重新計算，否則將今天標記為有記錄
+
+        Returns:
+            dict: 更新後的用戶遊戲化數據
+        """
+        try:
+            with self._lock:
+                if rebuild:
+                    self._rebuild_gamification_internal(self._meta)
+                else:
+                    self._update_gamification_internal(self._meta)
+                self._write_meta(self._meta)
+                return dict(self._meta['user'])
+        except Exception as e:
+            print(f"更新遊戲化數據錯誤: {str(e)}")
+            return {"points": 0, "streak": 0}
+
+def _iter_records(records):
+    """逐筆解析記錄，接受 memoryview 切片或已解析的記錄列表"""
+    if isinstance(records, memoryview):
+        return RECORD.iter_unpack(records)
+    return iter(records)
+
+def _merge_runs(slices):
+    """依日期合併各排序區段的記錄，同一天的記錄保持寫入順序"""
+    if len(slices) == 1:
+        return RECORD.iter_unpack(slices[0])
+    return heapq.merge(*(RECORD.iter_unpack(run) for run in slices), key=lambda record: record[DAY])
+
+def _lower_bound(view, day):
+    """二分搜尋第一筆日期序數不小於 day 的記錄序號"""
+    low, high = 0, len(view) // RECORD.size
+    while low < high:
+        middle = (low + high) // 2
+        if RECORD.unpack_from(view, middle * RECORD.size)[DAY] < day:
+            low = middle + 1
+        else:
+            high = middle
+    return low
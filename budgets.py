@@ -0,0 +1,120 @@
+import calendar
+
+# 預算使用比例達到這些門檻時發出提醒
+THRESHOLDS = (0.8, 1.0)
+
+# 保留每月累計支出的月數
+RETAINED_MONTHS = 12
+
+def ensure_budgets(data):
+    """
+    獲取數據中的預算區塊，不存在時建立
+
+    預算區塊與用戶數據一起保存：limits 為每個類別的每月預算，
+    spent 為每月每個類別的累計支出，保存交易時增量更新，查詢預算不需要掃描交易
+
+    Args:
+        data (dict): 包含用戶數據的字典，例如完整數據、meta 或 manifest
+
+    Returns:
+        dict: 包含 limits 和 spent 的預算區塊
+    """
+    return data.setdefault('budgets', {"limits": {}, "spent": {}})
+
+def month_spent(budgets, month, load_month):
+    """
+    獲取某月每個類別的累計支出，第一次使用某個月份時以該月的交易建立
+
+    Args:
+        budgets (dict): 預算區塊
+        month (str): 月份 YYYY-MM
+        load_month (callable): 接收月份並返回該月已保存交易的函數，只在建立累計支出時呼叫
+
+    Returns:
+        dict: 類別到累計支出的字典
+    """
+    spent = budgets['spent'].get(month)
+    if spent is None:
+        spent = {}
+        for transaction in load_month(month):
+            if transaction['type'] == 'expense':
+                spent[transaction['category']] = spent.get(transaction['category'], 0) + transaction['amount']
+        budgets['spent'][month] = spent
+        for old_month in sorted(budgets['spent'])[:-RETAINED_MONTHS]:
+            del budgets['spent'][old_month]
+    return spent
+
+def add_expenses(budgets, transactions, load_month):
+    """
+    以新交易更新累計支出，返回這些交易造成的預算門檻提醒
+
+    Args:
+        budgets (dict): 預算區塊
+        transactions (list): 新保存的交易，由舊到新排列
+        load_month (callable): 接收月份並返回該月已保存交易的函數
+
+    Returns:
+        list: 提醒列表，每個提醒包含 category, month, limit, spent, remaining, threshold
+    """
+    alerts = []
+    for transaction in transactions:
+        if transaction['type'] != 'expense':
+            continue
+        month = transaction['date'][:7]
+        category = transaction['category']
+        spent = month_spent(budgets, month, load_month)
+        before = spent.get(category, 0)
+        after = before + transaction['amount']
+        spent[category] = after
+
+        limit = budgets['limits'].get(category)
+        if not limit:
+            continue
+        for threshold in THRESHOLDS:
+            if before < limit * threshold <= after:
+                alerts.append({
+                    "category": category,
+                    "month": month,
+                    "limit": limit,
+                    "spent": after,
+                    "remaining": limit - after,
+                    "threshold": threshold
+                })
+    return alerts
+
+def budget_status(budgets, month, load_month):
+    """
+    獲取某月每個有預算的類別的使用情況
+
+    Args:
+        budgets (dict): 預算區塊
+        month (str): 月份 YYYY-MM
+        load_month (callable): 接收月份並返回該月已保存交易的函數
+
+    Returns:
+        list: 每個類別的 category, limit, spent, remaining, ratio
+    """
+    spent = month_spent(budgets, month, load_month)
+    return [
+        {
+            "category": category,
+            "limit": limit,
+            "spent": spent.get(category, 0),
+            "remaining": limit - spent.get(category, 0),
+            "ratio": spent.get(category, 0) / limit
+        }
+        for category, limit in sorted(budgets['limits'].items())
+    ]
+
+def month_range(month):
+    """
+    獲取月份的第一天和最後一天
+
+    Args:
+        month (str): 月份 YYYY-MM
+
+    Returns:
+        tuple: (第一天, 最後一天)，格式為 YYYY-MM-DD
+    """
+    year, number = (int(part) for part in month.split('-'))
+    return f"{month}-01", f"{month}-{calendar.monthrange(year, number)[1]:02d}"
@@ -0,0 +1,213 @@
+import argparse
+import gzip
+import json
+import math
+import os
+from searchIndex import normalize_text, ngrams
+
+# 模型檔案格式版本
+MODEL_VERSION = 1
+
+class NaiveBayesCategoryClassifier:
+    """
+    以字元 n-gram 為特徵的多項式單純貝氏類別分類器
+    從用戶已保存的支出交易學習項目名稱與類別的關係
+
+    訓練結果只保存各類別的 n-gram 計數，載入時預先計算對數機率，預測時只需查表加總
+    """
+
+    def __init__(self, alpha=1.0, max_n=2, min_confidence=0.6):
+        """
+        初始化分類器
+
+        Args:
+            alpha (float): 拉普拉斯平滑參數
+            max_n (int): 最大的 n-gram 長度
+            min_confidence (float): 預測結果的最低後驗機率，低於此值時不給出預測
+        """
+        self.alpha = alpha
+        self.max_n = max_n
+        self.min_confidence = min_confidence
+        self.class_counts = {}
+        self.gram_counts = {}
+        self._prepare()
+
+    def fit(self, transactions):
+        """
+        以交易訓練分類器，收入交易的類別固定為 income，不參與訓練
+
+        Args:
+            transactions (iterable): 交易列表
+
+        Returns:
+            NaiveBayesCategoryClassifier: 分類器本身
+        """
+        class_counts = {}
+        gram_counts = {}
+        for transaction in transactions:
+            if transaction.get('type') != 'expense' or not transaction.get('category'):
+                continue
+            grams = ngrams(normalize_text(transaction.get('item')), self.max_n)
+            if not grams:
+                continue
+            category = transaction['category']
+            class_counts[category] = class_counts.get(category, 0) + 1
+            counts = gram_counts.setdefault(category, {})
+            for gram in grams:
+                counts[gram] = counts.get(gram, 0) + 1
+
+        self.class_counts = class_counts
+        self.gram_counts = gram_counts
+        self._prepare()
+        return self
+
+    def _prepare(self):
+        """預先計算先驗和各 n-gram 的對數機率"""
+        vocabulary = set()
+        for counts in self.gram_counts.values():
+            vocabulary.update(counts)
+
+        total_docs = sum(self.class_counts.values())
+        self._categories = sorted(self.class_counts)
+        self._log_priors = [math.log(self.class_counts[c] / total_docs) for c in self._categories]
+
+        # 每個類別未出現 n-gram 的對數機率，以及出現過的 n-gram 的對數機率
+        self._log_unseen = []
+        self._log_likelihoods = {}
+        for i, category in enumerate(self._categories):
+            counts = self.gram_counts.get(category, {})
+            denominator = sum(counts.values()) + self.alpha * len(vocabulary)
+            self._log_unseen.append(math.log(self.alpha / denominator))
+            for gram, count in counts.items():
+                self._log_likelihoods.setdefault(gram, {})[i] = math.log((count + self.alpha) / denominator)
+
+    @property
+    def trained(self):
+        """是否已有訓練數據"""
+        return bool(self._categories)
+
+    def predict(self, item):
+        """
+        預測項目的類別
+
+        Args:
+            item (str): 項目名稱
+
+        Returns:
+            tuple: (類別, 後驗機率)；沒有已知特徵或信心不足時返回 None
+        """
+        if not self._categories:
+            return None
+
+        grams = [gram for gram in ngrams(normalize_text(item), self.max_n) if gram in self._log_likelihoods]
+        if not grams:
+            return None
+
+        scores = list(self._log_priors)
+        for gram in grams:
+            likelihoods = self._log_likelihoods[gram]
+            for i in range(len(scores)):
+                scores[i] += likelihoods.get(i, self._log_unseen[i])
+
+        # 以 log-sum-exp 計算後驗機率
+        best = max(range(len(scores)), key=scores.__getitem__)
+        normalizer = sum(math.exp(score - scores[best]) for score in scores)
+        confidence = 1 / normalizer
+        if confidence < self.min_confidence:
+            return None
+        return self._categories[best], confidence
+
+    def to_dict(self):
+        """轉換為可序列化的字典"""
+        return {
+            "version": MODEL_VERSION,
+            "alpha": self.alpha,
+            "max_n": self.max_n,
+            "class_counts": self.class_counts,
+            "gram_counts": self.gram_counts,
+        }
+
+    @classmethod
+    def from_dict(cls, data, min_confidence=0.6):
+        """
+        從字典建立分類器
+
+        Args:
+            data (dict): to_dict 的輸出
+            min_confidence (float): 預測結果的最低後驗機率
+
+        Returns:
+            NaiveBayesCategoryClassifier: 分類器
+        """
+        if data.get("version") != MODEL_VERSION:
+            raise ValueError(f"不支援的模型版本: {data.get('version')}")
+        classifier = cls(alpha=data["alpha"], max_n=data["max_n"], min_confidence=min_confidence)
+        classifier.class_counts = data["class_counts"]
+        classifier.gram_counts = data["gram_counts"]
+        classifier._prepare()
+        return classifier
+
+    def save(self, path):
+        """
+        以 gzip 壓縮的 JSON 保存模型，先寫入暫存檔再替換
+
+        Args:
+            path (str): 模型檔案路徑
+        """
+        content = json.dumps(self.to_dict(), ensure_ascii=False, separators=(',', ':'))
+        temp_path = path + ".tmp"
+        with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path, min_confidence=0.6):
+        """
+        載入模型
+
+        Args:
+            path (str): 模型檔案路徑
+            min_confidence (float): 預測結果的最低後驗機率
+
+        Returns:
+            NaiveBayesCategoryClassifier: 分類器
+        """
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f), min_confidence)
+
+def load_classifier(path):
+    """
+    載入分類器模型，檔案不存在或無法讀取時返回 None
+
+    Args:
+        path (str): 模型檔案路徑
+
+    Returns:
+        NaiveBayesCategoryClassifier: 分類器
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return NaiveBayesCategoryClassifier.load(path)
+    except Exception as e:
+        print(f"載入類別模型錯誤: {str(e)}")
+        return None
+
+def main(argv=None):
+    """從存儲中的交易訓練分類器並保存模型"""
+    from dataStorage import create_storage
+
+    parser = argparse.ArgumentParser(description="從已保存的交易訓練類別分類器")
+    parser.add_argument("--storage-type", default="json", help="存儲類型")
+    parser.add_argument("--storage-path", default=None, help="存儲檔案或目錄路徑")
+    parser.add_argument("--output", default="category_model.json.gz", help="模型輸出路徑")
+    args = parser.parse_args(argv)
+
+    storage = create_storage(args.storage_type, args.storage_path)
+    classifier = NaiveBayesCategoryClassifier().fit(storage.get_transactions())
+    classifier.save(args.output)
+    print(f"已訓練 {sum(classifier.class_counts.values())} 筆交易、{len(classifier.class_counts)} 個類別，"
+          f"模型保存到 {args.output}")
+
+if __name__ == '__main__':
+    main()
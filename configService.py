@@ -0,0 +1,209 @@
+import json
+import os
+import threading
+from collections import namedtuple
+from types import MappingProxyType
+
+# 預設配置
+DEFAULT_CONFIG = {
+    "parser_type": "local",
+    "openai_api_key": None,
+    "xai_grok_api_key": None,
+    "openai_model": "gpt-3.5-turbo",
+    "category_model_path": "category_model.json.gz",
+    "item_memo": True,
+    "parser_pool_workers": 0,
+    "storage_type": "json",
+    "storage_path": None,
+    "recurring_scheduler": True,
+    "trace_sample_rate": 0.0,
+    "trace_export_path": None,
+    "trace_debug_header": False
+}
+
+def load_config(config_file='config.json'):
+    """
+    讀取配置檔案
+
+    Args:
+        config_file (str): 配置檔案路徑
+
+    Returns:
+        dict: 配置數據
+    """
+    default_config = dict(DEFAULT_CONFIG)
+
+    try:
+        if os.path.exists(config_file):
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+                # 合併預設配置和讀取的配置
+                for key, value in default_config.items():
+                    if key not in config:
+                        config[key] = value
+                return config
+    except Exception as e:
+        print(f"讀取配置檔案錯誤: {str(e)}")
+
+    return default_config
+
+def save_config(config, config_file='config.json'):
+    """
+    寫入配置檔案，先寫入暫存檔再替換，監看執行緒不會讀到寫到一半的檔案
+
+    Args:
+        config (dict): 配置數據
+        config_file (str): 配置檔案路徑
+    """
+    temp_path = f"{config_file}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(config, f, ensure_ascii=False, indent=4)
+    os.replace(temp_path, config_file)
+
+class ConfigSnapshot(namedtuple('ConfigSnapshot', ['version', 'mtime', 'data'])):
+    """
+    不可變的配置快照
+    version 每次配置內容變更時遞增，data 為唯讀字典
+    """
+    __slots__ = ()
+
+    def get(self, key, default=None):
+        """獲取配置值"""
+        return self.data.get(key, default)
+
+class ConfigService:
+    """
+    配置服務
+    在背景執行緒中依修改時間監看配置檔案，請求路徑只讀取快取的快照，不會讀取檔案
+    """
+
+    def __init__(self, config_file='config.json', interval=1.0, watch=True):
+        """
+        初始化配置服務
+
+        Args:
+            config_file (str): 配置檔案路徑
+            interval (float): 檢查配置檔案的間隔（秒）
+            watch (bool): 是否啟動背景監看執行緒
+        """
+        self.config_file = config_file
+        self.interval = interval
+        self.watch = watch
+        self._snapshot = None
+        self._listeners = []
+        self._lock = threading.Lock()
+        # 序列化 check，監聽器依版本順序收到通知
+        self._check_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._thread = None
+
+    def get(self):
+        """
+        獲取目前的配置快照，第一次呼叫時載入配置並啟動監看
+
+        Returns:
+            ConfigSnapshot: 配置快照
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load(version=1)
+                    if self.watch:
+                        self._start_watcher()
+                snapshot = self._snapshot
+        return snapshot
+
+    def subscribe(self, listener):
+        """
+        註冊配置變更監聽器
+
+        Args:
+            listener (callable): 接收 (舊快照, 新快照) 的函數
+        """
+        self._listeners.append(listener)
+
+    def check(self):
+        """
+        檢查配置檔案是否變更，變更時更新快照並通知監聽器
+
+        同時只有一個執行緒進行檢查，通知監聽器完成後下一個檢查才開始，
+        較舊的配置不會在較新的配置之後才通知
+
+        Returns:
+            bool: 配置內容是否變更
+        """
+        old = self.get()
+        if self._mtime() == old.mtime:
+            return False
+
+        with self._check_lock:
+            with self._lock:
+                # 其他執行緒可能已經載入了這次變更，監聽器只會被通知一次
+                old = self._snapshot
+                if self._mtime() == old.mtime:
+                    return False
+                new = self._load(version=old.version + 1)
+                if new.data == old.data:
+                    # 只有修改時間變更，保留原版本號
+                    self._snapshot = old._replace(mtime=new.mtime)
+                    return False
+                self._snapshot = new
+
+            for listener in list(self._listeners):
+                try:
+                    listener(old, new)
+                except Exception as e:
+                    print(f"配置變更處理錯誤: {str(e)}")
+            return True
+
+    def wake(self):
+        """
+        立即檢查配置檔案，不等待下一個檢查間隔
+        有監看執行緒時喚醒監看執行緒，否則在新的背景執行緒中檢查一次
+        """
+        if self._thread is not None:
+            self._wake_event.set()
+        else:
+            threading.Thread(target=self.check, name="config-check", daemon=True).start()
+
+    def stop(self):
+        """停止背景監看執行緒"""
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _mtime(self):
+        """獲取配置檔案的修改時間，檔案不存在時返回 None"""
+        try:
+            return os.stat(self.config_file).st_mtime
+        except OSError:
+            return None
+
+    def _load(self, version):
+        """讀取配置檔案並建立快照"""
+        mtime = self._mtime()
+        data = load_config(self.config_file)
+        return ConfigSnapshot(version, mtime, MappingProxyType(data))
+
+    def _start_watcher(self):
+        """啟動背景監看執行緒"""
+        self._stop_event.clear()
+        self._wake_event.clear()
+        self._thread = threading.Thread(target=self._watch_loop, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def _watch_loop(self):
+        """背景執行緒：定期檢查配置檔案，被 wake 喚醒時立即檢查"""
+        while True:
+            self._wake_event.wait(self.interval)
+            self._wake_event.clear()
+            if self._stop_event.is_set():
+                break
+            try:
+                self.check()
+            except Exception as e:
+                print(f"檢查配置檔案錯誤: {str(e)}")
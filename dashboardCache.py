@@ -0,0 +1,67 @@
+import collections
+import datetime
+import itertools
+
+# 保留的最新交易筆數，首頁只需要其中幾筆
+DEFAULT_CAPACITY = 50
+
+class DashboardCache:
+    """
+    首頁需要的數據：最新交易的環形緩衝區、每月收支總額以及用戶遊戲化數據
+    以現有的交易建立一次，之後每次保存交易時增量更新；讀取時不需要開啟存儲檔案，
+    所需時間與帳本大小無關
+
+    每月總額以月份為鍵保存，跨月後不需要重建，補記過去日期的交易也會計入所屬月份
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self._recent = collections.deque(maxlen=capacity)
+        self._monthly = {}
+        self._user = {"points": 0, "streak": 0, "last_record_date": None}
+
+    @property
+    def capacity(self):
+        return self._recent.maxlen
+
+    def add_transactions(self, transactions):
+        """
+        以新交易更新快取
+
+        Args:
+            transactions (list): 交易列表，由舊到新排列
+        """
+        for transaction in transactions:
+            self._recent.appendleft(transaction)
+            totals = self._monthly.setdefault(transaction['date'][:7], {"income": 0, "expense": 0})
+            totals[transaction['type']] += transaction['amount']
+
+    def set_user(self, user):
+        """
+        更新用戶遊戲化數據
+
+        Args:
+            user (dict): 用戶遊戲化數據
+        """
+        self._user = dict(user)
+
+    def snapshot(self, limit):
+        """
+        取得首頁需要的數據
+
+        Args:
+            limit (int): 最多返回的交易筆數，不超過 capacity
+
+        Returns:
+            dict: 包含 transactions, summary 和 user 的字典
+        """
+        current_month = datetime.datetime.now().strftime('%Y-%m')
+        totals = self._monthly.get(current_month, {"income": 0, "expense": 0})
+        return {
+            "transactions": list(itertools.islice(self._recent, limit)),
+            "summary": {
+                "income": totals["income"],
+                "expense": totals["expense"],
+                "savings": totals["income"] - totals["expense"]
+            },
+            "user": dict(self._user)
+        }
@@ -1,18 +1,45 @@
 from abc import ABC, abstractmethod
+import datetime
+import time
+from budgets import add_expenses, budget_status, ensure_budgets, month_range
+from dashboardCache import DashboardCache
+from gamification import record_activity, rebuild_activity
+from idempotencyIndex import IdempotencyIndex, date_timestamp
+from metrics import record_cache
+from recurringScheduler import KEY_PREFIX, due_transactions
+from tracing import traced
+
+# 交易的冪等鍵欄位，由客戶端產生；重送同一筆交易時不會重複保存
+IDEMPOTENCY_KEY = "idempotency_key"
+
+# 帶有冪等鍵的交易的保存時間（時間戳記），重新啟動後以保存時間而不是交易日期判斷冪等鍵是否仍在保留期間
+SAVED_AT = "saved_at"
 
 class DataStorage(ABC):
     """
     資料存儲接口
     定義存儲和讀取交易數據的方法
+    
+    子類需要提供 _lock（threading.RLock），保護寫入流程和保存監聽器的註冊
     """
     
+    # 保存監聽器，第一次註冊時才在實例上建立列表
+    _save_listeners = ()
+    
+    # 首頁數據快取，第一次呼叫 get_dashboard 時建立
+    _dashboard = None
+    
+    # 近期已保存的冪等鍵，第一次保存帶有冪等鍵的交易時建立
+    _idempotency_keys = None
+    
     @abstractmethod
-    def save_transaction(self, transaction):
+    def save_transaction(self, transaction, alerts=None):
         """
         保存交易數據
         
         Args:
             transaction (dict): 交易數據，包含 type, item, category, amount
+            alerts (list): 不為 None 時加入這筆交易造成的預算提醒
             
         Returns:
             bool: 是否成功保存
@@ -40,11 +67,471 @@ class DataStorage(ABC):
         pass
     
     @abstractmethod
-    def update_gamification(self):
+    def update_gamification(self, rebuild=False):
         """
         更新遊戲化數據，包括點數和連續記錄天數
         
+        Args:
+            rebuild (bool): 是否以所有交易的日期重新計算，例如匯入大量歷史交易之後；
+                否則將今天標記為有記錄
+        
         Returns:
-            dict: 更新後的用戶遊戲化數據
+            dict: 更新後的用戶遊戲化數據，包含 points, streak, longest_streak, active_days, last_record_date
+        """
+        pass
+    
+    def save_transactions(self, transactions, alerts=None):
         """
-        pass 
\ No newline at end of file
+        保存多筆交易數據
+        
+        預設實現逐筆保存，子類可以在一次寫入中保存全部交易；
+        子類的實現會保留交易已有的日期（例如離線記錄或匯入的交易），沒有日期的交易使用今天，
+        並略過冪等鍵已經保存過的交易
+        
+        Args:
+            transactions (list): 交易數據列表，由舊到新排列
+            alerts (list): 不為 None 時加入這些交易造成的預算提醒，例如支出超過預算的 80%
+            
+        Returns:
+            bool: 是否全部成功保存
+        """
+        return all([self.save_transaction(transaction, alerts) for transaction in transactions])
+    
+    def _prepare_transactions(self, transactions):
+        """
+        整理要保存的交易：沒有日期的交易設定今天的日期，金額轉為浮點數，帶有冪等鍵的交易記錄保存時間
+        
+        驗證只確認金額可以轉為數字，例如 "60"；轉換後各存儲和快取的加總不會因為字串金額失敗
+        
+        Args:
+            transactions (list): 交易數據列表，會直接修改
+            
+        Raises:
+            ValueError: 金額無法轉為數字
+        """
+        today = datetime.datetime.now().strftime('%Y-%m-%d')
+        now = time.time()
+        for transaction in transactions:
+            if not transaction.get('date'):
+                transaction['date'] = today
+            transaction['amount'] = float(transaction['amount'])
+            if transaction.get(IDEMPOTENCY_KEY):
+                transaction[SAVED_AT] = now
+    
+    def get_recent_transactions(self, limit):
+        """
+        獲取最新的交易
+        
+        預設實現從 get_data 取出，子類可以提供更快的實現
+        
+        Args:
+            limit (int): 最多返回的交易筆數
+            
+        Returns:
+            list: 交易列表，最新的在最前面
+        """
+        return self.get_data()['transactions'][:limit]
+    
+    def get_transactions(self, start_date=None, end_date=None):
+        """
+        獲取日期範圍內的交易
+        
+        預設實現從 get_data 篩選，子類可以只讀取範圍內的數據
+        
+        Args:
+            start_date (str): 起始日期 YYYY-MM-DD（包含），為 None 時不限制
+            end_date (str): 結束日期 YYYY-MM-DD（包含），為 None 時不限制
+            
+        Returns:
+            list: 交易列表，最新的在最前面
+        """
+        return [
+            transaction for transaction in self.get_data()['transactions']
+            if (not start_date or transaction['date'] >= start_date)
+            and (not end_date or transaction['date'] <= end_date)
+        ]
+    
+    def iter_transactions(self, start_date=None, end_date=None):
+        """
+        逐筆獲取日期範圍內的交易，用於匯出等需要走訪全部交易的操作
+        
+        預設實現從 get_transactions 取出，需要一次讀取範圍內的全部交易；
+        子類可以逐段讀取，記憶體用量不隨交易筆數增加
+        
+        Args:
+            start_date (str): 起始日期 YYYY-MM-DD（包含），為 None 時不限制
+            end_date (str): 結束日期 YYYY-MM-DD（包含），為 None 時不限制
+            
+        Returns:
+            iterator: 交易，依日期由舊到新排列，同一天的交易依保存順序
+        """
+        # 補記、離線和定期交易的保存順序與日期不同，依日期穩定排序
+        return iter(sorted(reversed(self.get_transactions(start_date, end_date)),
+                           key=lambda transaction: transaction['date']))
+    
+    def get_dashboard(self, limit=5):
+        """
+        獲取首頁需要的數據：最新的交易、當月總覽和用戶遊戲化數據
+        
+        第一次呼叫時讀取全部交易建立快取，之後由每次保存增量更新，不再讀取存儲；
+        讀取失敗時拋出例外且不建立快取，不會快取空白的帳本
+        
+        Args:
+            limit (int): 最多返回的交易筆數
+            
+        Returns:
+            dict: 包含 transactions, summary 和 user 的字典
+        """
+        with self._lock:
+            hit = self._dashboard is not None
+            if not hit:
+                # get_data 讀取失敗時返回空白數據，這裡使用會拋出例外的讀取方法
+                user = self._read_metadata()['user']
+                transactions = self.get_transactions()
+                dashboard = DashboardCache()
+                dashboard.add_transactions(list(reversed(transactions)))
+                dashboard.set_user(user)
+                self._dashboard = dashboard
+            record_cache("dashboard", hit)
+            return self._dashboard.snapshot(limit)
+    
+    def set_budget(self, category, limit):
+        """
+        設定類別的每月預算
+        
+        Args:
+            category (str): 類別
+            limit (float): 每月預算，為 0 或 None 時移除預算
+            
+        Returns:
+            list: 當月每個有預算的類別的使用情況
+        """
+        with self._lock:
+            data = self._read_metadata()
+            limits = ensure_budgets(data)['limits']
+            if limit:
+                limits[category] = limit
+            else:
+                limits.pop(category, None)
+            status = budget_status(data['budgets'], datetime.datetime.now().strftime('%Y-%m'), self._month_transactions)
+            self._write_metadata(data)
+            return status
+    
+    def get_budget_status(self):
+        """
+        獲取當月每個有預算的類別的使用情況，使用保存的累計支出，不讀取交易
+        
+        Returns:
+            list: 每個類別的 category, limit, spent, remaining, ratio
+        """
+        month = datetime.datetime.now().strftime('%Y-%m')
+        with self._lock:
+            data = self._read_metadata()
+            budgets = ensure_budgets(data)
+            if not budgets['limits']:
+                return []
+            tracked = month in budgets['spent']
+            status = budget_status(budgets, month, self._month_transactions)
+            if not tracked:
+                self._write_metadata(data)
+            return status
+    
+    def get_recurring_rules(self):
+        """
+        獲取定期交易規則
+        
+        Returns:
+            list: 定期交易規則列表
+        """
+        with self._lock:
+            return [dict(rule) for rule in self._read_metadata().get('recurring', [])]
+    
+    def add_recurring_rule(self, rule):
+        """
+        新增定期交易規則，到期的交易由 materialize_recurring 保存
+        
+        Args:
+            rule (dict): recurringScheduler.new_rule 建立的規則
+        """
+        with self._lock:
+            data = self._read_metadata()
+            data.setdefault('recurring', []).append(rule)
+            self._write_metadata(data)
+    
+    def remove_recurring_rule(self, rule_id):
+        """
+        移除定期交易規則，已經保存的交易不受影響
+        
+        Args:
+            rule_id (str): 規則編號
+            
+        Returns:
+            bool: 規則是否存在
+        """
+        with self._lock:
+            data = self._read_metadata()
+            rules = data.get('recurring', [])
+            remaining = [rule for rule in rules if rule['id'] != rule_id]
+            if len(remaining) == len(rules):
+                return False
+            data['recurring'] = remaining
+            self._write_metadata(data)
+            return True
+    
+    def materialize_recurring(self, today):
+        """
+        以一次 save_transactions 保存到今天為止所有到期的定期交易，包括停機期間錯過的每一期
+        
+        交易帶有規則編號和日期組成的冪等鍵，保存後才推進規則的 next_date；
+        保存前以冪等鍵對照最早一期之後已保存的交易，不受冪等鍵索引保留期間限制，
+        推進前中斷時，重新執行不會重複保存任何一期
+        
+        Args:
+            today (datetime.date): 今天
+            
+        Returns:
+            int: 實際保存的交易筆數，不包括已經保存過的交易
+        """
+        with self._lock:
+            rules = self._read_metadata().get('recurring')
+            if not rules:
+                return 0
+            transactions, next_dates = due_transactions(rules, today)
+            if not transactions:
+                return 0
+            saved_keys = {key for key, _, _ in self._load_idempotency_keys(transactions[0]['date'])}
+            transactions = [transaction for transaction in transactions
+                            if transaction[IDEMPOTENCY_KEY] not in saved_keys]
+            if transactions and not self.save_transactions(transactions):
+                raise IOError("保存定期交易失敗")
+            
+            # 保存交易會寫入中繼數據，重新讀取後再推進規則
+            data = self._read_metadata()
+            for rule in data['recurring']:
+                if rule['id'] in next_dates:
+                    rule['next_date'] = next_dates[rule['id']]
+            self._write_metadata(data)
+            return len(transactions)
+    
+    @abstractmethod
+    def _read_metadata(self):
+        """
+        讀取包含用戶數據和預算的字典
+        
+        Returns:
+            dict: 可以直接修改並以 _write_metadata 保存的字典
+        """
+        pass
+    
+    @abstractmethod
+    def _write_metadata(self, data):
+        """
+        保存 _read_metadata 返回的字典
+        
+        Args:
+            data (dict): _read_metadata 返回並修改後的字典
+        """
+        pass
+    
+    def _month_transactions(self, month):
+        """
+        獲取某月已保存的交易，用於第一次使用某個月份時建立累計支出
+        
+        Args:
+            month (str): 月份 YYYY-MM
+            
+        Returns:
+            list: 交易列表
+        """
+        return self.get_transactions(*month_range(month))
+    
+    def _update_budgets_internal(self, data, transactions):
+        """
+        以新交易更新累計支出，子類在寫入交易前、持有 _lock 時呼叫，
+        第一次使用某個月份時讀取的交易不包含這些新交易
+        
+        Args:
+            data (dict): 包含用戶數據和預算的字典
+            transactions (list): 新交易，由舊到新排列
+            
+        Returns:
+            list: 預算提醒列表
+        """
+        budgets = data.get('budgets')
+        if not budgets:
+            return []
+        if not budgets['limits']:
+            # 沒有預算時不追蹤支出，設定預算時再從交易建立
+            budgets['spent'].clear()
+            return []
+        return add_expenses(budgets, transactions, self._month_transactions)
+    
+    def add_save_listener(self, listener, replay=False):
+        """
+        註冊保存監聽器，每次成功保存交易後以新交易列表呼叫
+        
+        Args:
+            listener (callable): 接收交易列表的函數，列表由舊到新排列
+            replay (bool): 是否先以現有的全部交易呼叫一次；註冊和重播期間不會有新的寫入，
+                監聽器不會遺漏或重複收到交易
+        """
+        with self._lock:
+            if not self._save_listeners:
+                self._save_listeners = []
+            self._save_listeners.append(listener)
+            if replay:
+                listener(list(reversed(self.get_transactions())))
+    
+    def _remove_duplicates(self, transactions):
+        """
+        移除冪等鍵已經保存過的交易，包括同一批中重複的交易，子類在寫入前、持有 _lock 時呼叫
+        
+        冪等鍵索引有界，只保留近期的冪等鍵，查詢是 O(1)，重送的交易不需要讀取存儲
+        
+        Args:
+            transactions (list): 交易數據列表
+            
+        Returns:
+            list: 需要保存的交易列表
+        """
+        if not any(transaction.get(IDEMPOTENCY_KEY) for transaction in transactions):
+            return transactions
+        if self._idempotency_keys is None:
+            self._idempotency_keys = self._build_idempotency_index()
+        
+        fresh = []
+        batch_keys = set()
+        for transaction in transactions:
+            key = transaction.get(IDEMPOTENCY_KEY)
+            if key:
+                duplicate = key in self._idempotency_keys or key in batch_keys
+                record_cache("idempotency", duplicate)
+                if duplicate:
+                    continue
+                batch_keys.add(key)
+            fresh.append(transaction)
+        return fresh
+    
+    def _build_idempotency_index(self):
+        """
+        以保存時間在保留期間內的冪等鍵建立索引
+        
+        依保存時間而不是交易日期判斷，離線佇列重送的較早日期交易在重新啟動後仍然會被去重；
+        沒有保存時間的舊交易使用交易日期
+        
+        Returns:
+            IdempotencyIndex: 冪等鍵索引
+        """
+        index = IdempotencyIndex()
+        cutoff = index.cutoff()
+        entries = []
+        for key, date, saved_at in self._load_idempotency_keys():
+            added = saved_at if saved_at is not None else date_timestamp(date)
+            if added >= cutoff:
+                entries.append((added, key))
+        for added, key in sorted(entries):
+            index.add(key, added)
+        return index
+    
+    def _load_idempotency_keys(self, start_date=None):
+        """
+        讀取已保存的冪等鍵
+        
+        預設實現從 get_transactions 取出，沒有將冪等鍵存放在交易中的子類需要覆寫
+        
+        Args:
+            start_date (str): 只讀取交易日期在這一天之後（包含）的冪等鍵，為 None 時讀取全部
+            
+        Returns:
+            list: (冪等鍵, 交易日期, 保存時間) 列表，沒有記錄保存時間的舊交易保存時間為 None
+        """
+        return [(transaction[IDEMPOTENCY_KEY], transaction['date'], transaction.get(SAVED_AT))
+                for transaction in self.get_transactions(start_date)
+                if transaction.get(IDEMPOTENCY_KEY)]
+    
+    def _notify_saved(self, transactions):
+        """
+        通知保存監聽器，子類在寫入成功後、釋放 _lock 前呼叫
+        
+        Args:
+            transactions (list): 新保存的交易，由舊到新排列
+        """
+        if self._idempotency_keys is not None:
+            for transaction in transactions:
+                if transaction.get(IDEMPOTENCY_KEY):
+                    self._idempotency_keys.add(transaction[IDEMPOTENCY_KEY])
+        # 快取更新失敗不影響已經成功的保存，下次建立快取時重新讀取
+        if self._dashboard is not None:
+            try:
+                self._dashboard.add_transactions(transactions)
+            except Exception as e:
+                print(f"首頁數據快取更新錯誤: {str(e)}")
+                self._dashboard = None
+        for listener in self._save_listeners:
+            try:
+                listener(transactions)
+            except Exception as e:
+                print(f"保存監聽器錯誤: {str(e)}")
+    
+    @traced("storage.update_gamification")
+    def _update_gamification_internal(self, data, dates=None):
+        """
+        內部更新遊戲化數據，並同步到首頁數據快取
+        
+        Args:
+            data (dict): 完整數據字典
+            dates (list): 有記錄的日期 YYYY-MM-DD，為 None 時使用今天；補記的交易計入交易日期，為空列表時不標記
+        """
+        if dates is None:
+            dates = [datetime.datetime.now().strftime('%Y-%m-%d')]
+        if dates:
+            record_activity(data['user'], dates)
+        if self._dashboard is not None:
+            self._dashboard.set_user(data['user'])
+    
+    def _activity_dates(self, transactions):
+        """
+        獲取計入遊戲化數據的交易日期，定期交易規則自動產生的交易不是用戶的記錄活動
+        
+        Args:
+            transactions (list): 交易數據列表
+            
+        Returns:
+            list: 日期 YYYY-MM-DD 列表
+        """
+        return [transaction['date'] for transaction in transactions
+                if not str(transaction.get(IDEMPOTENCY_KEY) or '').startswith(f"{KEY_PREFIX}:")]
+    
+    @traced("storage.rebuild_gamification")
+    def _rebuild_gamification_internal(self, data):
+        """
+        以所有交易的日期重新計算遊戲化數據，例如匯入大量歷史交易之後
+        
+        Args:
+            data (dict): 完整數據字典
+        """
+        rebuild_activity(data['user'], self._activity_dates(self.get_transactions()))
+        if self._dashboard is not None:
+            self._dashboard.set_user(data['user'])
+
+# 工廠函數，用於創建存儲實例
+def create_storage(storage_type="json", path=None):
+    """
+    創建存儲實例
+    
+    Args:
+        storage_type (str): 存儲類型，可選值為 "json", "binary_log", "partitioned"
+        path (str): 存儲檔案或目錄路徑，為 None 時使用各存儲的預設值
+        
+    Returns:
+        DataStorage: 存儲實例
+    """
+    if storage_type == "binary_log":
+        from binaryLogStorage import BinaryLogStorage
+        return BinaryLogStorage(path) if path else BinaryLogStorage()
+    elif storage_type == "partitioned":
+        from partitionedJsonStorage import PartitionedJsonStorage
+        return PartitionedJsonStorage(path) if path else PartitionedJsonStorage()
+    else:  # 預設使用本地 JSON 文件
+        from localJsonStorage import LocalJsonStorage
+        return LocalJsonStorage(path) if path else LocalJsonStorage()
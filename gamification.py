@@ -0,0 +1,149 @@
+import datetime
+
+# 每個有記錄的日子獲得的點數
+POINTS_PER_DAY = 10
+
+class ActivityBitmap:
+    """
+    每日記錄活動的點陣圖
+    第 i 個位元表示 origin 之後第 i 天是否有記錄，以 Python 整數保存，一年約 46 個位元組；
+    連續天數、最長連續天數和記錄天數都以位元運算計算，不需要逐日比較日期字串
+
+    補記的日期早於 origin 時整個點陣圖左移，匯入歷史交易後也只需要標記各個日期
+    """
+
+    def __init__(self, origin=None, bits=0):
+        """
+        初始化點陣圖
+
+        Args:
+            origin (datetime.date): 第 0 個位元對應的日期，沒有記錄時為 None
+            bits (int): 點陣圖
+        """
+        self.origin = origin
+        self.bits = bits
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        從 to_dict 的結果建立點陣圖
+
+        Args:
+            data (dict): 包含 origin 和 bits（十六進位字串）的字典
+
+        Returns:
+            ActivityBitmap: 點陣圖
+        """
+        if not data or not data.get('origin'):
+            return cls()
+        origin = datetime.datetime.strptime(data['origin'], '%Y-%m-%d').date()
+        return cls(origin, int(data.get('bits') or '0', 16))
+
+    def to_dict(self):
+        """
+        轉為可以 JSON 序列化的字典
+
+        Returns:
+            dict: 包含 origin 和 bits（十六進位字串）的字典
+        """
+        return {
+            "origin": self.origin.strftime('%Y-%m-%d') if self.origin else None,
+            "bits": format(self.bits, 'x')
+        }
+
+    def mark(self, date):
+        """
+        標記某一天有記錄
+
+        Args:
+            date (datetime.date): 日期
+        """
+        if self.origin is None:
+            self.origin = date
+        elif date < self.origin:
+            self.bits <<= (self.origin - date).days
+            self.origin = date
+        self.bits |= 1 << (date - self.origin).days
+
+    def active_days(self):
+        """有記錄的天數"""
+        return bin(self.bits).count('1')
+
+    def last_active(self):
+        """最近一次記錄的日期，沒有記錄時返回 None"""
+        if not self.bits:
+            return None
+        return self.origin + datetime.timedelta(days=self.bits.bit_length() - 1)
+
+    def current_streak(self):
+        """到最近一次記錄為止的連續記錄天數"""
+        if not self.bits:
+            return 0
+        last = self.bits.bit_length() - 1
+        # 最近一次記錄之前最後一個沒有記錄的日子
+        gaps = ~self.bits & ((1 << last) - 1)
+        return last - gaps.bit_length() + 1 if gaps else last + 1
+
+    def longest_streak(self):
+        """最長連續記錄天數：每次與左移一位的自己取交集，連續區段縮短一天"""
+        bits = self.bits
+        streak = 0
+        while bits:
+            bits &= bits << 1
+            streak += 1
+        return streak
+
+def _load_bitmap(user):
+    """
+    讀取用戶的點陣圖，舊格式的用戶數據以 last_record_date 和 streak 還原最近的連續區段
+
+    Returns:
+        tuple: (點陣圖, 點陣圖以外的額外點數)
+    """
+    if 'activity' in user:
+        return ActivityBitmap.from_dict(user['activity']), user['activity'].get('bonus_points', 0)
+    bitmap = ActivityBitmap()
+    if user.get('last_record_date'):
+        last = datetime.datetime.strptime(user['last_record_date'], '%Y-%m-%d').date()
+        streak = max(user.get('streak') or 1, 1)
+        bitmap.origin = last - datetime.timedelta(days=streak - 1)
+        bitmap.bits = (1 << streak) - 1
+    # 保留舊格式中無法還原的點數，點數不會因為轉換而減少
+    bonus = max((user.get('points') or 0) - POINTS_PER_DAY * bitmap.active_days(), 0)
+    return bitmap, bonus
+
+def _store_bitmap(user, bitmap, bonus):
+    """將點陣圖和計算結果寫回用戶數據"""
+    last = bitmap.last_active()
+    user['points'] = POINTS_PER_DAY * bitmap.active_days() + bonus
+    user['streak'] = bitmap.current_streak()
+    user['longest_streak'] = bitmap.longest_streak()
+    user['active_days'] = bitmap.active_days()
+    user['last_record_date'] = last.strftime('%Y-%m-%d') if last else None
+    user['activity'] = dict(bitmap.to_dict(), bonus_points=bonus)
+
+def record_activity(user, dates):
+    """
+    標記有記錄的日期並更新點數和連續天數
+
+    Args:
+        user (dict): 用戶遊戲化數據，會直接修改
+        dates (iterable): 日期字串 YYYY-MM-DD
+    """
+    bitmap, bonus = _load_bitmap(user)
+    for date in set(dates):
+        bitmap.mark(datetime.datetime.strptime(date, '%Y-%m-%d').date())
+    _store_bitmap(user, bitmap, bonus)
+
+def rebuild_activity(user, dates):
+    """
+    以全部交易的日期重新計算點陣圖，例如匯入大量歷史交易之後
+
+    Args:
+        user (dict): 用戶遊戲化數據，會直接修改
+        dates (iterable): 所有交易的日期字串 YYYY-MM-DD
+    """
+    bitmap = ActivityBitmap()
+    for date in set(dates):
+        bitmap.mark(datetime.datetime.strptime(date, '%Y-%m-%d').date())
+    _store_bitmap(user, bitmap, 0)
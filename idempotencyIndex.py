@@ -0,0 +1,95 @@
+import collections
+import datetime
+import time
+
+# 冪等鍵保留的時間：離線佇列可能在數天後才重送
+DEFAULT_TTL = 7 * 24 * 3600
+
+# 最多保留的冪等鍵數
+DEFAULT_CAPACITY = 100000
+
+class IdempotencyIndex:
+    """
+    有界的冪等鍵索引
+    依加入順序保存冪等鍵和加入時間，超過 ttl 或 capacity 時從最舊的開始淘汰；
+    查詢和加入都是 O(1)，記憶體用量不隨帳本大小增加
+
+    重送通常在數秒到數天內發生，淘汰的鍵對應的交易已不會再被重送
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, capacity=DEFAULT_CAPACITY, clock=time.time):
+        """
+        初始化冪等鍵索引
+
+        Args:
+            ttl (float): 冪等鍵保留的時間（秒）
+            capacity (int): 最多保留的冪等鍵數
+            clock (callable): 返回目前時間（秒）的函數
+        """
+        self.ttl = ttl
+        self.capacity = capacity
+        self._clock = clock
+        self._keys = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        added = self._keys.get(key)
+        if added is None:
+            return False
+        if self._clock() - added > self.ttl:
+            del self._keys[key]
+            return False
+        return True
+
+    def cutoff(self):
+        """
+        仍在保留期間內的最早加入時間
+
+        Returns:
+            float: 時間戳記
+        """
+        return self._clock() - self.ttl
+
+    def cutoff_date(self):
+        """
+        仍在保留期間內的最早日期，用於只讀取近期的交易建立索引
+
+        Returns:
+            str: 日期 YYYY-MM-DD
+        """
+        return datetime.date.fromtimestamp(self._clock() - self.ttl).strftime('%Y-%m-%d')
+
+    def add(self, key, added=None):
+        """
+        加入冪等鍵
+
+        Args:
+            key (str): 冪等鍵
+            added (float): 加入時間，為 None 時使用目前時間；從存儲建立索引時使用交易的保存時間
+        """
+        now = self._clock()
+        self._keys[key] = now if added is None else added
+        self._keys.move_to_end(key)
+        self._evict(now)
+
+    def _evict(self, now):
+        """從最舊的開始淘汰過期或超過容量的冪等鍵"""
+        while self._keys:
+            oldest_key, oldest = next(iter(self._keys.items()))
+            if len(self._keys) <= self.capacity and now - oldest <= self.ttl:
+                break
+            del self._keys[oldest_key]
+
+def date_timestamp(date):
+    """
+    將交易日期轉為時間戳記
+
+    Args:
+        date (str): 日期 YYYY-MM-DD
+
+    Returns:
+        float: 當天零時的時間戳記
+    """
+    return time.mktime(datetime.datetime.strptime(date, '%Y-%m-%d').timetuple())
@@ -0,0 +1,143 @@
+import threading
+from aiParser import AIParser, AMOUNT_PATTERN, split_utterance
+from metrics import record_cache
+from searchIndex import normalize_text
+from amountNormalizer import normalize_amounts
+
+class ItemMemo:
+    """
+    項目名稱到 (類別, 類型, 常見金額) 的查詢表
+    從歷史交易建立，每次保存交易時增量更新；查詢結果在更新時預先算好，查詢只需一次字典查找
+
+    類別和類型取出現次數最多的值，金額取最常出現的金額，次數相同時以最近一次為準
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._results = {}
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._results)
+
+    def add_transactions(self, transactions):
+        """
+        以交易更新查詢表
+
+        Args:
+            transactions (list): 交易列表，由舊到新排列
+        """
+        with self._lock:
+            for transaction in transactions:
+                key = normalize_text(transaction.get('item'))
+                if not key:
+                    continue
+                self._sequence += 1
+                entry = self._entries.setdefault(key, {"category": {}, "type": {}, "amount": {}})
+                for field in ("category", "type", "amount"):
+                    counts = entry[field]
+                    count, _ = counts.get(transaction[field], (0, 0))
+                    counts[transaction[field]] = (count + 1, self._sequence)
+                self._results[key] = {
+                    field: max(entry[field].items(), key=lambda pair: pair[1])[0]
+                    for field in ("category", "type", "amount")
+                }
+
+    def lookup(self, item):
+        """
+        查詢項目
+
+        Args:
+            item (str): 項目名稱
+
+        Returns:
+            dict: 包含 category, type, amount 的字典，未知項目返回 None
+        """
+        result = self._results.get(normalize_text(item))
+        record_cache("item_memo", result is not None)
+        return result
+
+class MemoizedParser(AIParser):
+    """
+    先查詢項目查詢表的解析器
+    已知項目直接使用歷史上的類別和類型，不呼叫其他解析器；未知項目交給被包裝的解析器
+    """
+
+    def __init__(self, parser, memo):
+        """
+        初始化解析器
+
+        Args:
+            parser (AIParser): 未知項目使用的解析器
+            memo (ItemMemo): 項目查詢表
+        """
+        self.parser = parser
+        self.memo = memo
+
+    def parse_transaction(self, text):
+        """
+        解析交易文本
+
+        Args:
+            text (str): 語音識別文本，例如「咖啡 5 元」
+
+        Returns:
+            dict: 解析後的交易數據
+        """
+        result = self._lookup(normalize_amounts(text))
+        if result is None:
+            return self.parser.parse_transaction(text)
+        return result
+
+    def parse_transactions(self, text):
+        """
+        解析可能包含多筆交易的文本
+        所有項目都是已知項目時直接使用查詢表，否則整段交給被包裝的解析器，只需一次呼叫
+
+        Args:
+            text (str): 語音識別文本，例如「早餐 60 午餐 120」
+
+        Returns:
+            list: 解析後的交易數據列表
+        """
+        results = []
+        for segment in split_utterance(text):
+            result = self._lookup(segment)
+            if result is None:
+                return self.parser.parse_transactions(text)
+            results.append(result)
+        return results
+
+    def _lookup(self, text):
+        """
+        以查詢表解析已正規化的單筆交易文本
+
+        Args:
+            text (str): 已正規化的單筆交易文本
+
+        Returns:
+            dict: 解析後的交易數據，未知項目返回 None
+        """
+        amount_match = AMOUNT_PATTERN.search(text)
+        item = text[:amount_match.start()].strip() if amount_match else text.strip()
+
+        known = self.memo.lookup(item) if item else None
+        if known is None:
+            return None
+
+        return {
+            "type": known["type"],
+            "item": item,
+            "category": known["category"],
+            # 沒有說出金額時使用最常見的金額
+            "amount": float(amount_match.group(1)) if amount_match else float(known["amount"])
+        }
+
+    def warm_up(self):
+        """預熱被包裝的解析器"""
+        self.parser.warm_up()
+
+    def close(self):
+        """釋放被包裝的解析器的資源"""
+        self.parser.close()
@@ -0,0 +1,66 @@
+import threading
+
+class LazyInstance:
+    """
+    延遲初始化的執行緒安全單例
+    第一次使用時才呼叫工廠函數建立實例，之後的屬性存取直接轉發給該實例
+    """
+
+    def __init__(self, factory):
+        """
+        初始化延遲實例
+
+        Args:
+            factory (callable): 無參數的工廠函數，返回實際的實例
+        """
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        獲取實例，如果尚未建立則建立
+
+        Returns:
+            object: 實際的實例
+        """
+        instance = self._instance
+        if instance is None:
+            # 雙重檢查鎖定，確保多個執行緒同時存取時只建立一次
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    instance = self._factory()
+                    self._instance = instance
+        return instance
+
+    def reset(self):
+        """丟棄目前的實例，下次使用時重新建立"""
+        with self._lock:
+            self._instance = None
+
+    def swap(self, instance):
+        """
+        以新的實例原子地替換目前的實例
+        已經取得舊實例的呼叫者會繼續使用舊實例完成工作
+
+        Args:
+            instance (object): 新的實例
+
+        Returns:
+            object: 被替換的舊實例，尚未建立時為 None
+        """
+        with self._lock:
+            old, self._instance = self._instance, instance
+        return old
+
+    @property
+    def initialized(self):
+        """是否已經建立實例"""
+        return self._instance is not None
+
+    def __getattr__(self, name):
+        # 私有和特殊屬性不轉發，避免 inspect 或 mock 之類的檢查意外觸發初始化
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
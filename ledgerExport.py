@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+
+# 匯出的欄位，各種存儲都保存這些欄位
+EXPORT_FIELDS = ("date", "type", "item", "category", "amount")
+
+# 可以使用的匯出格式和對應的 MIME 類型
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson; charset=utf-8"
+}
+
+# 每個輸出區塊包含的交易筆數
+CHUNK_ROWS = 1000
+
+# 試算表會將這些字元開頭的儲存格當作公式
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def _csv_cell(value):
+    """將文字欄位轉為儲存格，公式開頭的文字加上單引號，避免開啟檔案時執行公式"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def _drain(buffer):
+    """取出緩衝區的內容並清空"""
+    content = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return content
+
+def export_chunks(transactions, export_format):
+    """
+    將交易逐段轉為匯出格式
+
+    標頭和第一筆交易立即輸出，之後每 CHUNK_ROWS 筆輸出一個區塊；只保留目前區塊的內容，
+    記憶體用量不隨交易筆數增加
+
+    Args:
+        transactions (iterable): 交易，例如 DataStorage.iter_transactions 返回的產生器
+        export_format (str): 匯出格式，EXPORT_FORMATS 的鍵
+
+    Yields:
+        str: 匯出內容的區塊
+    """
+    buffer = io.StringIO()
+    if export_format == "csv":
+        writer = csv.writer(buffer)
+        # 加上 BOM，試算表軟體才會以 UTF-8 開啟中文內容
+        buffer.write("\ufeff")
+        writer.writerow(EXPORT_FIELDS)
+        yield _drain(buffer)
+        write_row = lambda transaction: writer.writerow([_csv_cell(transaction[field]) for field in EXPORT_FIELDS])
+    else:
+        write_row = lambda transaction: buffer.write(
+            json.dumps({field: transaction[field] for field in EXPORT_FIELDS}, ensure_ascii=False) + "\n")
+
+    for rows, transaction in enumerate(transactions, 1):
+        write_row(transaction)
+        if rows == 1 or rows % CHUNK_ROWS == 0:
+            yield _drain(buffer)
+    if buffer.tell():
+        yield _drain(buffer)
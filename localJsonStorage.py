@@ -1,7 +1,10 @@
 import json
 import os
 import datetime
+import threading
 from dataStorage import DataStorage
+from metrics import STORAGE_OPERATION_DURATION, STORAGE_BYTES
+from tracing import traced
 
 class LocalJsonStorage(DataStorage):
     """
@@ -17,6 +20,8 @@ class LocalJsonStorage(DataStorage):
             file_path (str): JSON 文件路徑
         """
         self.file_path = file_path
+        # 保護讀取-修改-寫入流程，避免多執行緒同時寫入造成檔案損壞
+        self._lock = threading.RLock()
         self._ensure_file_exists()
     
     def _ensure_file_exists(self):
@@ -33,42 +38,86 @@ class LocalJsonStorage(DataStorage):
             with open(self.file_path, 'w', encoding='utf-8') as f:
                 json.dump(initial_data, f, ensure_ascii=False, indent=2)
     
+    @traced("storage.read_data")
     def _read_data(self):
         """讀取 JSON 文件數據"""
-        with open(self.file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with self._lock, STORAGE_OPERATION_DURATION.labels(operation="read").time():
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        STORAGE_BYTES.labels(operation="read").inc(os.path.getsize(self.file_path))
+        return data
     
+    @traced("storage.write_data")
     def _write_data(self, data):
         """寫入數據到 JSON 文件"""
-        with open(self.file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        content = json.dumps(data, ensure_ascii=False, indent=2)
+        with self._lock, STORAGE_OPERATION_DURATION.labels(operation="write").time():
+            with open(self.file_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+        STORAGE_BYTES.labels(operation="write").inc(len(content.encode('utf-8')))
+    
+    def _read_metadata(self):
+        """讀取完整數據，預算與交易保存在同一個檔案"""
+        return self._read_data()
+    
+    def _write_metadata(self, data):
+        """寫入完整數據"""
+        self._write_data(data)
     
-    def save_transaction(self, transaction):
+    def save_transaction(self, transaction, alerts=None):
         """
         保存交易數據
         
         Args:
             transaction (dict): 交易數據，包含 type, item, category, amount
+            alerts (list): 不為 None 時加入這筆交易造成的預算提醒
             
         Returns:
             bool: 是否成功保存
         """
-        try:
-            # 添加日期
-            transaction['date'] = datetime.datetime.now().strftime('%Y-%m-%d')
-            
-            # 讀取現有數據
-            data = self._read_data()
-            
-            # 添加新交易
-            data['transactions'].insert(0, transaction)  # 新交易放在最前面
+        # 添加日期
+        transaction['date'] = datetime.datetime.now().strftime('%Y-%m-%d')
+        return self.save_transactions([transaction], alerts)
+    
+    def save_transactions(self, transactions, alerts=None):
+        """
+        在一次讀寫中保存多筆交易數據
+        
+        Args:
+            transactions (list): 交易數據列表，由舊到新排列
+            alerts (list): 不為 None 時加入這些交易造成的預算提醒
             
-            # 更新遊戲化數據
-            self._update_gamification_internal(data)
+        Returns:
+            bool: 是否成功保存
+        """
+        try:
+            # 沒有日期的交易使用今天，金額轉為數字
+            self._prepare_transactions(transactions)
             
-            # 保存數據
-            self._write_data(data)
+            with self._lock:
+                # 略過已經保存過的重送交易
+                transactions = self._remove_duplicates(transactions)
+                if not transactions:
+                    return True
+                
+                # 讀取現有數據
+                data = self._read_data()
+                
+                # 更新預算的累計支出，需要在加入新交易前進行
+                budget_alerts = self._update_budgets_internal(data, transactions)
+                
+                # 添加新交易，新交易放在最前面
+                data['transactions'][:0] = reversed(transactions)
+                
+                # 更新遊戲化數據
+                self._update_gamification_internal(data, self._activity_dates(transactions))
+                
+                # 保存數據
+                self._write_data(data)
+                self._notify_saved(transactions)
             
+            if alerts is not None:
+                alerts.extend(budget_alerts)
             return True
         except Exception as e:
             print(f"保存交易錯誤: {str(e)}")
@@ -93,6 +142,23 @@ class LocalJsonStorage(DataStorage):
             print(f"獲取數據錯誤: {str(e)}")
             return {"transactions": [], "user": {"points": 0, "streak": 0}, "summary": {"income": 0, "expense": 0, "savings": 0}}
     
+    def get_transactions(self, start_date=None, end_date=None):
+        """
+        獲取日期範圍內的交易，讀取失敗時拋出例外
+        
+        Args:
+            start_date (str): 起始日期 YYYY-MM-DD（包含），為 None 時不限制
+            end_date (str): 結束日期 YYYY-MM-DD（包含），為 None 時不限制
+            
+        Returns:
+            list: 交易列表，最新的在最前面
+        """
+        return [
+            transaction for transaction in self._read_data()['transactions']
+            if (not start_date or transaction['date'] >= start_date)
+            and (not end_date or transaction['date'] <= end_date)
+        ]
+    
     def get_monthly_summary(self):
         """
         獲取當月交易總覽
@@ -130,55 +196,25 @@ class LocalJsonStorage(DataStorage):
             print(f"獲取月度總覽錯誤: {str(e)}")
             return {"income": 0, "expense": 0, "savings": 0}
     
-    def update_gamification(self):
+    def update_gamification(self, rebuild=False):
         """
         更新遊戲化數據，包括點數和連續記錄天數
         
+        Args:
+            rebuild (bool): 是否以所有交易的日期重新計算，否則將今天標記為有記錄
+        
         Returns:
             dict: 更新後的用戶遊戲化數據
         """
         try:
-            data = self._read_data()
-            self._update_gamification_internal(data)
-            self._write_data(data)
+            with self._lock:
+                data = self._read_data()
+                if rebuild:
+                    self._rebuild_gamification_internal(data)
+                else:
+                    self._update_gamification_internal(data)
+                self._write_data(data)
             return data['user']
         except Exception as e:
             print(f"更新遊戲化數據錯誤: {str(e)}")
             return {"points": 0, "streak": 0}
-    
-    def _update_gamification_internal(self, data):
-        """
-        內部更新遊戲化數據
-        
-        Args:
-            data (dict): 完整數據字典
-        """
-        today = datetime.datetime.now().strftime('%Y-%m-%d')
-        user = data['user']
-        
-        # 如果是第一次記錄
-        if user['last_record_date'] is None:
-            user['points'] = 10
-            user['streak'] = 1
-            user['last_record_date'] = today
-            return
-        
-        # 如果今天已經記錄過，不重複計算
-        if user['last_record_date'] == today:
-            return
-        
-        # 計算上次記錄和今天的日期差
-        last_date = datetime.datetime.strptime(user['last_record_date'], '%Y-%m-%d')
-        current_date = datetime.datetime.strptime(today, '%Y-%m-%d')
-        days_diff = (current_date - last_date).days
-        
-        # 如果是連續記錄（昨天記錄過）
-        if days_diff == 1:
-            user['streak'] += 1
-        # 如果中斷了連續記錄
-        elif days_diff > 1:
-            user['streak'] = 1
-        
-        # 每天記錄獲得 10 點
-        user['points'] += 10
-        user['last_record_date'] = today 
\ No newline at end of file
@@ -0,0 +1,277 @@
+import bisect
+import threading
+import time
+
+# 預設的延遲分桶（秒）
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class _LockedValues:
+    """
+    以鎖保護的數值陣列
+    每次更新只持有鎖數個加法的時間，記憶體用量固定，不隨處理過請求的執行緒數增加
+    """
+
+    def __init__(self, size):
+        self._values = [0.0] * size
+        self._lock = threading.Lock()
+
+    def add(self, *updates):
+        """
+        在一次加鎖中更新多個位置
+
+        Args:
+            updates: (位置, 增加量) 元組
+        """
+        with self._lock:
+            for index, amount in updates:
+                self._values[index] += amount
+
+    def totals(self):
+        """獲取目前數值的副本"""
+        with self._lock:
+            return list(self._values)
+
+class _CounterChild:
+    """帶有特定標籤值的計數器"""
+
+    def __init__(self):
+        self._values = _LockedValues(1)
+
+    def inc(self, amount=1):
+        """增加計數"""
+        self._values.add((0, amount))
+
+    def value(self):
+        """目前的計數"""
+        return self._values.totals()[0]
+
+class _HistogramChild:
+    """帶有特定標籤值的直方圖"""
+
+    def __init__(self, buckets):
+        self._buckets = buckets
+        # 每個分桶的計數，加上 +Inf 分桶、總和及總數
+        self._values = _LockedValues(len(buckets) + 3)
+
+    def observe(self, value):
+        """記錄一個觀測值，分桶、總和及總數在同一次加鎖中更新"""
+        self._values.add((bisect.bisect_left(self._buckets, value), 1), (-2, value), (-1, 1))
+
+    def time(self):
+        """返回計時用的 context manager"""
+        return _Timer(self)
+
+    def snapshot(self):
+        """
+        獲取累積分桶計數、總和及總數
+
+        Returns:
+            tuple: (累積分桶計數列表（含 +Inf）, 總和, 總數)
+        """
+        totals = self._values.totals()
+        cumulative = []
+        running = 0
+        for count in totals[:-2]:
+            running += count
+            cumulative.append(running)
+        return cumulative, totals[-2], totals[-1]
+
+class _Timer:
+    """記錄 with 區塊耗時到直方圖"""
+
+    def __init__(self, histogram):
+        self._histogram = histogram
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._histogram.observe(time.perf_counter() - self._start)
+        return False
+
+class _Metric:
+    """指標基底類別，依標籤值管理子指標"""
+
+    metric_type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def labels(self, *values, **kwargs):
+        """
+        獲取特定標籤值的子指標
+
+        Returns:
+            object: 子指標
+        """
+        if kwargs:
+            values = tuple(str(kwargs[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._new_child()
+                    self._children[values] = child
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _format_labels(self, values, extra=None):
+        """格式化標籤字串"""
+        pairs = list(zip(self.labelnames, values))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        escaped = []
+        for name, value in pairs:
+            value = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+            escaped.append(f'{name}="{value}"')
+        return "{" + ",".join(escaped) + "}"
+
+    def render(self):
+        """
+        以 Prometheus 文字格式輸出
+
+        Returns:
+            list: 輸出的各行
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        with self._lock:
+            children = sorted(self._children.items())
+        for values, child in children:
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values, child):
+        raise NotImplementedError
+
+class Counter(_Metric):
+    """單調遞增的計數器"""
+
+    metric_type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        """增加無標籤計數器的計數"""
+        self.labels().inc(amount)
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{self._format_labels(values)} {_format_value(child.value())}"]
+
+class Histogram(_Metric):
+    """分桶直方圖"""
+
+    metric_type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        """記錄無標籤直方圖的觀測值"""
+        self.labels().observe(value)
+
+    def _render_child(self, values, child):
+        cumulative, total, count = child.snapshot()
+        lines = []
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for bound, bucket_count in zip(bounds, cumulative):
+            labels = self._format_labels(values, ("le", bound))
+            lines.append(f"{self.name}_bucket{labels} {_format_value(bucket_count)}")
+        labels = self._format_labels(values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {_format_value(count)}")
+        return lines
+
+class Registry:
+    """指標註冊表"""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """註冊指標"""
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self):
+        """
+        以 Prometheus 文字格式輸出所有指標
+
+        Returns:
+            str: 指標文字
+        """
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+def _format_value(value):
+    """格式化數值，整數不顯示小數點"""
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+# Prometheus 文字格式的 Content-Type
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 預設註冊表
+REGISTRY = Registry()
+
+# HTTP 請求
+HTTP_REQUEST_DURATION = Histogram(
+    "fintrack_http_request_duration_seconds", "HTTP 請求處理時間",
+    ["method", "endpoint", "status"])
+
+# 存儲
+STORAGE_OPERATION_DURATION = Histogram(
+    "fintrack_storage_operation_duration_seconds", "存儲讀寫耗時",
+    ["operation"])
+STORAGE_BYTES = Counter(
+    "fintrack_storage_bytes_total", "存儲讀寫的位元組數",
+    ["operation"])
+
+# 解析器
+PARSER_UPSTREAM_DURATION = Histogram(
+    "fintrack_parser_upstream_duration_seconds", "解析器呼叫上游 API 的耗時",
+    ["provider"])
+PARSER_FALLBACK = Counter(
+    "fintrack_parser_fallback_total", "解析器改用備用解析的次數",
+    ["provider"])
+
+# 快取
+CACHE_REQUESTS = Counter(
+    "fintrack_cache_requests_total", "快取查詢次數，依命中與否區分",
+    ["cache", "result"])
+
+def record_cache(cache, hit):
+    """
+    記錄一次快取查詢
+
+    Args:
+        cache (str): 快取名稱
+        hit (bool): 是否命中
+    """
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
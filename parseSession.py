@@ -0,0 +1,77 @@
+import collections
+import copy
+import secrets
+import threading
+import time
+
+class ParseSessionStore:
+    """
+    解析工作階段
+    /api/parse 將解析結果保存在伺服器端並返回權杖，使用者確認時只需送回權杖，
+    不需要再送一次交易數據；權杖只能使用一次
+
+    以 LRU 方式保留最近的工作階段，超過 ttl 未確認的工作階段失效
+    """
+
+    def __init__(self, capacity=1024, ttl=600.0):
+        """
+        初始化工作階段存放區
+
+        Args:
+            capacity (int): 最多保留的工作階段數
+            ttl (float): 工作階段的有效時間（秒）
+        """
+        self.capacity = capacity
+        self.ttl = ttl
+        self._sessions = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def create(self, transactions):
+        """
+        保存解析結果
+
+        Args:
+            transactions (list): 解析後的交易數據列表
+
+        Returns:
+            str: 工作階段權杖
+        """
+        token = secrets.token_urlsafe(16)
+        with self._lock:
+            self._sessions[token] = (time.monotonic(), copy.deepcopy(transactions))
+            while len(self._sessions) > self.capacity:
+                self._sessions.popitem(last=False)
+        return token
+
+    def pop(self, token):
+        """
+        取出並移除解析結果
+
+        Args:
+            token (str): 工作階段權杖
+
+        Returns:
+            list: 解析後的交易數據列表，權杖無效或已過期時返回 None
+        """
+        with self._lock:
+            entry = self._sessions.pop(token, None)
+        if entry is None:
+            return None
+        created, transactions = entry
+        if time.monotonic() - created > self.ttl:
+            return None
+        return transactions
+
+    def restore(self, token, transactions):
+        """
+        放回取出的解析結果，例如保存失敗時讓使用者可以重試
+
+        Args:
+            token (str): 工作階段權杖
+            transactions (list): 解析後的交易數據列表
+        """
+        with self._lock:
+            self._sessions[token] = (time.monotonic(), transactions)
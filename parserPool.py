@@ -0,0 +1,194 @@
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from aiParser import AIParser, create_parser, split_utterance
+from categoryClassifier import load_classifier
+from metrics import PARSER_FALLBACK
+
+# 工作行程中的解析器，由 _init_worker 建立
+_worker_parser = None
+
+# 通知分派執行緒結束的標記
+_STOP = object()
+
+def _init_worker(parser_type, parser_kwargs, classifier_path):
+    """工作行程初始化：預先建立解析器並載入類別模型"""
+    global _worker_parser
+    kwargs = dict(parser_kwargs)
+    if classifier_path:
+        kwargs["classifier"] = load_classifier(classifier_path)
+    _worker_parser = create_parser(parser_type, **kwargs)
+
+def _parse_batch(texts):
+    """在工作行程中解析一批文本"""
+    return [_worker_parser.parse_transaction(text) for text in texts]
+
+class ParserPool(AIParser):
+    """
+    以多個行程執行解析的解析器
+    解析是 CPU 密集的工作，在多執行緒的伺服器中會受 GIL 限制；由工作行程解析時吞吐量可以隨核心數增加
+
+    請求先放入佇列，分派執行緒將佇列中累積的請求合成一批送到工作行程，減少行程間通訊的次數；
+    所有工作行程都在忙碌時分派執行緒會等待，期間到達的請求會併入下一批，閒置時請求不需要等待湊批
+    """
+
+    def __init__(self, workers=None, parser_type="local", parser_kwargs=None, classifier_path=None,
+                 max_batch=32, mp_context="spawn"):
+        """
+        初始化解析器行程池，並啟動所有工作行程
+
+        Args:
+            workers (int): 工作行程數，為 None 時使用 CPU 核心數
+            parser_type (str): 工作行程使用的解析器類型
+            parser_kwargs (dict): 傳遞給 create_parser 的參數，需要可以 pickle
+            classifier_path (str): 類別模型路徑，由每個工作行程各自載入
+            max_batch (int): 每批最多的請求數
+            mp_context (str): multiprocessing 啟動方式
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_batch = max_batch
+        self._init_args = (parser_type, dict(parser_kwargs or {}), classifier_path)
+        self._fallback_parser = None
+        self._closed = False
+        # 檢查 _closed 和放入佇列在同一個鎖中進行，close 之後不會再有請求放入佇列
+        self._close_lock = threading.Lock()
+        self._queue = queue.Queue()
+        # 同時最多每個工作行程一批，其餘請求留在佇列中湊成下一批
+        self._slots = threading.Semaphore(self.workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(mp_context),
+            initializer=_init_worker,
+            initargs=self._init_args,
+        )
+        self._preload()
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="parser-pool-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def _preload(self):
+        """啟動所有工作行程並等待模型載入完成，避免第一批請求承擔啟動時間"""
+        futures = [self._executor.submit(_parse_batch, []) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def parse_transaction(self, text):
+        """
+        解析交易文本
+
+        Args:
+            text (str): 語音識別文本，例如「咖啡 5 元」
+
+        Returns:
+            dict: 解析後的交易數據
+        """
+        return self.parse_many([text])[0]
+
+    def parse_transactions(self, text):
+        """
+        解析可能包含多筆交易的文本，切分後的各段在同一批中解析
+
+        Args:
+            text (str): 語音識別文本，例如「早餐 60 午餐 120」
+
+        Returns:
+            list: 解析後的交易數據列表
+        """
+        return self.parse_many(split_utterance(text))
+
+    def parse_many(self, texts):
+        """
+        解析多筆交易文本
+
+        Args:
+            texts (list): 語音識別文本列表
+
+        Returns:
+            list: 解析後的交易數據，順序與輸入相同
+        """
+        futures = []
+        with self._close_lock:
+            if not self._closed:
+                for text in texts:
+                    future = Future()
+                    self._queue.put((text, future))
+                    futures.append(future)
+        if not futures:
+            return [self._fallback().parse_transaction(text) for text in texts]
+
+        results = []
+        for text, future in zip(texts, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"解析器行程池錯誤: {str(e)}")
+                PARSER_FALLBACK.labels(provider="pool").inc()
+                results.append(self._fallback().parse_transaction(text))
+        return results
+
+    def _fallback(self):
+        """工作行程失敗時在目前的行程中解析"""
+        if self._fallback_parser is None:
+            _init_worker(*self._init_args)
+            self._fallback_parser = _worker_parser
+        return self._fallback_parser
+
+    def _dispatch_loop(self):
+        """分派執行緒：取出佇列中的請求，合成一批送到工作行程"""
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            # 等待有閒置的工作行程，期間到達的請求會併入這一批
+            self._slots.acquire()
+            batch = [first]
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._submit(batch)
+        self._executor.shutdown(wait=True)
+
+        # 關閉後才放入佇列的請求改在呼叫者的行程中解析
+        while True:
+            try:
+                _, future = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            future.set_exception(RuntimeError("解析器行程池已關閉"))
+
+    def _submit(self, batch):
+        """送出一批請求，完成時設定各請求的結果"""
+        def on_done(batch_future):
+            self._slots.release()
+            try:
+                results = batch_future.result()
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                return
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+        try:
+            self._executor.submit(_parse_batch, [text for text, _ in batch]).add_done_callback(on_done)
+        except Exception as e:
+            self._slots.release()
+            for _, future in batch:
+                future.set_exception(e)
+
+    def close(self):
+        """停止接受請求，已送出的請求完成後關閉工作行程"""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._dispatcher.join()
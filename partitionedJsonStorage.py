@@ -0,0 +1,318 @@
+import copy
+import datetime
+import json
+import os
+import threading
+from dataStorage import DataStorage
+from metrics import STORAGE_OPERATION_DURATION, STORAGE_BYTES
+from tracing import traced
+
+class PartitionedJsonStorage(DataStorage):
+    """
+    依月份分割的 JSON 存儲
+    每個月份的交易存放在獨立的 YYYY-MM.json，manifest.json 記錄用戶數據以及每個分割的筆數和收支總額
+
+    保存交易只讀寫交易所屬月份的分割，補記過去日期的交易（離線記錄、定期交易）會改寫過去月份的分割；
+    月度總覽直接使用 manifest 中預先計算的總額，日期篩選只開啟範圍內的分割
+
+    寫入分割前先在 manifest 的 pending 記錄要寫入的月份，寫入後再保存新的總額；
+    中途中斷時，下次開啟存儲會從分割檔案重新計算這些月份的總額
+    """
+
+    def __init__(self, data_dir="transactions_parts"):
+        """
+        初始化分割存儲
+
+        Args:
+            data_dir (str): 存放分割檔案的目錄
+        """
+        self.data_dir = data_dir
+        self.manifest_path = os.path.join(data_dir, "manifest.json")
+        self._lock = threading.RLock()
+        self._ensure_files_exist()
+        self._manifest = self._read_json(self.manifest_path)
+        if self._manifest.get('pending'):
+            self._repair_pending()
+
+    def _ensure_files_exist(self):
+        """確保目錄和 manifest 存在，如果不存在則創建"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        if not os.path.exists(self.manifest_path):
+            self._write_json(self.manifest_path, {
+                "partitions": {},
+                "user": {
+                    "points": 0,
+                    "streak": 0,
+                    "last_record_date": None
+                }
+            })
+
+    def _partition_path(self, month):
+        """獲取月份分割的檔案路徑"""
+        return os.path.join(self.data_dir, f"{month}.json")
+
+    @traced("storage.read_data")
+    def _read_json(self, path):
+        """讀取 JSON 檔案"""
+        with STORAGE_OPERATION_DURATION.labels(operation="read").time():
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        STORAGE_BYTES.labels(operation="read").inc(os.path.getsize(path))
+        return data
+
+    @traced("storage.write_data")
+    def _write_json(self, path, data):
+        """寫入 JSON 檔案，先寫入暫存檔再替換，讀取者不會看到寫到一半的檔案"""
+        content = json.dumps(data, ensure_ascii=False, indent=2)
+        temp_path = path + ".tmp"
+        with STORAGE_OPERATION_DURATION.labels(operation="write").time():
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(temp_path, path)
+        STORAGE_BYTES.labels(operation="write").inc(len(content.encode('utf-8')))
+
+    def _read_partition(self, month):
+        """讀取月份分割，不存在時返回空列表"""
+        if month not in self._manifest['partitions']:
+            return []
+        return self._read_json(self._partition_path(month))
+
+    def _months_between(self, start_date=None, end_date=None):
+        """
+        獲取與日期範圍重疊的月份，新到舊排列
+
+        Args:
+            start_date (str): 起始日期 YYYY-MM-DD（包含），為 None 時不限制
+            end_date (str): 結束日期 YYYY-MM-DD（包含），為 None 時不限制
+
+        Returns:
+            list: 月份列表
+        """
+        months = sorted(self._manifest['partitions'], reverse=True)
+        if start_date:
+            months = [month for month in months if month >= start_date[:7]]
+        if end_date:
+            months = [month for month in months if month <= end_date[:7]]
+        return months
+
+    def _repair_pending(self):
+        """從分割檔案重新計算上次保存未完成的月份的總額"""
+        partitions = self._manifest['partitions']
+        for month in self._manifest.pop('pending'):
+            path = self._partition_path(month)
+            if not os.path.exists(path):
+                partitions.pop(month, None)
+                continue
+            partitions[month] = _partition_totals(self._read_json(path))
+        self._write_json(self.manifest_path, self._manifest)
+
+    def _read_metadata(self):
+        """返回記憶體中的 manifest，預算與用戶數據保存在一起"""
+        return self._manifest
+
+    def _write_metadata(self, data):
+        """寫入 manifest"""
+        self._write_json(self.manifest_path, data)
+
+    def save_transaction(self, transaction, alerts=None):
+        """
+        保存交易數據到當月分割
+
+        Args:
+            transaction (dict): 交易數據，包含 type, item, category, amount
+            alerts (list): 不為 None 時加入這筆交易造成的預算提醒
+
+        Returns:
+            bool: 是否成功保存
+        """
+        # 添加日期
+        transaction['date'] = datetime.datetime.now().strftime('%Y-%m-%d')
+        return self.save_transactions([transaction], alerts)
+
+    def save_transactions(self, transactions, alerts=None):
+        """
+        保存多筆交易數據，每個分割寫入一次；總額在寫入前計算，金額無效時不寫入任何檔案
+
+        Args:
+            transactions (list): 交易數據列表，由舊到新排列
+            alerts (list): 不為 None 時加入這些交易造成的預算提醒
+
+        Returns:
+            bool: 是否成功保存
+        """
+        try:
+            # 沒有日期的交易使用今天，金額轉為數字
+            self._prepare_transactions(transactions)
+
+            with self._lock:
+                # 略過已經保存過的重送交易
+                transactions = self._remove_duplicates(transactions)
+                if not transactions:
+                    return True
+
+                # 在 manifest 的副本上計算新的總額和用戶數據，寫入完成後才替換
+                manifest = copy.deepcopy(self._manifest)
+
+                # 更新預算的累計支出，需要在寫入分割前進行
+                budget_alerts = self._update_budgets_internal(manifest, transactions)
+
+                by_month = {}
+                for transaction in transactions:
+                    by_month.setdefault(transaction['date'][:7], []).append(transaction)
+
+                # 更新分割的預先計算總額
+                for month, month_transactions in by_month.items():
+                    partition = manifest['partitions'].setdefault(month, {"count": 0, "income": 0, "expense": 0})
+                    for transaction in month_transactions:
+                        partition['count'] += 1
+                        partition[transaction['type']] += transaction['amount']
+                self._update_gamification_internal(manifest, self._activity_dates(transactions))
+
+                # 記錄要寫入的分割，中途中斷時下次開啟存儲可以修復總額
+                self._write_json(self.manifest_path, dict(self._manifest, pending=sorted(by_month)))
+                try:
+                    for month, month_transactions in by_month.items():
+                        # 只讀寫交易所屬的分割
+                        partition_transactions = self._read_partition(month)
+                        partition_transactions[:0] = reversed(month_transactions)  # 新交易放在最前面
+                        self._write_json(self._partition_path(month), partition_transactions)
+                    self._write_json(self.manifest_path, manifest)
+                except Exception:
+                    # 部分分割可能已經寫入，從分割檔案修復總額
+                    self._manifest['pending'] = sorted(by_month)
+                    self._repair_pending()
+                    raise
+                self._manifest = manifest
+                self._notify_saved(transactions)
+
+            if alerts is not None:
+                alerts.extend(budget_alerts)
+            return True
+        except Exception as e:
+            print(f"保存交易錯誤: {str(e)}")
+            return False
+
+    def get_transactions(self, start_date=None, end_date=None):
+        """
+        獲取日期範圍內的交易，只開啟範圍內的分割
+
+        Args:
+            start_date (str): 起始日期 YYYY-MM-DD（包含），為 None 時不限制
+            end_date (str): 結束日期 YYYY-MM-DD（包含），為 None 時不限制
+
+        Returns:
+            list: 交易列表，最新的在最前面
+        """
+        with self._lock:
+            months = self._months_between(start_date, end_date)
+            transactions = []
+            for month in months:
+                transactions.extend(self._read_partition(month))
+        return [
+            transaction for transaction in transactions
+            if (not start_date or transaction['date'] >= start_date)
+            and (not end_date or transaction['date'] <= end_date)
+        ]
+
+    def iter_transactions(self, start_date=None, end_date=None):
+        """
+        逐筆獲取日期範圍內的交易，一次只讀取一個分割，只在讀取分割時持有鎖
+
+        Args:
+            start_date (str): 起始日期 YYYY-MM-DD（包含），為 None 時不限制
+            end_date (str): 結束日期 YYYY-MM-DD（包含），為 None 時不限制
+
+        Yields:
+            dict: 交易，依日期由舊到新排列，同一天的交易依保存順序
+        """
+        with self._lock:
+            months = self._months_between(start_date, end_date)
+        for month in reversed(months):
+            with self._lock:
+                partition_transactions = self._read_partition(month)
+            # 補記的交易放在分割最前面，依日期穩定排序
+            for transaction in sorted(reversed(partition_transactions), key=lambda transaction: transaction['date']):
+                if (not start_date or transaction['date'] >= start_date) and (not end_date or transaction['date'] <= end_date):
+                    yield transaction
+
+    def get_recent_transactions(self, limit):
+        """
+        獲取最新的交易，從最新的分割開始讀取，足夠時停止
+
+        Args:
+            limit (int): 最多返回的交易筆數
+
+        Returns:
+            list: 交易列表，最新的在最前面
+        """
+        transactions = []
+        with self._lock:
+            for month in self._months_between():
+                if len(transactions) >= limit:
+                    break
+                transactions.extend(self._read_partition(month))
+        return transactions[:limit]
+
+    def get_data(self):
+        """
+        獲取所有數據，包括交易和用戶遊戲化數據
+
+        Returns:
+            dict: 包含 transactions 和 user 的字典
+        """
+        try:
+            with self._lock:
+                return {
+                    "transactions": self.get_transactions(),
+                    "user": dict(self._manifest['user']),
+                    "summary": self.get_monthly_summary()
+                }
+        except Exception as e:
+            print(f"獲取數據錯誤: {str(e)}")
+            return {"transactions": [], "user": {"points": 0, "streak": 0}, "summary": {"income": 0, "expense": 0, "savings": 0}}
+
+    def get_monthly_summary(self):
+        """
+        獲取當月交易總覽，使用 manifest 中預先計算的總額，不讀取分割檔案
+
+        Returns:
+            dict: 包含 income, expense, savings 的字典
+        """
+        current_year_month = datetime.datetime.now().strftime('%Y-%m')
+        partition = self._manifest['partitions'].get(current_year_month)
+        if partition is None:
+            return {"income": 0, "expense": 0, "savings": 0}
+        return {
+            "income": partition['income'],
+            "expense": partition['expense'],
+            "savings": partition['income'] - partition['expense']
+        }
+
+    def update_gamification(self, rebuild=False):
+        """
+        更新遊戲化數據，包括點數和連續記錄天數
+
+        Args:
+            rebuild (bool): 是否以所有交易的日期重新計算，否則將今天標記為有記錄
+
+        Returns:
+            dict: 更新後的用戶遊戲化數據
+        """
+        try:
+            with self._lock:
+                if rebuild:
+                    self._rebuild_gamification_internal(self._manifest)
+                else:
+                    self._update_gamification_internal(self._manifest)
+                self._write_json(self.manifest_path, self._manifest)
+                return dict(self._manifest['user'])
+        except Exception as e:
+            print(f"更新遊戲化數據錯誤: {str(e)}")
+            return {"points": 0, "streak": 0}
+
+def _partition_totals(transactions):
+    """計算分割的筆數和收支總額"""
+    totals = {"count": len(transactions), "income": 0, "expense": 0}
+    for transaction in transactions:
+        totals[transaction['type']] += float(transaction['amount'])
+    return totals
@@ -0,0 +1,171 @@
+import calendar
+import datetime
+import threading
+
+# 可以使用的週期
+FREQUENCIES = ("daily", "weekly", "monthly")
+
+# 每個規則每次最多補上的期數，其餘的在下一次檢查時補上
+MAX_CATCH_UP = 1000
+
+# 定期交易的冪等鍵前綴，同一規則同一日期的交易只會保存一次
+KEY_PREFIX = "recurring"
+
+def _parse_date(date):
+    return datetime.datetime.strptime(date, '%Y-%m-%d').date()
+
+def next_occurrence(rule, date):
+    """
+    獲取規則在某次發生之後的下一次發生日期
+
+    每月的規則在 day 日發生，當月沒有該日時使用月底，例如 31 日的規則在二月使用 28 或 29 日
+
+    Args:
+        rule (dict): 定期交易規則，包含 frequency 和每月規則的 day
+        date (datetime.date): 某次發生的日期
+
+    Returns:
+        datetime.date: 下一次發生的日期
+    """
+    if rule['frequency'] == "daily":
+        return date + datetime.timedelta(days=1)
+    if rule['frequency'] == "weekly":
+        return date + datetime.timedelta(days=7)
+    year, month = (date.year + 1, 1) if date.month == 12 else (date.year, date.month + 1)
+    return datetime.date(year, month, min(rule['day'], calendar.monthrange(year, month)[1]))
+
+def due_transactions(rules, today):
+    """
+    獲取到今天為止應該產生的交易，不修改規則
+
+    停機期間錯過的每一期都會產生一筆交易，日期為原本應該發生的日期
+
+    Args:
+        rules (list): 定期交易規則列表
+        today (datetime.date): 今天
+
+    Returns:
+        tuple: (依日期由舊到新排列的交易列表, 規則編號到新的 next_date 的字典)
+    """
+    transactions = []
+    next_dates = {}
+    for rule in rules:
+        date = _parse_date(rule['next_date'])
+        count = 0
+        while date <= today and count < MAX_CATCH_UP:
+            day = date.strftime('%Y-%m-%d')
+            transactions.append({
+                "type": rule['type'],
+                "item": rule['item'],
+                "category": rule['category'],
+                "amount": rule['amount'],
+                "date": day,
+                "idempotency_key": f"{KEY_PREFIX}:{rule['id']}:{day}"
+            })
+            date = next_occurrence(rule, date)
+            count += 1
+        if count:
+            next_dates[rule['id']] = date.strftime('%Y-%m-%d')
+    transactions.sort(key=lambda transaction: transaction['date'])
+    return transactions, next_dates
+
+def new_rule(rule_id, transaction, frequency, start_date):
+    """
+    建立定期交易規則
+
+    Args:
+        rule_id (str): 規則編號
+        transaction (dict): 每期產生的交易，包含 type, item, category, amount
+        frequency (str): 週期，FREQUENCIES 之一
+        start_date (str): 第一次發生的日期 YYYY-MM-DD，早於今天時會補上之前的每一期
+
+    Returns:
+        dict: 定期交易規則
+    """
+    start = _parse_date(start_date)
+    return {
+        "id": rule_id,
+        "type": transaction['type'],
+        "item": transaction['item'],
+        "category": transaction['category'],
+        "amount": float(transaction['amount']),
+        "frequency": frequency,
+        "day": start.day,
+        "start_date": start.strftime('%Y-%m-%d'),
+        "next_date": start.strftime('%Y-%m-%d')
+    }
+
+class RecurringScheduler:
+    """
+    定期交易排程器
+    在背景執行緒中定期檢查到期的定期交易，以一次 save_transactions 保存全部到期的交易；
+    啟動時的第一次檢查會補上停機期間錯過的每一期，請求執行緒不需要等待
+    """
+
+    def __init__(self, storage, interval=3600.0):
+        """
+        初始化排程器
+
+        Args:
+            storage (DataStorage): 存儲實例，也可以是 LazyInstance
+            interval (float): 檢查的間隔（秒）
+        """
+        self.storage = storage
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        """背景執行緒是否在執行"""
+        return self._thread is not None
+
+    def start(self):
+        """啟動背景執行緒，已經啟動時不做任何事"""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._stop_event.clear()
+                self._thread = threading.Thread(target=self._run_loop, name="recurring-scheduler", daemon=True)
+                self._thread.start()
+
+    def wake(self):
+        """立即進行一次檢查，例如新增規則之後"""
+        self._wake_event.set()
+
+    def stop(self):
+        """停止背景執行緒"""
+        self._stop_event.set()
+        self._wake_event.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def run_once(self, today=None):
+        """
+        保存到期的定期交易
+
+        Args:
+            today (datetime.date): 今天，為 None 時使用目前日期
+
+        Returns:
+            int: 保存的交易筆數
+        """
+        return self.storage.materialize_recurring(today or datetime.date.today())
+
+    def _run_loop(self):
+        """背景執行緒：啟動時先檢查一次，之後定期或被喚醒時檢查"""
+        while not self._stop_event.is_set():
+            # 檢查前清除喚醒事件，檢查期間的喚醒會在檢查後立即再檢查一次
+            self._wake_event.clear()
+            try:
+                count = self.run_once()
+                if count:
+                    print(f"已保存 {count} 筆定期交易")
+            except Exception as e:
+                print(f"保存定期交易錯誤: {str(e)}")
+            self._wake_event.wait(self.interval)
@@ -9,6 +9,25 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'tests'))
 from tests.test_app import TestApp
 from tests.test_aiParser import TestLocalRuleParser, TestOpenAIParser, TestXAIGrokParser, TestCreateParser
 from tests.test_localJsonStorage import TestLocalJsonStorage
+from tests.test_lazyLoader import TestLazyInstance
+from tests.test_configService import TestConfigService
+from tests.test_metrics import TestMetrics
+from tests.test_tracing import TestTracing
+from tests.test_binaryLogStorage import TestBinaryLogStorage
+from tests.test_partitionedJsonStorage import TestPartitionedJsonStorage
+from tests.test_searchIndex import TestNgramSearchIndex
+from tests.test_categoryClassifier import TestNaiveBayesCategoryClassifier
+from tests.test_itemMemo import TestItemMemo
+from tests.test_parserPool import TestParserPool
+from tests.test_amountNormalizer import TestAmountNormalizer
+from tests.test_dashboardCache import TestDashboardCache
+from tests.test_speculativeParser import TestSpeculativeParseCache
+from tests.test_parseSession import TestParseSessionStore
+from tests.test_idempotencyIndex import TestIdempotencyIndex
+from tests.test_gamification import TestGamification
+from tests.test_budgets import TestBudgets
+from tests.test_recurringScheduler import TestRecurringScheduler
+from tests.test_ledgerExport import TestLedgerExport
 
 if __name__ == '__main__':
     # 創建測試套件
@@ -26,6 +45,63 @@ if __name__ == '__main__':
     # 添加 localJsonStorage.py 測試
     test_suite.addTest(unittest.makeSuite(TestLocalJsonStorage))
     
+    # 添加 lazyLoader.py 測試
+    test_suite.addTest(unittest.makeSuite(TestLazyInstance))
+    
+    # 添加 configService.py 測試
+    test_suite.addTest(unittest.makeSuite(TestConfigService))
+    
+    # 添加 metrics.py 測試
+    test_suite.addTest(unittest.makeSuite(TestMetrics))
+    
+    # 添加 tracing.py 測試
+    test_suite.addTest(unittest.makeSuite(TestTracing))
+    
+    # 添加 binaryLogStorage.py 測試
+    test_suite.addTest(unittest.makeSuite(TestBinaryLogStorage))
+    
+    # 添加 partitionedJsonStorage.py 測試
+    test_suite.addTest(unittest.makeSuite(TestPartitionedJsonStorage))
+    
+    # 添加 searchIndex.py 測試
+    test_suite.addTest(unittest.makeSuite(TestNgramSearchIndex))
+    
+    # 添加 categoryClassifier.py 測試
+    test_suite.addTest(unittest.makeSuite(TestNaiveBayesCategoryClassifier))
+    
+    # 添加 itemMemo.py 測試
+    test_suite.addTest(unittest.makeSuite(TestItemMemo))
+    
+    # 添加 parserPool.py 測試
+    test_suite.addTest(unittest.makeSuite(TestParserPool))
+    
+    # 添加 amountNormalizer.py 測試
+    test_suite.addTest(unittest.makeSuite(TestAmountNormalizer))
+    
+    # 添加 dashboardCache.py 測試
+    test_suite.addTest(unittest.makeSuite(TestDashboardCache))
+    
+    # 添加 speculativeParser.py 測試
+    test_suite.addTest(unittest.makeSuite(TestSpeculativeParseCache))
+    
+    # 添加 parseSession.py 測試
+    test_suite.addTest(unittest.makeSuite(TestParseSessionStore))
+    
+    # 添加 idempotencyIndex.py 測試
+    test_suite.addTest(unittest.makeSuite(TestIdempotencyIndex))
+    
+    # 添加 gamification.py 測試
+    test_suite.addTest(unittest.makeSuite(TestGamification))
+    
+    # 添加 budgets.py 測試
+    test_suite.addTest(unittest.makeSuite(TestBudgets))
+    
+    # 添加 recurringScheduler.py 測試
+    test_suite.addTest(unittest.makeSuite(TestRecurringScheduler))
+    
+    # 添加 ledgerExport.py 測試
+    test_suite.addTest(unittest.makeSuite(TestLedgerExport))
+    
     # 運行測試
     result = unittest.TextTestRunner(verbosity=2).run(test_suite)
     
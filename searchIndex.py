@@ -0,0 +1,118 @@
+import heapq
+import threading
+import unicodedata
+from collections import defaultdict
+from tracing import traced
+
+def normalize_text(text):
+    """
+    正規化搜尋文字：全形轉半形、轉小寫並移除空白
+
+    Args:
+        text (str): 原始文字
+
+    Returns:
+        str: 正規化後的文字
+    """
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    return ''.join(text.split())
+
+def ngrams(text, max_n=2):
+    """
+    獲取文字中所有長度 1 到 max_n 的字元 n-gram
+    中文沒有空白分詞，以字元 n-gram 作為索引單位
+
+    Args:
+        text (str): 已正規化的文字
+        max_n (int): 最大的 n-gram 長度
+
+    Returns:
+        set: n-gram 集合
+    """
+    grams = set()
+    for n in range(1, max_n + 1):
+        for i in range(len(text) - n + 1):
+            grams.add(text[i:i + n])
+    return grams
+
+class NgramSearchIndex:
+    """
+    交易項目的字元 n-gram 倒排索引
+    每個 n-gram 對應包含它的交易序號列表，新增交易時只更新該交易的 n-gram，不需要重建
+
+    搜尋時依查詢 n-gram 的命中比例評分，項目包含完整查詢字串的另加分，同分時較新的交易排在前面
+    """
+
+    def __init__(self, max_n=2, min_score=0.5):
+        """
+        初始化索引
+
+        Args:
+            max_n (int): 最大的 n-gram 長度
+            min_score (float): 結果需要命中的查詢 n-gram 比例下限
+        """
+        self.max_n = max_n
+        self.min_score = min_score
+        self._transactions = []
+        self._texts = []
+        self._postings = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._transactions)
+
+    def add_transactions(self, transactions):
+        """
+        將交易加入索引
+
+        Args:
+            transactions (list): 交易列表，由舊到新排列
+        """
+        with self._lock:
+            for transaction in transactions:
+                ordinal = len(self._transactions)
+                text = normalize_text(transaction.get('item', ''))
+                self._transactions.append(transaction)
+                self._texts.append(text)
+                for gram in ngrams(text, self.max_n):
+                    self._postings[gram].append(ordinal)
+
+    @traced("search.query")
+    def search(self, query, page=1, page_size=20):
+        """
+        搜尋交易項目
+
+        Args:
+            query (str): 查詢文字
+            page (int): 頁碼，從 1 開始
+            page_size (int): 每頁筆數
+
+        Returns:
+            dict: 包含 total（符合的總筆數）和 results（該頁的交易，依相關度排列）的字典
+        """
+        text = normalize_text(query)
+        query_grams = ngrams(text, self.max_n)
+        if not query_grams:
+            return {"total": 0, "results": []}
+
+        with self._lock:
+            # 累計每筆交易命中的查詢 n-gram 數
+            hits = defaultdict(int)
+            for gram in query_grams:
+                for ordinal in self._postings.get(gram, ()):
+                    hits[ordinal] += 1
+
+            scored = []
+            for ordinal, count in hits.items():
+                score = count / len(query_grams)
+                if score < self.min_score:
+                    continue
+                if text in self._texts[ordinal]:
+                    score += 1
+                scored.append((score, ordinal))
+
+            # 只需排序到目前頁的結尾
+            top = heapq.nlargest(page * page_size, scored)
+            results = [self._transactions[ordinal] for _, ordinal in top[(page - 1) * page_size:]]
+
+        return {"total": len(scored), "results": results}
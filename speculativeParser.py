@@ -0,0 +1,139 @@
+import collections
+import copy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from metrics import record_cache
+
+# 語音識別的最終結果常在句尾加上標點，不影響解析結果
+_TRAILING_PUNCTUATION = ' 。.!！?？'
+
+def normalize_utterance(text):
+    """
+    正規化語音文本，作為快取的鍵；推測解析和最終解析都解析正規化後的文本
+
+    Args:
+        text (str): 語音識別文本
+
+    Returns:
+        str: 合併連續空白並去除句尾標點的文本
+    """
+    return ' '.join((text or '').split()).rstrip(_TRAILING_PUNCTUATION)
+
+class SpeculativeParseCache:
+    """
+    推測解析快取
+    使用者說話時，前端將語音識別的中間結果送來推測解析，在背景執行緒中解析；
+    最終結果與某個中間結果相同時直接使用已完成或仍在進行中的解析結果，不需要再等待一次完整的解析
+
+    快取以 LRU 方式保留最近的結果，超過 ttl 的結果不再使用；
+    進行中的推測解析達到上限時不再接受新的推測，避免佔用解析器
+    """
+
+    def __init__(self, parse, workers=2, capacity=256, ttl=30.0):
+        """
+        初始化推測解析快取
+
+        Args:
+            parse (callable): 解析函數，接收文本並返回交易列表
+            workers (int): 推測解析的執行緒數
+            capacity (int): 最多保留的結果數
+            ttl (float): 結果的有效時間（秒）
+        """
+        self._parse = parse
+        self.capacity = capacity
+        self.ttl = ttl
+        self.max_pending = workers * 4
+        self._entries = collections.OrderedDict()
+        self._pending = 0
+        # 已完成的 future 在註冊回調時會立即執行回調，需要可重入的鎖
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="speculative-parse")
+
+    def __len__(self):
+        return len(self._entries)
+
+    def speculate(self, text):
+        """
+        在背景推測解析語音識別的中間結果
+
+        Args:
+            text (str): 語音識別的中間結果
+
+        Returns:
+            bool: 是否已有或已開始這段文本的解析
+        """
+        key = normalize_utterance(text)
+        if not key:
+            return False
+        with self._lock:
+            if self._lookup(key) is not None:
+                return True
+            if self._pending >= self.max_pending:
+                return False
+            self._pending += 1
+            future = self._executor.submit(self._parse, key)
+            future.add_done_callback(self._on_done)
+            self._entries[key] = (time.monotonic(), future)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        return True
+
+    def peek(self, text):
+        """
+        獲取推測解析的結果，沒有推測過這段文本時不進行解析
+
+        Args:
+            text (str): 語音識別的最終結果
+
+        Returns:
+            list: 解析後的交易數據列表，沒有可用的推測結果時返回 None
+        """
+        key = normalize_utterance(text)
+        with self._lock:
+            future = self._lookup(key)
+        record_cache("speculative_parse", future is not None)
+        if future is not None:
+            try:
+                # 進行中的解析在這裡等待完成；複製結果，呼叫者可以修改
+                return copy.deepcopy(future.result())
+            except Exception as e:
+                print(f"推測解析錯誤: {str(e)}")
+        return None
+
+    def get(self, text):
+        """
+        解析語音識別的最終結果，優先使用推測解析的結果
+
+        Args:
+            text (str): 語音識別的最終結果
+
+        Returns:
+            list: 解析後的交易數據列表
+        """
+        transactions = self.peek(text)
+        if transactions is None:
+            transactions = self._parse(normalize_utterance(text))
+        return transactions
+
+    def clear(self):
+        """清除所有結果，例如更換解析器後"""
+        with self._lock:
+            self._entries.clear()
+
+    def _lookup(self, key):
+        """查詢仍有效的結果，呼叫者需要持有 _lock"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        created, future = entry
+        if time.monotonic() - created > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return future
+
+    def _on_done(self, future):
+        """推測解析完成"""
+        with self._lock:
+            self._pending -= 1
@@ -0,0 +1,198 @@
+/**
+ * OfflineQueue 類
+ * 以 IndexedDB 保存已確認但尚未送到伺服器的交易
+ * 每筆交易帶有客戶端產生的冪等鍵，重送時伺服器不會重複保存
+ * 頁面和 service worker 都可以使用
+ */
+class OfflineQueue {
+    constructor(dbName = 'fintrack', storeName = 'pending-transactions') {
+        this.dbName = dbName;
+        this.storeName = storeName;
+        // 每次同步最多送出的交易數
+        this.batchSize = 50;
+        this.flushing = null;
+        this.dbPromise = null;
+    }
+
+    /**
+     * 開啟資料庫
+     * @returns {Promise<IDBDatabase>}
+     */
+    open() {
+        if (!this.dbPromise) {
+            this.dbPromise = new Promise((resolve, reject) => {
+                const request = indexedDB.open(this.dbName, 1);
+                request.onupgradeneeded = () => {
+                    request.result.createObjectStore(this.storeName, { keyPath: 'idempotency_key' });
+                };
+                request.onsuccess = () => resolve(request.result);
+                request.onerror = () => reject(request.error);
+            });
+        }
+        return this.dbPromise;
+    }
+
+    /**
+     * 在交易中執行操作
+     * @param {string} mode - 'readonly' 或 'readwrite'
+     * @param {Function} operation - 接收 object store，返回 IDBRequest 或 undefined
+     * @returns {Promise<*>} 操作的結果
+     */
+    transaction(mode, operation) {
+        return this.open().then(db => new Promise((resolve, reject) => {
+            const tx = db.transaction(this.storeName, mode);
+            const request = operation(tx.objectStore(this.storeName));
+            tx.oncomplete = () => resolve(request ? request.result : undefined);
+            tx.onerror = () => reject(tx.error);
+        }));
+    }
+
+    /**
+     * 產生冪等鍵
+     * @returns {string}
+     */
+    static newKey() {
+        if (self.crypto && self.crypto.randomUUID) {
+            return self.crypto.randomUUID();
+        }
+        return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+    }
+
+    /**
+     * 檢查交易是否能被伺服器接受，與伺服器的驗證相同
+     * @param {Object} transaction - 交易
+     * @returns {boolean}
+     */
+    static isValid(transaction) {
+        const amount = Number(transaction.amount);
+        return ['income', 'expense'].includes(transaction.type)
+            && transaction.item !== undefined
+            && transaction.category !== undefined
+            && Number.isFinite(amount) && amount > 0;
+    }
+
+    /**
+     * 將交易加入佇列，沒有日期的交易使用今天，離線期間記錄的交易保留記錄當天的日期
+     * @param {Array} transactions - 交易列表，由舊到新排列
+     * @returns {Promise<Array>} 加入佇列的交易
+     */
+    enqueue(transactions) {
+        const today = new Date();
+        const date = `${today.getFullYear()}-${String(today.getMonth() + 1).padStart(2, '0')}-${String(today.getDate()).padStart(2, '0')}`;
+        const queued = transactions.map((transaction, index) => Object.assign({
+            date: date,
+            idempotency_key: OfflineQueue.newKey(),
+            queued_at: Date.now() + index / 1000
+        }, transaction));
+        return this.transaction('readwrite', store => {
+            queued.forEach(transaction => store.put(transaction));
+        }).then(() => queued);
+    }
+
+    /**
+     * 獲取佇列中等待送出的交易，由舊到新排列
+     * @returns {Promise<Array>}
+     */
+    pending() {
+        return this.transaction('readonly', store => store.getAll())
+            .then(transactions => transactions
+                .filter(transaction => !transaction.error)
+                .sort((a, b) => a.queued_at - b.queued_at));
+    }
+
+    /**
+     * 獲取被伺服器拒絕的交易，error 為拒絕原因；這些交易不再重送，頁面顯示給使用者後移除
+     * @returns {Promise<Array>}
+     */
+    rejected() {
+        return this.transaction('readonly', store => store.getAll())
+            .then(transactions => transactions
+                .filter(transaction => transaction.error)
+                .sort((a, b) => a.queued_at - b.queued_at));
+    }
+
+    /**
+     * 標記被伺服器拒絕的交易
+     * @param {Array} transactions - 交易列表，每筆包含 error
+     * @returns {Promise}
+     */
+    reject(transactions) {
+        return this.transaction('readwrite', store => {
+            transactions.forEach(transaction => store.put(transaction));
+        });
+    }
+
+    /**
+     * 從佇列移除交易
+     * @param {Array<string>} keys - 冪等鍵列表
+     * @returns {Promise}
+     */
+    remove(keys) {
+        return this.transaction('readwrite', store => {
+            keys.forEach(key => store.delete(key));
+        });
+    }
+
+    /**
+     * 將佇列中的交易分批送到 /api/record/batch
+     * 伺服器接受的交易從佇列移除，判定無效的交易標記為拒絕並保留到頁面顯示給使用者；
+     * 網路或伺服器錯誤時保留在佇列中，下次同步時重送
+     * @returns {Promise<number>} 已送出的交易數
+     */
+    flush() {
+        if (this.flushing) {
+            return this.flushing;
+        }
+        this.flushing = this.pending()
+            .then(transactions => this.sendBatches(transactions, 0))
+            .finally(() => {
+                this.flushing = null;
+            });
+        return this.flushing;
+    }
+
+    /**
+     * 依序送出各批交易
+     * @param {Array} transactions - 佇列中的交易
+     * @param {number} sent - 已送出的交易數
+     * @returns {Promise<number>} 已送出的交易數
+     */
+    sendBatches(transactions, sent) {
+        if (transactions.length === 0) {
+            return Promise.resolve(sent);
+        }
+        const batch = transactions.slice(0, this.batchSize);
+        const body = batch.map(({ queued_at, ...transaction }) => transaction);
+        return fetch('/api/record/batch', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(body)
+        })
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`同步失敗: ${response.status}`);
+            }
+            return response.json();
+        })
+        .then(data => {
+            const failed = new Map((data.results || [])
+                .filter(result => !result.success)
+                .map(result => [result.index, result.message || '無效的交易數據']));
+            const accepted = [];
+            const rejected = [];
+            batch.forEach((transaction, index) => {
+                if (failed.has(index)) {
+                    rejected.push(Object.assign({}, transaction, { error: failed.get(index) }));
+                } else {
+                    accepted.push(transaction);
+                }
+            });
+            return this.remove(accepted.map(transaction => transaction.idempotency_key))
+                .then(() => this.reject(rejected))
+                .then(() => accepted.length);
+        })
+        .then(accepted => this.sendBatches(transactions.slice(this.batchSize), sent + accepted));
+    }
+}
@@ -21,10 +21,22 @@ document.addEventListener('DOMContentLoaded', function() {
     const totalPoints = document.getElementById('total-points');
     const streakDays = document.getElementById('streak-days');
 
-    // 當前交易數據
-    let currentTransaction = null;
+    // 當前交易數據，一段語音可能包含多筆交易
+    let currentTransactions = null;
+    // 伺服器端保存解析結果的權杖，確認時只需送回權杖
+    let currentToken = null;
+    // 離線佇列：已確認的交易先保存在本地，再分批同步到伺服器
+    const offlineQueue = window.indexedDB ? new OfflineQueue() : null;
+    // 尚未同步的交易，先顯示在交易列表中
+    let pendingTransactions = [];
+    // 伺服器返回的最近交易
+    let serverTransactions = [];
     // 錄音狀態
     let isRecording = false;
+    // 中間結果停止變化多久後送出推測解析（毫秒）
+    const SPECULATIVE_DEBOUNCE_MS = 300;
+    let speculativeTimer = null;
+    let lastSpeculativeText = '';
 
     // 初始化語音識別
     let recognizer;
@@ -35,6 +47,9 @@ document.addEventListener('DOMContentLoaded', function() {
         // 設置結果回調
         recognizer.onResult(handleSpeechResult);
 
+        // 設置中間結果回調，說話期間先在後端推測解析
+        recognizer.onInterimResult(handleInterimResult);
+
         // 設置錯誤回調
         recognizer.onError(function(error) {
             recordingStatus.textContent = `錯誤: ${error}`;
@@ -95,19 +110,47 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // 確認按鈕點擊事件
     confirmBtn.addEventListener('click', function() {
-        if (currentTransaction) {
-            saveTransaction(currentTransaction);
+        if (currentToken && navigator.onLine) {
+            // 確認前產生冪等鍵，回應遺失時以相同的冪等鍵放入離線佇列，不會重複保存
+            currentTransactions = currentTransactions.map(transaction => Object.assign({
+                idempotency_key: OfflineQueue.newKey()
+            }, transaction));
+            confirmTransactions(currentToken, currentTransactions);
+        } else if (currentTransactions) {
+            saveTransactions(currentTransactions);
         }
     });
 
     // 取消按鈕點擊事件
     cancelBtn.addEventListener('click', function() {
         transcriptionResult.classList.add('hidden');
-        currentTransaction = null;
+        currentTransactions = null;
+        currentToken = null;
     });
 
+    // 處理語音識別中間結果：中間結果停止變化後送出推測解析
+    function handleInterimResult(text) {
+        recordingStatus.textContent = text;
+        clearTimeout(speculativeTimer);
+        speculativeTimer = setTimeout(() => {
+            if (text === lastSpeculativeText) return;
+            lastSpeculativeText = text;
+            fetch('/api/parse/speculative', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({ text: text })
+            }).catch(error => {
+                console.error('推測解析錯誤:', error);
+            });
+        }, SPECULATIVE_DEBOUNCE_MS);
+    }
+
     // 處理語音識別結果
     function handleSpeechResult(text) {
+        clearTimeout(speculativeTimer);
+        lastSpeculativeText = '';
         transcriptionText.textContent = text;
         
         // 發送到後端進行解析
@@ -116,16 +159,23 @@ document.addEventListener('DOMContentLoaded', function() {
             headers: {
                 'Content-Type': 'application/json'
             },
-            body: JSON.stringify({ text: text })
+            body: JSON.stringify({ text: text, multiple: true })
         })
         .then(response => response.json())
         .then(data => {
-            // 顯示解析結果
-            currentTransaction = data;
-            previewType.textContent = data.type === 'expense' ? '支出' : '收入';
-            previewItem.textContent = data.item;
-            previewCategory.textContent = data.category;
-            previewAmount.textContent = data.amount;
+            if (!data.transactions || data.transactions.length === 0) {
+                recordingStatus.textContent = `解析錯誤: ${data.error || '沒有解析到交易'}`;
+                return;
+            }
+
+            // 顯示解析結果，多筆交易以頓號分隔
+            currentTransactions = data.transactions;
+            currentToken = data.token || null;
+            const join = field => currentTransactions.map(field).join('、');
+            previewType.textContent = join(t => t.type === 'expense' ? '支出' : '收入');
+            previewItem.textContent = join(t => t.item);
+            previewCategory.textContent = join(t => t.category);
+            previewAmount.textContent = join(t => t.amount);
             
             transcriptionResult.classList.remove('hidden');
         })
@@ -134,26 +184,131 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
-    // 保存交易
-    function saveTransaction(transaction) {
-        fetch('/api/record', {
+    // 以權杖確認解析結果，回應中包含更新後的首頁數據，不需要重新載入
+    function confirmTransactions(token, transactions) {
+        fetch('/api/confirm', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
             },
-            body: JSON.stringify(transaction)
+            body: JSON.stringify({
+                token: token,
+                idempotency_keys: transactions.map(transaction => transaction.idempotency_key)
+            })
+        })
+        .then(response => {
+            // 權杖已過期時改為送出交易數據
+            if (response.status === 404) {
+                currentToken = null;
+                saveTransactions(transactions);
+                return null;
+            }
+            return response.json();
+        })
+        .then(data => {
+            if (!data) return;
+            if (data.success) {
+                transcriptionResult.classList.add('hidden');
+                currentTransactions = null;
+                currentToken = null;
+                recordingStatus.textContent = (data.count === 1 ? '交易已記錄！' : `已記錄 ${data.count} 筆交易！`) + budgetAlertText(data.alerts);
+                
+                updateSummary(data.dashboard.summary);
+                updateTransactions(data.dashboard.transactions);
+                updateGamification(data.dashboard.user);
+            } else {
+                recordingStatus.textContent = `錯誤: ${data.message}`;
+            }
+        })
+        .catch(() => {
+            // 網路錯誤時改為放入離線佇列；伺服器可能已經保存，佇列以相同的冪等鍵重送
+            currentToken = null;
+            saveTransactions(transactions);
+        });
+    }
+
+    // 保存交易：先放入離線佇列並立即顯示，再在背景同步到伺服器
+    function saveTransactions(transactions) {
+        // 無效的交易（例如沒有聽到金額）不放入佇列，讓使用者重新記錄
+        if (!transactions.every(OfflineQueue.isValid)) {
+            recordingStatus.textContent = '錯誤: 無效的交易數據，請確認金額';
+            return;
+        }
+        if (!offlineQueue) {
+            postTransactions(transactions);
+            return;
+        }
+        offlineQueue.enqueue(transactions)
+        .then(queued => {
+            transcriptionResult.classList.add('hidden');
+            currentTransactions = null;
+            currentToken = null;
+            pendingTransactions = queued.reverse().concat(pendingTransactions);
+            updateTransactions(serverTransactions);
+            recordingStatus.textContent = transactions.length === 1 ? '交易已記錄！' : `已記錄 ${transactions.length} 筆交易！`;
+            syncQueue();
+        })
+        .catch(() => {
+            // IndexedDB 無法使用時直接送出
+            postTransactions(transactions);
+        });
+    }
+
+    // 將離線佇列中的交易同步到伺服器
+    function syncQueue() {
+        if (!offlineQueue) return;
+        offlineQueue.flush()
+        .then(sent => offlineQueue.pending().then(pending => {
+            pendingTransactions = pending.reverse();
+            if (sent > 0) {
+                fetchData();
+            } else {
+                updateTransactions(serverTransactions);
+            }
+        }))
+        .then(reportRejected)
+        .catch(() => {
+            recordingStatus.textContent = '目前離線，交易會在恢復連線後同步';
+            // 支援 Background Sync 時，頁面關閉後也能由 service worker 同步
+            if ('serviceWorker' in navigator) {
+                navigator.serviceWorker.ready
+                    .then(registration => registration.sync && registration.sync.register('fintrack-sync'))
+                    .catch(() => undefined);
+            }
+        });
+    }
+
+    // 顯示伺服器拒絕的佇列交易，顯示後從佇列移除
+    function reportRejected() {
+        return offlineQueue.rejected().then(rejected => {
+            if (rejected.length === 0) return;
+            recordingStatus.textContent = `${rejected.length} 筆交易未能保存: ` +
+                rejected.map(transaction => `${transaction.item} ${transaction.amount}（${transaction.error}）`).join('、');
+            return offlineQueue.remove(rejected.map(transaction => transaction.idempotency_key));
+        });
+    }
+
+    // 直接送出交易，多筆交易使用批次記錄在一次請求中保存
+    function postTransactions(transactions) {
+        const single = transactions.length === 1;
+        fetch(single ? '/api/record' : '/api/record/batch', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(single ? transactions[0] : transactions)
         })
         .then(response => response.json())
         .then(data => {
             if (data.success) {
                 transcriptionResult.classList.add('hidden');
-                currentTransaction = null;
-                recordingStatus.textContent = '交易已記錄！';
+                currentTransactions = null;
+                recordingStatus.textContent = (transactions.length === 1 ? '交易已記錄！' : `已記錄 ${transactions.length} 筆交易！`) + budgetAlertText(data.alerts);
                 
                 // 更新數據顯示
                 fetchData();
             } else {
-                recordingStatus.textContent = `錯誤: ${data.message}`;
+                recordingStatus.textContent = `錯誤: ${data.message || '無效的交易數據'}`;
             }
         })
         .catch(error => {
@@ -161,9 +316,18 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
-    // 獲取數據並更新 UI
+    // 將預算提醒轉為狀態文字
+    function budgetAlertText(alerts) {
+        if (!alerts || alerts.length === 0) return '';
+        return alerts.map(alert => alert.remaining < 0
+            ? ` ${alert.category}本月已超出預算 ${-alert.remaining} 元`
+            : ` ${alert.category}本月已使用預算的 ${Math.round(alert.threshold * 100)}%，剩餘 ${alert.remaining} 元`
+        ).join('');
+    }
+
+    // 獲取首頁數據並更新 UI
     function fetchData() {
-        fetch('/api/data')
+        fetch('/api/dashboard?limit=5')
         .then(response => response.json())
         .then(data => {
             updateSummary(data.summary);
@@ -182,26 +346,27 @@ document.addEventListener('DOMContentLoaded', function() {
         totalSavings.textContent = `${summary.savings} 元`;
     }
 
-    // 更新交易列表
+    // 更新交易列表，尚未同步的交易顯示在最前面
     function updateTransactions(transactions) {
-        if (transactions.length === 0) {
+        serverTransactions = transactions;
+        const recentTrans = pendingTransactions.concat(transactions).slice(0, 5);
+        if (recentTrans.length === 0) {
             recentTransactions.innerHTML = '<p>尚無交易記錄</p>';
             return;
         }
 
         let html = '';
-        // 只顯示最近 5 筆交易
-        const recentTrans = transactions.slice(0, 5);
-        
         recentTrans.forEach(transaction => {
             const typeClass = transaction.type === 'expense' ? 'expense' : 'income';
             const typeSign = transaction.type === 'expense' ? '-' : '+';
+            const pendingLabel = transaction.queued_at ? '<span class="item-pending">待同步</span>' : '';
             
             html += `
                 <div class="transaction-item">
                     <div>
                         <span class="item-name">${transaction.item}</span>
                         <span class="item-category">${transaction.category}</span>
+                        ${pendingLabel}
                     </div>
                     <div class="item-amount ${typeClass}">${typeSign}${transaction.amount} 元</div>
                 </div>
@@ -217,6 +382,17 @@ document.addEventListener('DOMContentLoaded', function() {
         streakDays.textContent = `${user.streak} 天`;
     }
 
-    // 初始加載數據
+    // 註冊 service worker，快取靜態資源
+    if ('serviceWorker' in navigator) {
+        navigator.serviceWorker.register('/sw.js').catch(error => {
+            console.error('註冊 service worker 錯誤:', error);
+        });
+    }
+
+    // 恢復連線時同步離線佇列
+    window.addEventListener('online', syncQueue);
+
+    // 初始加載數據，並同步上次未送出的交易
     fetchData();
+    syncQueue();
 }); 
\ No newline at end of file
@@ -39,6 +39,14 @@ class SpeechRecognizer {
         throw new Error("子類必須實現 onResult 方法");
     }
 
+    /**
+     * 設置中間結果回調函數
+     * 說話期間以尚未確定的識別文本呼叫，預設不提供中間結果，子類可以選擇實現
+     * @param {Function} callback - 回調函數，接收中間結果文本
+     */
+    onInterimResult(callback) {
+    }
+
     /**
      * 設置錯誤回調函數
      * @param {Function} callback - 回調函數，接收錯誤信息
@@ -0,0 +1,66 @@
+/**
+ * FinTrack service worker
+ * 快取首頁和靜態資源，離線或網路緩慢時立即啟動；
+ * 瀏覽器支援 Background Sync 時，恢復連線後在背景送出離線佇列中的交易
+ */
+importScripts('/static/js/offlineQueue.js');
+
+const CACHE_NAME = 'fintrack-static-v1';
+const STATIC_ASSETS = [
+    '/',
+    '/static/css/style.css',
+    '/static/js/speechRecognizer.js',
+    '/static/js/webSpeechRecognizer.js',
+    '/static/js/offlineQueue.js',
+    '/static/js/script.js'
+];
+const SYNC_TAG = 'fintrack-sync';
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(CACHE_NAME)
+            .then(cache => cache.addAll(STATIC_ASSETS))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    // 移除舊版本的快取
+    event.waitUntil(
+        caches.keys()
+            .then(names => Promise.all(names.filter(name => name !== CACHE_NAME).map(name => caches.delete(name))))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', event => {
+    const url = new URL(event.request.url);
+    // API 請求和其他網站的請求不經過快取
+    if (event.request.method !== 'GET' || url.origin !== self.location.origin || url.pathname.startsWith('/api/')) {
+        return;
+    }
+
+    // 先返回快取，同時在背景更新快取，下次啟動使用新版本
+    event.respondWith(
+        caches.open(CACHE_NAME).then(cache => cache.match(event.request).then(cached => {
+            const network = fetch(event.request)
+                .then(response => {
+                    if (response.ok) {
+                        cache.put(event.request, response.clone());
+                    }
+                    return response;
+                });
+            if (cached) {
+                event.waitUntil(network.catch(() => undefined));
+                return cached;
+            }
+            return network;
+        }))
+    );
+});
+
+self.addEventListener('sync', event => {
+    if (event.tag === SYNC_TAG) {
+        event.waitUntil(new OfflineQueue().flush());
+    }
+});
@@ -22,6 +22,7 @@ class WebSpeechRecognizer extends SpeechRecognizer {
         
         // 初始化回調函數
         this.resultCallback = null;
+        this.interimCallback = null;
         this.errorCallback = null;
         this.endCallback = null;
         
@@ -31,6 +32,8 @@ class WebSpeechRecognizer extends SpeechRecognizer {
                 const result = event.results[event.results.length - 1];
                 if (result.isFinal && this.resultCallback) {
                     this.resultCallback(result[0].transcript);
+                } else if (!result.isFinal && this.interimCallback) {
+                    this.interimCallback(result[0].transcript);
                 }
             }
         };
@@ -78,6 +81,15 @@ class WebSpeechRecognizer extends SpeechRecognizer {
         this.resultCallback = callback;
     }
     
+    /**
+     * 設置中間結果回調函數，設置後啟用 interimResults
+     * @param {Function} callback - 回調函數，接收中間結果文本
+     */
+    onInterimResult(callback) {
+        this.interimCallback = callback;
+        this.recognition.interimResults = Boolean(callback);
+    }
+    
     /**
      * 設置錯誤回調函數
      * @param {Function} callback - 回調函數，接收錯誤信息
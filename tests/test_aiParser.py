@@ -2,7 +2,8 @@ import unittest
 import json
 import os
 from unittest.mock import patch, MagicMock
-from aiParser import AIParser, LocalRuleParser, OpenAIParser, XAIGrokParser, create_parser
+from aiParser import AIParser, LocalRuleParser, OpenAIParser, XAIGrokParser, create_parser, split_utterance
+from metrics import PARSER_FALLBACK
 
 class TestLocalRuleParser(unittest.TestCase):
     """測試本地規則解析器"""
@@ -85,6 +86,55 @@ class TestLocalRuleParser(unittest.TestCase):
         # 測試收入類別
         self.assertEqual(self.parser._guess_category("任何項目", "income"), "income")
 
+    def test_parse_spoken_amounts(self):
+        """測試解析中文數字金額"""
+        result = self.parser.parse_transaction("午餐一百五十元")
+        self.assertEqual(result["item"], "午餐")
+        self.assertEqual(result["amount"], 150.0)
+        
+        result = self.parser.parse_transaction("紅包 兩千三")
+        self.assertEqual(result["type"], "income")
+        self.assertEqual(result["amount"], 2300.0)
+        
+        self.assertEqual(self.parser.parse_transaction("房租 3萬")["amount"], 30000.0)
+    
+    def test_classifier_overrides_keywords(self):
+        """測試分類器優先於關鍵詞規則，信心不足時使用關鍵詞規則"""
+        classifier = MagicMock()
+        classifier.predict.return_value = ("pets", 0.9)
+        parser = LocalRuleParser(classifier=classifier)
+        
+        self.assertEqual(parser.parse_transaction("貓飼料 300 元")["category"], "pets")
+        classifier.predict.assert_called_once_with("貓飼料")
+        
+        classifier.predict.return_value = None
+        self.assertEqual(parser.parse_transaction("咖啡 5 元")["category"], "food")
+        
+        # 收入不使用分類器
+        self.assertEqual(parser.parse_transaction("薪水 50000 元")["category"], "income")
+        self.assertEqual(classifier.predict.call_count, 2)
+    
+    def test_split_utterance(self):
+        """測試將一段文本切分為多筆交易"""
+        self.assertEqual(split_utterance("早餐 60 午餐 120 捷運 30"), ["早餐 60", "午餐 120", "捷運 30"])
+        self.assertEqual(split_utterance("早餐六十，還有午餐一百二十元"), ["早餐60", "午餐120 元"])
+        self.assertEqual(split_utterance("咖啡 5 元"), ["咖啡 5 元"])
+        self.assertEqual(split_utterance("咖啡"), ["咖啡"])
+        
+        self.assertEqual(split_utterance("房租 一點五萬 水費 三百"), ["房租 15000", "水費 300"])
+        
+        # 後面接著量詞的數字是數量，不會切開交易
+        self.assertEqual(split_utterance("我 買了 一 個 蘋果 30"), ["我 買了 1 個 蘋果 30"])
+        self.assertEqual(split_utterance("早餐 60 午餐 2 杯 咖啡 120"), ["早餐 60", "午餐 2 杯 咖啡 120"])
+    
+    def test_parse_transactions(self):
+        """測試解析包含多筆交易的文本"""
+        results = self.parser.parse_transactions("早餐 60 薪水 50000 元 然後 捷運 30")
+        
+        self.assertEqual([r["item"] for r in results], ["早餐", "薪水", "捷運"])
+        self.assertEqual([r["type"] for r in results], ["expense", "income", "expense"])
+        self.assertEqual([r["amount"] for r in results], [60.0, 50000.0, 30.0])
+
 class TestOpenAIParser(unittest.TestCase):
     """測試 OpenAI 解析器"""
     
@@ -93,7 +143,7 @@ class TestOpenAIParser(unittest.TestCase):
         """設置測試環境"""
         self.parser = OpenAIParser()
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_parse_transaction(self, mock_post):
         """測試使用 OpenAI API 解析交易"""
         # 模擬 API 回應
@@ -131,20 +181,62 @@ class TestOpenAIParser(unittest.TestCase):
         self.assertEqual(kwargs["json"]["model"], "gpt-3.5-turbo")
         self.assertIn("咖啡 5 元", kwargs["json"]["messages"][0]["content"])
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_api_error_fallback(self, mock_post):
         """測試 API 錯誤時的備用解析"""
         # 模擬 API 錯誤
         mock_post.side_effect = Exception("API 錯誤")
+        fallbacks = PARSER_FALLBACK.labels(provider="openai").value()
         
         # 調用函數
         result = self.parser.parse_transaction("咖啡 5 元")
         
+        # 驗證備用解析次數被記錄
+        self.assertEqual(PARSER_FALLBACK.labels(provider="openai").value(), fallbacks + 1)
+        
         # 驗證結果（應該使用備用解析）
         self.assertEqual(result["type"], "expense")
         self.assertEqual(result["item"], "咖啡")
         self.assertEqual(result["category"], "food")
         self.assertEqual(result["amount"], 5.0)
+    
+    @patch('requests.Session.post')
+    def test_parse_transactions(self, mock_post):
+        """測試一次請求解析多筆交易"""
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            "choices": [{"message": {"content": json.dumps([
+                {"type": "expense", "item": "早餐", "category": "food", "amount": "60"},
+                {"type": "expense", "item": "捷運", "category": "transport", "amount": 30}
+            ])}}]
+        }
+        mock_post.return_value = mock_response
+        
+        results = self.parser.parse_transactions("早餐 60 捷運 30")
+        
+        mock_post.assert_called_once()
+        self.assertEqual([r["item"] for r in results], ["早餐", "捷運"])
+        self.assertEqual([r["amount"] for r in results], [60.0, 30.0])
+        
+        # API 錯誤時逐段使用備用解析
+        mock_post.side_effect = Exception("API 錯誤")
+        results = self.parser.parse_transactions("早餐 60 捷運 30")
+        self.assertEqual([r["item"] for r in results], ["早餐", "捷運"])
+    
+    @patch('requests.Session.head')
+    def test_warm_up_and_close(self, mock_head):
+        """測試預熱時建立到 API 的連線，關閉時關閉連線池"""
+        self.parser.warm_up()
+        mock_head.assert_called_once()
+        self.assertEqual(mock_head.call_args[0][0], "https://api.openai.com/v1/chat/completions")
+        
+        # 預熱失敗不影響解析器
+        mock_head.side_effect = Exception("連線錯誤")
+        self.parser.warm_up()
+        
+        with patch.object(self.parser.session, 'close') as mock_close:
+            self.parser.close()
+        mock_close.assert_called_once()
 
 class TestXAIGrokParser(unittest.TestCase):
     """測試 XAI Grok 解析器"""
@@ -154,7 +246,7 @@ class TestXAIGrokParser(unittest.TestCase):
         """設置測試環境"""
         self.parser = XAIGrokParser()
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_parse_transaction(self, mock_post):
         """測試使用 XAI Grok API 解析交易"""
         # 模擬 API 回應
@@ -192,7 +284,7 @@ class TestXAIGrokParser(unittest.TestCase):
         self.assertEqual(kwargs["json"]["model"], "mixtral-8x7b-32768")
         self.assertIn("咖啡 5 元", kwargs["json"]["messages"][0]["content"])
     
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_api_error_fallback(self, mock_post):
         """測試 API 錯誤時的備用解析"""
         # 模擬 API 錯誤
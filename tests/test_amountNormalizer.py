@@ -0,0 +1,47 @@
+import unittest
+from amountNormalizer import normalize_amounts, parse_chinese_number
+
+class TestAmountNormalizer(unittest.TestCase):
+    """測試口語金額正規化"""
+
+    def test_parse_chinese_number(self):
+        """測試中文數字轉換"""
+        cases = {
+            "五十": 50, "十五": 15, "一百五十": 150, "一百五": 150, "兩千三": 2300,
+            "一萬五": 15000, "一百零五": 105, "兩千零三十": 2030, "3萬": 30000,
+            "1.5萬": 15000, "3千5": 3500, "三億五千萬": 350000000, "二零二五": 2025,
+            "三點五": 3.5, "１２０": 120, "一點五萬": 15000, "三點二千": 3200,
+        }
+        for text, expected in cases.items():
+            self.assertEqual(parse_chinese_number(text), expected, text)
+
+        self.assertIsNone(parse_chinese_number("三明"))
+
+    def test_normalize_amounts(self):
+        """測試文本中的金額轉換"""
+        cases = {
+            "午餐一百五十元": "午餐150 元",
+            "紅包 兩千三": "紅包 2300",
+            "房租 3萬": "房租 30000",
+            "車費三塊五": "車費3.5 元",
+            "糖果 五毛": "糖果 0.5 元",
+            "早餐 １２０ 元": "早餐 120 元",
+            "加油 1,500 元": "加油 1500 元",
+            "咖啡 5 元": "咖啡 5 元",
+            "早餐六十午餐一百二十": "早餐60午餐120",
+            "早餐五十元午餐八十": "早餐50 元午餐80",
+            "房租一萬五水費三百": "房租15000水費300",
+            "房租 一點五萬": "房租 15000",
+            "獎金三點二千元": "獎金3200 元",
+        }
+        for text, expected in cases.items():
+            self.assertEqual(normalize_amounts(text), expected, text)
+
+    def test_item_names_unchanged(self):
+        """測試項目名稱中的數字字元不會被轉換"""
+        for text in ("三明治 50", "一月房租 15000", "百貨公司 500", "十全大補湯 300",
+                     "買三個蘋果 30", "萬 ", "千元 500"):
+            self.assertEqual(normalize_amounts(text), text)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,11 @@
 import unittest
 import json
 import os
-from app import app, validate_transaction, load_config
+import tempfile
+import app as app_module
+from app import app, validate_transaction, load_config, create_app, on_config_change
+from configService import ConfigService, ConfigSnapshot, DEFAULT_CONFIG
+from partitionedJsonStorage import PartitionedJsonStorage
 from unittest.mock import patch, MagicMock
 
 class TestApp(unittest.TestCase):
@@ -17,6 +21,15 @@ class TestApp(unittest.TestCase):
         response = self.client.get('/')
         self.assertEqual(response.status_code, 200)
         
+    def test_service_worker_route(self):
+        """測試 service worker 從網站根目錄提供且不被快取"""
+        response = self.client.get('/sw.js')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('application/javascript'))
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+        self.assertIn(b'fintrack-sync', response.data)
+        response.close()
+        
     @patch('app.transaction_parser')
     def test_parse_text_route(self, mock_parser):
         """測試解析文本路由"""
@@ -69,7 +82,7 @@ class TestApp(unittest.TestCase):
         self.assertTrue(data["success"])
         
         # 驗證存儲被正確調用
-        mock_storage.save_transaction.assert_called_once_with(transaction)
+        mock_storage.save_transaction.assert_called_once_with(transaction, [])
         
     @patch('app.data_storage')
     def test_record_transaction_route_invalid(self, mock_storage):
@@ -133,6 +146,288 @@ class TestApp(unittest.TestCase):
         # 驗證存儲被正確調用
         mock_storage.get_data.assert_called_once()
         
+    @patch('app.data_storage')
+    def test_list_transactions_route(self, mock_storage):
+        """測試依日期篩選交易路由"""
+        mock_storage.get_transactions.return_value = [{"type": "expense", "item": "咖啡", "category": "food", "amount": 5.0, "date": "2025-03-06"}]
+        
+        response = self.client.get('/api/transactions?from=2025-03-01&to=2025-03-31')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.data)["transactions"]), 1)
+        mock_storage.get_transactions.assert_called_once_with("2025-03-01", "2025-03-31")
+        
+        # 日期格式錯誤
+        response = self.client.get('/api/transactions?from=2025/03/01')
+        self.assertEqual(response.status_code, 400)
+        
+    @patch('app.transaction_parser')
+    def test_parse_multiple_route(self, mock_parser):
+        """測試解析包含多筆交易的文本"""
+        mock_parser.parse_transactions.return_value = [
+            {"type": "expense", "item": "早餐", "category": "food", "amount": 60.0},
+            {"type": "expense", "item": "午餐", "category": "food", "amount": 120.0}
+        ]
+        
+        response = self.client.post('/api/parse', json={"text": "早餐 60 午餐 120", "multiple": True})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.data)["transactions"]), 2)
+        mock_parser.parse_transactions.assert_called_once_with("早餐 60 午餐 120")
+        
+    @patch('app.transaction_parser')
+    def test_speculative_parse_route(self, mock_parser):
+        """測試推測解析中間結果，最終文本相同時重用結果"""
+        mock_parser.parse_transactions.return_value = [{"type": "expense", "item": "晚餐", "category": "food", "amount": 200.0}]
+        
+        response = self.client.post('/api/parse/speculative', json={"text": "晚餐 200 元"})
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(json.loads(response.data)["accepted"])
+        
+        response = self.client.post('/api/parse', json={"text": "晚餐 200 元。", "multiple": True})
+        self.assertEqual(json.loads(response.data)["transactions"][0]["item"], "晚餐")
+        mock_parser.parse_transactions.assert_called_once_with("晚餐 200 元")
+        
+        # 單筆解析也使用推測解析的結果
+        response = self.client.post('/api/parse', json={"text": "晚餐 200 元"})
+        self.assertEqual(json.loads(response.data)["item"], "晚餐")
+        mock_parser.parse_transaction.assert_not_called()
+        
+        self.assertEqual(self.client.post('/api/parse/speculative', json={"text": " "}).status_code, 400)
+        
+    @patch('app.data_storage')
+    @patch('app.transaction_parser')
+    def test_confirm_parsed_transactions(self, mock_parser, mock_storage):
+        """測試以解析權杖確認交易，回應包含更新後的首頁數據"""
+        transactions = [{"type": "expense", "item": "宵夜", "category": "food", "amount": 80.0}]
+        mock_parser.parse_transactions.return_value = transactions
+        mock_storage.save_transactions.return_value = True
+        mock_storage.get_dashboard.return_value = {
+            "transactions": transactions,
+            "summary": {"income": 0, "expense": 80.0, "savings": -80.0},
+            "user": {"points": 10, "streak": 1, "last_record_date": None}
+        }
+        
+        token = json.loads(self.client.post('/api/parse', json={"text": "宵夜 80", "multiple": True}).data)["token"]
+        
+        response = self.client.post('/api/confirm', json={"token": token})
+        
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data["count"], 1)
+        self.assertEqual(data["dashboard"]["summary"]["expense"], 80.0)
+        mock_storage.save_transactions.assert_called_once_with(transactions, [])
+        
+        # 權杖只能使用一次
+        self.assertEqual(self.client.post('/api/confirm', json={"token": token}).status_code, 404)
+        self.assertEqual(self.client.post('/api/confirm', json={}).status_code, 404)
+        
+        # 保存失敗時可以重試
+        token = json.loads(self.client.post('/api/parse', json={"text": "宵夜 80", "multiple": True}).data)["token"]
+        mock_storage.save_transactions.return_value = False
+        self.assertEqual(self.client.post('/api/confirm', json={"token": token}).status_code, 500)
+        mock_storage.save_transactions.return_value = True
+        self.assertEqual(self.client.post('/api/confirm', json={"token": token}).status_code, 200)
+        
+    @patch('app.transaction_parser')
+    def test_confirm_with_idempotency_keys(self, mock_parser):
+        """測試確認時附上冪等鍵，回應遺失後以相同冪等鍵重送不會重複保存"""
+        mock_parser.parse_transactions.return_value = [
+            {"type": "expense", "item": "早餐", "category": "food", "amount": 60.0},
+            {"type": "expense", "item": "午餐", "category": "food", "amount": 120.0}
+        ]
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            storage = PartitionedJsonStorage(os.path.join(temp_dir, "parts"))
+            with patch.object(app_module, 'data_storage', storage):
+                token = json.loads(self.client.post('/api/parse', json={"text": "早餐 60 午餐 120", "multiple": True}).data)["token"]
+                response = self.client.post('/api/confirm', json={"token": token, "idempotency_keys": ["k1"]})
+                self.assertEqual(response.status_code, 400)
+                
+                response = self.client.post('/api/confirm', json={"token": token, "idempotency_keys": ["k1", "k2"]})
+                self.assertEqual(response.status_code, 200)
+                
+                # 離線佇列重送相同的交易
+                retry = [dict(t, idempotency_key=key) for t, key in zip(mock_parser.parse_transactions.return_value, ["k1", "k2"])]
+                response = self.client.post('/api/record/batch', json=retry)
+                self.assertEqual(response.status_code, 200)
+            
+            self.assertEqual(len(storage.get_transactions()), 2)
+        
+    def test_record_transaction_idempotency_key(self):
+        """測試以相同冪等鍵重送的請求不會重複保存，返回相同的結果"""
+        transaction = {"type": "expense", "item": "計程車", "category": "transport", "amount": 250.0}
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            storage = PartitionedJsonStorage(os.path.join(temp_dir, "parts"))
+            with patch.object(app_module, 'data_storage', storage):
+                responses = [
+                    self.client.post('/api/record', json=dict(transaction), headers={"Idempotency-Key": "retry-1"})
+                    for _ in range(2)
+                ]
+                batch = [dict(transaction, idempotency_key=f"batch-1:{index}") for index in range(2)]
+                self.client.post('/api/record/batch', json=batch)
+                self.client.post('/api/record/batch', json=batch)
+                
+                self.assertEqual(self.client.post('/api/record', json=transaction, headers={"Idempotency-Key": "x" * 65}).status_code, 400)
+            
+            self.assertEqual([json.loads(r.data) for r in responses], [{"success": True}, {"success": True}])
+            keys = [t["idempotency_key"] for t in storage.get_transactions()]
+            self.assertEqual(keys, ["batch-1:1", "batch-1:0", "retry-1"])
+        
+    def test_budgets(self):
+        """測試設定預算，支出超過門檻時記錄交易的回應包含提醒"""
+        transaction = {"type": "expense", "item": "晚餐", "category": "food", "amount": 450.0}
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            storage = PartitionedJsonStorage(os.path.join(temp_dir, "parts"))
+            with patch.object(app_module, 'data_storage', storage):
+                self.assertEqual(self.client.post('/api/budgets', json={"category": "food", "limit": -1}).status_code, 400)
+                self.assertEqual(self.client.post('/api/budgets', json={"limit": 500}).status_code, 400)
+                response = self.client.post('/api/budgets', json={"category": "food", "limit": 500})
+                self.assertEqual(json.loads(response.data)["budgets"][0]["remaining"], 500)
+                
+                first = json.loads(self.client.post('/api/record', json=dict(transaction)).data)
+                second = json.loads(self.client.post('/api/record', json=dict(transaction)).data)
+                status = json.loads(self.client.get('/api/budgets').data)
+            
+            self.assertEqual(first["alerts"][0]["threshold"], 0.8)
+            self.assertEqual([alert["threshold"] for alert in second["alerts"]], [1.0])
+            self.assertEqual(status["budgets"][0]["spent"], 900.0)
+        
+    @patch('app.recurring_scheduler')
+    def test_recurring_rules(self, mock_scheduler):
+        """測試新增、列出和移除定期交易規則，新增後喚醒排程器"""
+        rule = {"type": "expense", "item": "房租", "category": "housing", "amount": 15000, "frequency": "monthly", "start_date": "2025-01-05"}
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            storage = PartitionedJsonStorage(os.path.join(temp_dir, "parts"))
+            with patch.object(app_module, 'data_storage', storage):
+                self.assertEqual(self.client.post('/api/recurring', json=dict(rule, frequency="yearly")).status_code, 400)
+                self.assertEqual(self.client.post('/api/recurring', json=dict(rule, start_date="2025/01/05")).status_code, 400)
+                
+                response = self.client.post('/api/recurring', json=rule)
+                self.assertEqual(response.status_code, 201)
+                rule_id = json.loads(response.data)["rule"]["id"]
+                mock_scheduler.wake.assert_called_once()
+                
+                rules = json.loads(self.client.get('/api/recurring').data)["rules"]
+                self.assertEqual([(r["id"], r["next_date"], r["day"]) for r in rules], [(rule_id, "2025-01-05", 5)])
+                
+                self.assertEqual(self.client.delete(f'/api/recurring/{rule_id}').status_code, 200)
+                self.assertEqual(self.client.delete(f'/api/recurring/{rule_id}').status_code, 404)
+                self.assertEqual(storage.get_recurring_rules(), [])
+        mock_scheduler.start.assert_not_called()
+        
+    def test_export(self):
+        """測試以分塊傳輸匯出 CSV 和 JSONL"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            storage = PartitionedJsonStorage(os.path.join(temp_dir, "parts"))
+            storage.save_transactions([
+                {"type": "expense", "item": "房租", "category": "housing", "amount": 15000.0, "date": "2025-01-05"},
+                {"type": "expense", "item": "=咖啡", "category": "food", "amount": 5.0, "date": "2025-02-01"},
+            ])
+            with patch.object(app_module, 'data_storage', storage):
+                self.assertEqual(self.client.get('/api/export?format=xml').status_code, 400)
+                self.assertEqual(self.client.get('/api/export?from=2025/01/01').status_code, 400)
+                
+                response = self.client.get('/api/export')
+                self.assertTrue(response.is_streamed)
+                csv_text = response.get_data(as_text=True)
+                jsonl = self.client.get('/api/export?format=jsonl&from=2025-02-01').get_data(as_text=True)
+        
+        self.assertTrue(response.content_type.startswith('text/csv'))
+        self.assertIn('attachment', response.headers['Content-Disposition'])
+        self.assertEqual(csv_text.lstrip('\ufeff').splitlines(), [
+            "date,type,item,category,amount",
+            "2025-01-05,expense,房租,housing,15000.0",
+            "2025-02-01,expense,'=咖啡,food,5.0",
+        ])
+        self.assertEqual([json.loads(line) for line in jsonl.splitlines()], [
+            {"date": "2025-02-01", "type": "expense", "item": "=咖啡", "category": "food", "amount": 5.0}
+        ])
+        
+    @patch('app.data_storage')
+    def test_record_transaction_rejects_list(self, mock_storage):
+        """測試記錄交易只接受單筆交易，多筆交易使用批次記錄"""
+        transactions = [
+            {"type": "expense", "item": "早餐", "category": "food", "amount": 60.0},
+            {"type": "expense", "item": "午餐", "category": "food", "amount": 120.0}
+        ]
+        
+        self.assertEqual(self.client.post('/api/record', json=transactions).status_code, 400)
+        self.assertEqual(self.client.post('/api/record', json=[]).status_code, 400)
+        mock_storage.save_transaction.assert_not_called()
+        mock_storage.save_transactions.assert_not_called()
+        
+    @patch('app.data_storage')
+    def test_record_transactions_batch(self, mock_storage):
+        """測試批次記錄交易，無效的交易不影響其他交易"""
+        mock_storage.save_transactions.return_value = True
+        transactions = [
+            {"type": "expense", "item": "早餐", "category": "food", "amount": 60.0, "date": "2025-03-01"},
+            {"type": "expense"},
+            {"type": "income", "item": "薪水", "category": "salary", "amount": 30000.0}
+        ]
+        
+        response = self.client.post('/api/record/batch', json=transactions)
+        
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertFalse(data["success"])
+        self.assertEqual(data["saved"], 2)
+        self.assertEqual([r["success"] for r in data["results"]], [True, False, True])
+        # 有效的交易在一次存儲寫入中保存
+        mock_storage.save_transactions.assert_called_once_with([transactions[0], transactions[2]], [])
+        
+        # 存儲失敗時所有交易都標記為失敗
+        mock_storage.save_transactions.return_value = False
+        response = self.client.post('/api/record/batch', json=[transactions[0]])
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(json.loads(response.data)["results"][0]["success"])
+        
+        # 請求內容不是列表
+        self.assertEqual(self.client.post('/api/record/batch', json=transactions[0]).status_code, 400)
+        
+    @patch('app.data_storage')
+    def test_dashboard_route(self, mock_storage):
+        """測試首頁數據路由"""
+        mock_storage.get_dashboard.return_value = {
+            "transactions": [],
+            "summary": {"income": 0, "expense": 0, "savings": 0},
+            "user": {"points": 0, "streak": 0, "last_record_date": None}
+        }
+        
+        response = self.client.get('/api/dashboard')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)["summary"]["savings"], 0)
+        mock_storage.get_dashboard.assert_called_once_with(5)
+        
+        self.assertEqual(self.client.get('/api/dashboard?limit=0').status_code, 400)
+        self.assertEqual(self.client.get('/api/dashboard?limit=abc').status_code, 400)
+        
+    @patch('app.search_index')
+    def test_search_transactions_route(self, mock_index):
+        """測試搜尋交易路由"""
+        mock_index.search.return_value = {
+            "total": 1,
+            "results": [{"type": "expense", "item": "咖啡", "category": "food", "amount": 5.0, "date": "2025-03-06"}]
+        }
+        
+        response = self.client.get('/api/search?q=咖啡&page=1&page_size=10')
+        
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data["total"], 1)
+        self.assertEqual(data["results"][0]["item"], "咖啡")
+        mock_index.search.assert_called_once_with("咖啡", 1, 10)
+        
+        # 缺少搜尋文字或分頁參數錯誤
+        self.assertEqual(self.client.get('/api/search?q=').status_code, 400)
+        self.assertEqual(self.client.get('/api/search?q=咖啡&page=0').status_code, 400)
+        self.assertEqual(self.client.get('/api/search?q=咖啡&page_size=abc').status_code, 400)
+        
     def test_validate_transaction(self):
         """測試交易驗證功能"""
         # 有效交易
@@ -180,6 +475,16 @@ class TestApp(unittest.TestCase):
         }
         self.assertFalse(validate_transaction(invalid_transaction4))
         
+        # 日期：可以補記過去的日期，不能是未來或格式錯誤
+        self.assertTrue(validate_transaction(dict(valid_transaction, date="2025-03-01")))
+        self.assertFalse(validate_transaction(dict(valid_transaction, date="2999-01-01")))
+        self.assertFalse(validate_transaction(dict(valid_transaction, date="03/01/2025")))
+        
+        # 冪等鍵：必須是不超過 64 個字元的字串
+        self.assertTrue(validate_transaction(dict(valid_transaction, idempotency_key="2f1c-4b7e")))
+        self.assertFalse(validate_transaction(dict(valid_transaction, idempotency_key="x" * 65)))
+        self.assertFalse(validate_transaction(dict(valid_transaction, idempotency_key=123)))
+        
     @patch('app.os.path.exists')
     @patch('builtins.open')
     def test_load_config(self, mock_open, mock_exists):
@@ -217,5 +522,119 @@ class TestApp(unittest.TestCase):
         self.assertIsNone(config["xai_grok_api_key"])
         self.assertEqual(config["openai_model"], "gpt-3.5-turbo")
 
+    def test_create_app(self):
+        """測試應用程式工廠"""
+        new_app = create_app()
+        self.assertIsNot(new_app, app)
+        
+        # 新的應用程式應該有相同的路由
+        rules = {rule.rule for rule in new_app.url_map.iter_rules()}
+        self.assertIn('/api/parse', rules)
+        self.assertIn('/api/record', rules)
+        self.assertIn('/api/data', rules)
+        
+    def test_import_does_not_create_parser_or_storage(self):
+        """測試匯入模組時不會建立解析器和存儲"""
+        self.assertIsInstance(app_module.transaction_parser, app_module.LazyInstance)
+        self.assertFalse(app_module.data_storage.initialized)
+        
+    @patch('app.data_storage')
+    def test_metrics_route(self, mock_storage):
+        """測試指標路由"""
+        mock_storage.get_data.return_value = {"transactions": []}
+        self.client.get('/api/data')
+        
+        response = self.client.get('/metrics')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        body = response.get_data(as_text=True)
+        self.assertIn('fintrack_http_request_duration_seconds_count{method="GET",endpoint="/api/data",status="200"}', body)
+        self.assertIn('# TYPE fintrack_storage_operation_duration_seconds histogram', body)
+        
+    @patch('app.transaction_parser')
+    def test_parse_text_debug_trace(self, mock_parser):
+        """測試啟用除錯標頭時輸出追蹤資訊"""
+        mock_parser.parse_transaction.return_value = {"type": "expense", "item": "咖啡", "category": "food", "amount": 5.0}
+        snapshot = ConfigSnapshot(1, None, dict(DEFAULT_CONFIG, trace_debug_header=True))
+        
+        with patch.object(app_module.config_service, 'get', return_value=snapshot):
+            # 未要求追蹤且取樣率為 0
+            response = self.client.post('/api/parse', json={"text": "咖啡 5 元"})
+            self.assertNotIn("X-Trace-Id", response.headers)
+            
+            # 以請求標頭強制追蹤
+            response = self.client.post('/api/parse', json={"text": "咖啡 5 元"}, headers={"X-Trace": "1"})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("X-Trace-Id", response.headers)
+        self.assertIn("parser.parse_transaction;dur=", response.headers["Server-Timing"])
+        self.assertIn("POST_/api/parse;dur=", response.headers["Server-Timing"])
+        
+    @patch('app.threading.Timer')
+    @patch('app.build_parser')
+    def test_on_config_change(self, mock_build, mock_timer):
+        """測試解析器相關配置變更時替換解析器"""
+        old = ConfigSnapshot(1, 1.0, {"parser_type": "local", "openai_model": "gpt-3.5-turbo"})
+        
+        with patch.object(app_module, 'transaction_parser') as mock_parser:
+            mock_parser.initialized = True
+            
+            # 無關的配置變更不會重建解析器
+            new = ConfigSnapshot(2, 2.0, dict(old.data, theme="dark"))
+            on_config_change(old, new)
+            mock_build.assert_not_called()
+            mock_parser.swap.assert_not_called()
+            
+            # 解析器類型變更時建立新解析器並替換
+            new = ConfigSnapshot(3, 3.0, dict(old.data, parser_type="openai"))
+            on_config_change(old, new)
+            mock_build.assert_called_once_with(new)
+            mock_parser.swap.assert_called_once_with(mock_build.return_value)
+            # 新的解析器在替換前預熱，舊的解析器在進行中的解析完成後才關閉
+            mock_build.return_value.warm_up.assert_called_once()
+            old_parser = mock_parser.swap.return_value
+            old_parser.close.assert_not_called()
+            mock_timer.assert_called_once_with(app_module.PARSER_RETIRE_DELAY, old_parser.close)
+            mock_timer.return_value.start.assert_called_once()
+    
+    @patch('app.threading.Thread')
+    def test_update_parser_config(self, mock_thread):
+        """測試切換解析器：保存配置後在背景執行緒載入新配置"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            service = ConfigService(os.path.join(temp_dir, "config.json"), watch=False)
+            listener = MagicMock()
+            service.subscribe(listener)
+            service.get()
+            
+            with patch.object(app_module, 'config_service', service):
+                response = self.client.post('/api/config/parser', json={"type": "openai", "api_key": "sk-test", "model": "gpt-4"})
+                self.assertEqual(response.status_code, 202)
+                self.assertTrue(json.loads(response.data)["success"])
+                
+                # 請求不等待新的解析器建立
+                listener.assert_not_called()
+                mock_thread.call_args.kwargs["target"]()
+                
+                old, new = listener.call_args[0]
+                self.assertEqual(new.get("parser_type"), "openai")
+                self.assertEqual(new.get("openai_api_key"), "sk-test")
+                self.assertEqual(new.get("openai_model"), "gpt-4")
+                
+                # 無效的請求不修改配置
+                self.assertEqual(self.client.post('/api/config/parser', json={"type": "unknown"}).status_code, 400)
+                self.assertEqual(self.client.post('/api/config/parser', json={"type": "xai_grok"}).status_code, 400)
+                self.assertEqual(load_config(service.config_file)["parser_type"], "openai")
+                
+                # 環境變量覆蓋設定時拒絕切換，不修改配置
+                with patch.dict(os.environ, {"AI_PARSER_TYPE": "local"}):
+                    response = self.client.post('/api/config/parser', json={"type": "local"})
+                self.assertEqual(response.status_code, 409)
+                self.assertIn("AI_PARSER_TYPE", json.loads(response.data)["message"])
+                with patch.dict(os.environ, {"XAI_GROK_API_KEY": "env-key"}):
+                    response = self.client.post('/api/config/parser', json={"type": "xai_grok", "api_key": "xai-test"})
+                self.assertEqual(response.status_code, 409)
+                self.assertEqual(load_config(service.config_file)["parser_type"], "openai")
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,225 @@
+import unittest
+import datetime
+import os
+import tempfile
+from unittest.mock import patch
+from binaryLogStorage import BinaryLogStorage, RECORD, AMOUNT, DAY
+from dataStorage import create_storage
+
+class TestBinaryLogStorage(unittest.TestCase):
+    """測試二進位日誌存儲"""
+    
+    def setUp(self):
+        """設置測試環境"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = os.path.join(self.temp_dir.name, "log")
+        self.storage = BinaryLogStorage(self.data_dir)
+    
+    def tearDown(self):
+        """清理測試環境"""
+        self.temp_dir.cleanup()
+    
+    def _append(self, *transactions):
+        """以指定日期附加交易"""
+        with self.storage._lock:
+            self.storage._append(list(transactions))
+            self.storage._write_meta(self.storage._meta)
+    
+    def test_empty_storage(self):
+        """測試空的存儲"""
+        self.assertEqual(self.storage.record_count(), 0)
+        data = self.storage.get_data()
+        self.assertEqual(data["transactions"], [])
+        self.assertEqual(data["summary"], {"income": 0, "expense": 0, "savings": 0})
+        self.assertEqual(self.storage.get_recent_transactions(5), [])
+    
+    def test_save_and_read(self):
+        """測試保存和讀取交易"""
+        self.assertTrue(self.storage.save_transaction({"type": "expense", "item": "咖啡", "category": "food", "amount": 5.0}))
+        self.assertTrue(self.storage.save_transaction({"type": "income", "item": "薪水", "category": "income", "amount": 30000}))
+        
+        today = datetime.date.today().strftime('%Y-%m-%d')
+        data = self.storage.get_data()
+        self.assertEqual(data["transactions"], [
+            {"type": "income", "item": "薪水", "category": "income", "amount": 30000.0, "date": today},
+            {"type": "expense", "item": "咖啡", "category": "food", "amount": 5.0, "date": today},
+        ])
+        self.assertEqual(data["user"]["points"], 10)
+        self.assertEqual(data["summary"], {"income": 30000.0, "expense": 5.0, "savings": 29995.0})
+    
+    def test_save_transactions(self):
+        """測試一次附加多筆交易"""
+        self.assertTrue(self.storage.save_transactions([
+            {"type": "expense", "item": "早餐", "category": "food", "amount": 60.0},
+            {"type": "expense", "item": "捷運", "category": "transport", "amount": 30.0},
+        ]))
+        
+        self.assertEqual(self.storage.record_count(), 2)
+        self.assertEqual([t["item"] for t in self.storage.get_recent_transactions(5)], ["捷運", "早餐"])
+        self.assertEqual(self.storage.get_data()["user"]["points"], 10)
+    
+    def test_budget_alerts(self):
+        """測試累計支出包含設定預算前的交易，補記的交易計入所屬月份"""
+        self._append({"type": "expense", "item": "房租", "category": "housing", "amount": 8000.0, "date": "2025-01-05"})
+        self.storage.set_budget("housing", 10000.0)
+        
+        alerts = []
+        self.assertTrue(self.storage.save_transactions([
+            {"type": "expense", "item": "管理費", "category": "housing", "amount": 2500.0, "date": "2025-01-20"},
+            {"type": "expense", "item": "水費", "category": "housing", "amount": 300.0},
+        ], alerts))
+        
+        self.assertEqual(alerts, [{"category": "housing", "month": "2025-01", "limit": 10000.0,
+                                   "spent": 10500.0, "remaining": -500.0, "threshold": 1.0}])
+        self.assertEqual(self.storage.get_budget_status()[0]["spent"], 300.0)
+    
+    def test_save_transactions_deduplicates_idempotency_keys(self):
+        """測試重送帶有相同冪等鍵的交易不會重複保存，重新開啟後仍然有效"""
+        transaction = {"type": "expense", "item": "早餐", "category": "food", "amount": 60.0, "idempotency_key": "k1"}
+        self.assertTrue(self.storage.save_transactions([dict(transaction), dict(transaction)]))
+        self.assertTrue(self.storage.save_transactions([dict(transaction)]))
+        self.assertEqual(self.storage.record_count(), 1)
+        
+        reopened = BinaryLogStorage(self.data_dir)
+        self.assertTrue(reopened.save_transactions([dict(transaction), dict(transaction, idempotency_key="k2")]))
+        self.assertEqual(reopened.record_count(), 2)
+    
+    def test_backdated_idempotency_keys_survive_reopen(self):
+        """測試較早日期的離線交易以保存時間建立索引，舊格式的冪等鍵檔案使用交易日期"""
+        old_date = (datetime.date.today() - datetime.timedelta(days=14)).strftime('%Y-%m-%d')
+        transaction = {"type": "expense", "item": "咖啡", "category": "food", "amount": 5.0,
+                       "date": old_date, "idempotency_key": "off-1"}
+        self.assertTrue(self.storage.save_transactions([dict(transaction)]))
+        with open(os.path.join(self.data_dir, "idempotency.keys"), 'a', encoding='utf-8') as f:
+            f.write(f"legacy\t{old_date}\n")
+        
+        reopened = BinaryLogStorage(self.data_dir)
+        self.assertTrue(reopened.save_transactions([dict(transaction), dict(transaction, idempotency_key="legacy")]))
+        
+        self.assertEqual(reopened.record_count(), 2)
+    
+    def test_persistence(self):
+        """測試重新開啟後數據仍然存在"""
+        self.storage.save_transaction({"type": "expense", "item": "午餐", "category": "food", "amount": 120})
+        
+        reopened = BinaryLogStorage(self.data_dir)
+        self.assertEqual(reopened.record_count(), 1)
+        self.assertEqual(reopened.get_recent_transactions(1)[0]["item"], "午餐")
+        self.assertEqual(reopened.get_data()["user"]["streak"], 1)
+    
+    def test_recent_records_are_zero_copy(self):
+        """測試最新記錄以 memoryview 切片返回"""
+        for i in range(10):
+            self.storage.save_transaction({"type": "expense", "item": f"項目{i}", "category": "other", "amount": i + 1})
+        
+        view = self.storage.recent_records(3)
+        self.assertIsInstance(view, memoryview)
+        self.assertEqual(len(view), 3 * RECORD.size)
+        self.assertEqual([record[AMOUNT] for record in RECORD.iter_unpack(view)], [8.0, 9.0, 10.0])
+        
+        recent = self.storage.get_recent_transactions(3)
+        self.assertEqual([t["item"] for t in recent], ["項目9", "項目8", "項目7"])
+    
+    def test_monthly_summary_only_counts_current_month(self):
+        """測試月度總覽只計算當月交易"""
+        today = datetime.date.today()
+        last_month = today.replace(day=1) - datetime.timedelta(days=1)
+        self._append(
+            {"type": "expense", "item": "午餐", "category": "food", "amount": 10.0, "date": last_month.strftime('%Y-%m-%d')},
+            {"type": "expense", "item": "咖啡", "category": "food", "amount": 5.0, "date": today.strftime('%Y-%m-%d')},
+            {"type": "income", "item": "薪水", "category": "income", "amount": 30000.0, "date": today.strftime('%Y-%m-%d')},
+        )
+        
+        summary = self.storage.get_monthly_summary()
+        self.assertEqual(summary, {"income": 30000.0, "expense": 5.0, "savings": 29995.0})
+    
+    def test_records_between(self):
+        """測試日期範圍掃描"""
+        self._append(
+            {"type": "expense", "item": "a", "category": "food", "amount": 1.0, "date": "2025-01-01"},
+            {"type": "expense", "item": "b", "category": "food", "amount": 2.0, "date": "2025-01-15"},
+            {"type": "expense", "item": "c", "category": "food", "amount": 3.0, "date": "2025-02-01"},
+        )
+        
+        view = self.storage.records_between(datetime.date(2025, 1, 10), datetime.date(2025, 1, 31))
+        self.assertIsInstance(view, memoryview)
+        self.assertEqual([record[AMOUNT] for record in RECORD.iter_unpack(view)], [2.0])
+        
+        # 附加較早日期的記錄後開始新的排序區段，各區段分別二分搜尋後依日期合併
+        self._append(
+            {"type": "expense", "item": "d", "category": "food", "amount": 4.0, "date": "2025-01-20"},
+            {"type": "expense", "item": "e", "category": "food", "amount": 5.0, "date": "2025-01-12"},
+        )
+        self.assertEqual(self.storage._meta["runs"], [0, 3, 4])
+        records = self.storage.records_between(datetime.date(2025, 1, 10), datetime.date(2025, 1, 31))
+        self.assertEqual([record[AMOUNT] for record in records], [5.0, 2.0, 4.0])
+        self.assertEqual(records[2][DAY], datetime.date(2025, 1, 20).toordinal())
+        # 只切出範圍內的記錄
+        slices = self.storage._run_slices(self.storage.records(), datetime.date(2025, 1, 10).toordinal(), datetime.date(2025, 1, 31).toordinal())
+        self.assertEqual([len(view) // RECORD.size for view in slices], [1, 1, 1])
+        self.assertEqual(self.storage.get_monthly_summary()["expense"], 0)
+    
+    def test_migrate_sorted_flag(self):
+        """測試舊格式的 sorted 旗標轉為排序區段"""
+        self._append(
+            {"type": "expense", "item": "a", "category": "food", "amount": 1.0, "date": "2025-01-15"},
+            {"type": "expense", "item": "b", "category": "food", "amount": 2.0, "date": "2025-01-01"},
+        )
+        meta = self.storage._meta
+        del meta["runs"]
+        meta["sorted"] = False
+        self.storage._write_meta(meta)
+        
+        reopened = BinaryLogStorage(self.data_dir)
+        self.assertEqual(reopened._meta["runs"], [0, 1])
+        self.assertNotIn("sorted", reopened._meta)
+        self.assertEqual([t["item"] for t in reopened.get_transactions()], ["a", "b"])
+    
+    def test_new_categories_saved_before_records(self):
+        """測試新類別在寫入記錄前保存，寫入記錄時中斷也能讀取已有的記錄"""
+        self.storage.save_transaction({"type": "expense", "item": "a", "category": "food", "amount": 1.0})
+        
+        real_open = open
+        def failing_open(path, *args, **kwargs):
+            if path == self.storage.records_path and args and args[0] == 'ab':
+                raise OSError("disk full")
+            return real_open(path, *args, **kwargs)
+        with patch('builtins.open', side_effect=failing_open):
+            self.assertFalse(self.storage.save_transaction({"type": "expense", "item": "b", "category": "transport", "amount": 2.0}))
+        
+        reopened = BinaryLogStorage(self.data_dir)
+        self.assertIn("transport", reopened._meta["categories"])
+        self.assertEqual([t["item"] for t in reopened.get_data()["transactions"]], ["a"])
+    
+    def test_iter_transactions(self):
+        """測試逐筆走訪日期範圍內的交易，走訪開始後附加的記錄不會出現"""
+        self._append(
+            {"type": "expense", "item": "a", "category": "food", "amount": 1.0, "date": "2025-01-01"},
+            {"type": "income", "item": "b", "category": "income", "amount": 2.0, "date": "2025-01-15"},
+            {"type": "expense", "item": "c", "category": "food", "amount": 3.0, "date": "2025-02-01"},
+        )
+        
+        iterator = self.storage.iter_transactions()
+        self.assertEqual(next(iterator), {"type": "expense", "item": "a", "category": "food", "amount": 1.0, "date": "2025-01-01"})
+        self._append({"type": "expense", "item": "d", "category": "food", "amount": 4.0, "date": "2025-01-20"})
+        self.assertEqual([t["item"] for t in iterator], ["b", "c"])
+        
+        # 補記的記錄在另一個排序區段，依日期合併
+        self.assertEqual([t["item"] for t in self.storage.iter_transactions("2025-01-10", "2025-01-31")], ["b", "d"])
+    
+    def test_update_gamification(self):
+        """測試更新遊戲化數據"""
+        yesterday = (datetime.date.today() - datetime.timedelta(days=1)).strftime('%Y-%m-%d')
+        self.storage._meta["user"] = {"points": 10, "streak": 1, "last_record_date": yesterday}
+        
+        user = self.storage.update_gamification()
+        self.assertEqual(user["points"], 20)
+        self.assertEqual(user["streak"], 2)
+    
+    def test_create_storage(self):
+        """測試以工廠函數創建二進位日誌存儲"""
+        storage = create_storage("binary_log", os.path.join(self.temp_dir.name, "other"))
+        self.assertIsInstance(storage, BinaryLogStorage)
+
+if __name__ == '__main__':
+    unittest.main()
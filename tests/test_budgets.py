@@ -0,0 +1,73 @@
+import unittest
+from budgets import add_expenses, budget_status, ensure_budgets, month_range, RETAINED_MONTHS
+
+class TestBudgets(unittest.TestCase):
+    """測試每月類別預算的累計支出和門檻提醒"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.data = {}
+        self.budgets = ensure_budgets(self.data)
+        self.budgets['limits']['food'] = 1000
+        self.loaded = []
+
+    def _load_month(self, month):
+        """記錄讀取的月份，返回一筆已保存的支出"""
+        self.loaded.append(month)
+        return [
+            {"type": "expense", "item": "晚餐", "category": "food", "amount": 500, "date": f"{month}-02"},
+            {"type": "income", "item": "薪水", "category": "income", "amount": 30000, "date": f"{month}-05"},
+        ]
+
+    def _expense(self, amount, date="2025-03-10", category="food"):
+        return {"type": "expense", "item": "午餐", "category": category, "amount": amount, "date": date}
+
+    def test_thresholds(self):
+        """測試跨過 80% 和 100% 時各提醒一次"""
+        alerts = add_expenses(self.budgets, [self._expense(100), self._expense(100)], self._load_month)
+        self.assertEqual(alerts, [])
+
+        alerts = add_expenses(self.budgets, [self._expense(150)], self._load_month)
+        self.assertEqual(alerts, [{"category": "food", "month": "2025-03", "limit": 1000,
+                                   "spent": 850, "remaining": 150, "threshold": 0.8}])
+
+        alerts = add_expenses(self.budgets, [self._expense(200)], self._load_month)
+        self.assertEqual([(alert["threshold"], alert["remaining"]) for alert in alerts], [(1.0, -50)])
+
+        self.assertEqual(add_expenses(self.budgets, [self._expense(10)], self._load_month), [])
+        # 每個月份只讀取一次交易
+        self.assertEqual(self.loaded, ["2025-03"])
+
+    def test_single_expense_crosses_both_thresholds(self):
+        """測試一筆支出同時跨過兩個門檻"""
+        alerts = add_expenses(self.budgets, [self._expense(600)], self._load_month)
+        self.assertEqual([alert["threshold"] for alert in alerts], [0.8, 1.0])
+
+    def test_other_categories_and_income(self):
+        """測試沒有預算的類別和收入不產生提醒，但支出仍然累計"""
+        alerts = add_expenses(self.budgets, [
+            self._expense(5000, category="housing"),
+            {"type": "income", "item": "獎金", "category": "food", "amount": 5000, "date": "2025-03-10"},
+        ], self._load_month)
+
+        self.assertEqual(alerts, [])
+        self.assertEqual(self.budgets['spent']['2025-03'], {"food": 500, "housing": 5000})
+
+    def test_status_and_retention(self):
+        """測試預算使用情況，只保留最近的月份"""
+        status = budget_status(self.budgets, "2025-03", self._load_month)
+        self.assertEqual(status, [{"category": "food", "limit": 1000, "spent": 500, "remaining": 500, "ratio": 0.5}])
+
+        for month in range(1, 13):
+            add_expenses(self.budgets, [self._expense(1, f"2024-{month:02d}-01")], self._load_month)
+        self.assertEqual(len(self.budgets['spent']), RETAINED_MONTHS)
+        self.assertIn("2025-03", self.budgets['spent'])
+        self.assertNotIn("2024-01", self.budgets['spent'])
+
+    def test_month_range(self):
+        """測試月份的第一天和最後一天"""
+        self.assertEqual(month_range("2024-02"), ("2024-02-01", "2024-02-29"))
+        self.assertEqual(month_range("2025-12"), ("2025-12-01", "2025-12-31"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import os
+import shutil
+import tempfile
+from categoryClassifier import NaiveBayesCategoryClassifier, load_classifier
+
+TRAINING_TRANSACTIONS = [
+    {"type": "expense", "item": "貓飼料", "category": "pets", "amount": 300},
+    {"type": "expense", "item": "貓砂", "category": "pets", "amount": 200},
+    {"type": "expense", "item": "狗飼料", "category": "pets", "amount": 500},
+    {"type": "expense", "item": "拿鐵", "category": "food", "amount": 60},
+    {"type": "expense", "item": "拿鐵咖啡", "category": "food", "amount": 65},
+    {"type": "expense", "item": "便當", "category": "food", "amount": 90},
+    {"type": "expense", "item": "Uber", "category": "transport", "amount": 250},
+    {"type": "expense", "item": "uber 回家", "category": "transport", "amount": 300},
+    {"type": "income", "item": "薪水", "category": "income", "amount": 50000},
+]
+
+class TestNaiveBayesCategoryClassifier(unittest.TestCase):
+    """測試類別分類器"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.classifier = NaiveBayesCategoryClassifier().fit(TRAINING_TRANSACTIONS)
+
+    def tearDown(self):
+        """清理測試環境"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_fit_skips_income(self):
+        """測試收入交易不參與訓練"""
+        self.assertEqual(self.classifier.class_counts, {"pets": 3, "food": 3, "transport": 2})
+
+    def test_predict(self):
+        """測試預測類別"""
+        self.assertEqual(self.classifier.predict("貓罐頭")[0], "pets")
+        self.assertEqual(self.classifier.predict("冰拿鐵")[0], "food")
+        self.assertEqual(self.classifier.predict("ＵＢＥＲ")[0], "transport")
+
+        category, confidence = self.classifier.predict("貓飼料")
+        self.assertEqual(category, "pets")
+        self.assertGreater(confidence, 0.9)
+
+    def test_predict_unknown(self):
+        """測試沒有已知特徵或未訓練時不給出預測"""
+        self.assertIsNone(self.classifier.predict("電影票"))
+        self.assertIsNone(NaiveBayesCategoryClassifier().predict("貓飼料"))
+        self.assertFalse(NaiveBayesCategoryClassifier().trained)
+
+    def test_low_confidence(self):
+        """測試信心不足時不給出預測"""
+        strict = NaiveBayesCategoryClassifier(min_confidence=0.999).fit(TRAINING_TRANSACTIONS)
+        self.assertIsNone(strict.predict("飼料便當"))
+
+    def test_save_and_load(self):
+        """測試保存和載入模型"""
+        path = os.path.join(self.temp_dir, "model.json.gz")
+        self.classifier.save(path)
+
+        loaded = load_classifier(path)
+        self.assertEqual(loaded.class_counts, self.classifier.class_counts)
+        for item in ("貓罐頭", "冰拿鐵", "uber"):
+            self.assertEqual(loaded.predict(item), self.classifier.predict(item))
+
+    def test_load_missing_or_invalid(self):
+        """測試模型不存在或格式錯誤時返回 None"""
+        self.assertIsNone(load_classifier(None))
+        self.assertIsNone(load_classifier(os.path.join(self.temp_dir, "missing.json.gz")))
+
+        path = os.path.join(self.temp_dir, "invalid.json.gz")
+        with open(path, 'w') as f:
+            f.write("not gzip")
+        self.assertIsNone(load_classifier(path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import unittest
+import json
+import os
+import tempfile
+import threading
+from unittest.mock import MagicMock
+from configService import ConfigService, ConfigSnapshot, DEFAULT_CONFIG, load_config, save_config
+
+class TestConfigService(unittest.TestCase):
+    """測試配置服務"""
+    
+    def setUp(self):
+        """設置測試環境"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_file = os.path.join(self.temp_dir.name, "config.json")
+        self._write_config({"parser_type": "local"}, mtime=1000)
+        self.service = ConfigService(self.config_file, watch=False)
+    
+    def tearDown(self):
+        """清理測試環境"""
+        self.service.stop()
+        self.temp_dir.cleanup()
+    
+    def _write_config(self, config, mtime):
+        """寫入配置檔案並設定修改時間"""
+        with open(self.config_file, 'w', encoding='utf-8') as f:
+            json.dump(config, f)
+        os.utime(self.config_file, (mtime, mtime))
+    
+    def test_get_returns_cached_snapshot(self):
+        """測試快照只載入一次並合併預設值"""
+        snapshot = self.service.get()
+        
+        self.assertIsInstance(snapshot, ConfigSnapshot)
+        self.assertEqual(snapshot.version, 1)
+        self.assertEqual(snapshot.get("parser_type"), "local")
+        self.assertEqual(snapshot.get("openai_model"), DEFAULT_CONFIG["openai_model"])
+        self.assertIs(self.service.get(), snapshot)
+    
+    def test_snapshot_is_immutable(self):
+        """測試快照不可修改"""
+        snapshot = self.service.get()
+        
+        with self.assertRaises(TypeError):
+            snapshot.data["parser_type"] = "openai"
+        with self.assertRaises(AttributeError):
+            snapshot.version = 2
+    
+    def test_check_detects_change(self):
+        """測試配置檔案變更時更新快照並通知監聽器"""
+        listener = MagicMock()
+        self.service.subscribe(listener)
+        old = self.service.get()
+        
+        # 未變更
+        self.assertFalse(self.service.check())
+        listener.assert_not_called()
+        
+        # 內容變更
+        self._write_config({"parser_type": "openai"}, mtime=2000)
+        self.assertTrue(self.service.check())
+        
+        new = self.service.get()
+        self.assertEqual(new.version, 2)
+        self.assertEqual(new.get("parser_type"), "openai")
+        listener.assert_called_once_with(old, new)
+    
+    def test_concurrent_checks_notify_in_order(self):
+        """測試同時進行的檢查依序通知監聽器，每個版本只通知一次"""
+        versions = []
+        entered = threading.Event()
+        release = threading.Event()
+        
+        def slow_listener(old, new):
+            versions.append(new.version)
+            if new.version == 2:
+                entered.set()
+                release.wait(5)
+        
+        self.service.subscribe(slow_listener)
+        self.service.get()
+        self._write_config({"parser_type": "openai"}, mtime=2000)
+        first = threading.Thread(target=self.service.check)
+        first.start()
+        self.assertTrue(entered.wait(5))
+        
+        # 第一個檢查仍在通知監聽器時，第二個檢查等待
+        self._write_config({"parser_type": "xai_grok"}, mtime=3000)
+        second = threading.Thread(target=self.service.check)
+        second.start()
+        second.join(0.1)
+        self.assertEqual(versions, [2])
+        
+        release.set()
+        first.join(5)
+        second.join(5)
+        self.assertEqual(versions, [2, 3])
+    
+    def test_wake_checks_immediately(self):
+        """測試喚醒監看執行緒後立即檢查，不等待檢查間隔"""
+        service = ConfigService(self.config_file, interval=60)
+        changed = threading.Event()
+        service.subscribe(lambda old, new: changed.set())
+        service.get()
+        try:
+            self._write_config({"parser_type": "openai"}, mtime=2000)
+            service.wake()
+            self.assertTrue(changed.wait(5))
+        finally:
+            service.stop()
+    
+    def test_save_config(self):
+        """測試寫入配置檔案後可以重新載入，且不留下暫存檔"""
+        save_config(dict(DEFAULT_CONFIG, parser_type="xai_grok"), self.config_file)
+        
+        self.assertEqual(load_config(self.config_file)["parser_type"], "xai_grok")
+        self.assertEqual(os.listdir(self.temp_dir.name), ["config.json"])
+    
+    def test_check_ignores_touch_without_change(self):
+        """測試只有修改時間變更時不通知監聽器"""
+        listener = MagicMock()
+        self.service.subscribe(listener)
+        self.service.get()
+        
+        self._write_config({"parser_type": "local"}, mtime=3000)
+        self.assertFalse(self.service.check())
+        self.assertEqual(self.service.get().version, 1)
+        self.assertEqual(self.service.get().mtime, 3000)
+        listener.assert_not_called()
+    
+    def test_missing_file_uses_defaults(self):
+        """測試配置檔案不存在時使用預設配置"""
+        service = ConfigService(os.path.join(self.temp_dir.name, "missing.json"), watch=False)
+        snapshot = service.get()
+        
+        self.assertIsNone(snapshot.mtime)
+        self.assertEqual(dict(snapshot.data), DEFAULT_CONFIG)
+
+if __name__ == '__main__':
+    unittest.main()
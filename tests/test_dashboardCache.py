@@ -0,0 +1,92 @@
+import unittest
+import datetime
+import os
+import tempfile
+from unittest.mock import patch
+from dashboardCache import DashboardCache
+from partitionedJsonStorage import PartitionedJsonStorage
+from metrics import CACHE_REQUESTS
+
+class TestDashboardCache(unittest.TestCase):
+    """測試首頁數據快取"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.this_month = datetime.date.today().strftime('%Y-%m')
+        self.cache = DashboardCache(capacity=3)
+
+    def test_recent_ring_buffer(self):
+        """測試只保留最新的交易，最新的在最前面"""
+        self.cache.add_transactions([
+            {"type": "expense", "item": f"項目{i}", "category": "other", "amount": 1.0, "date": f"{self.this_month}-01"}
+            for i in range(5)
+        ])
+
+        snapshot = self.cache.snapshot(5)
+        self.assertEqual([t["item"] for t in snapshot["transactions"]], ["項目4", "項目3", "項目2"])
+        self.assertEqual(len(self.cache.snapshot(2)["transactions"]), 2)
+        # 總額包含所有交易，不受緩衝區大小限制
+        self.assertEqual(snapshot["summary"]["expense"], 5.0)
+
+    def test_monthly_summary(self):
+        """測試當月總覽只計入當月交易"""
+        self.cache.add_transactions([
+            {"type": "income", "item": "薪水", "category": "income", "amount": 30000.0, "date": f"{self.this_month}-01"},
+            {"type": "expense", "item": "房租", "category": "housing", "amount": 8000.0, "date": "2000-01-05"},
+            {"type": "expense", "item": "午餐", "category": "food", "amount": 120.0, "date": f"{self.this_month}-02"},
+        ])
+        self.cache.set_user({"points": 20, "streak": 2, "last_record_date": "2025-03-06"})
+
+        snapshot = self.cache.snapshot(5)
+        self.assertEqual(snapshot["summary"], {"income": 30000.0, "expense": 120.0, "savings": 29880.0})
+        self.assertEqual(snapshot["user"]["points"], 20)
+
+    def test_storage_dashboard_is_incremental(self):
+        """測試存儲只在建立快取時讀取一次，之後由保存增量更新"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            storage = PartitionedJsonStorage(os.path.join(temp_dir, "parts"))
+            storage.save_transaction({"type": "expense", "item": "咖啡", "category": "food", "amount": 5.0})
+            misses = CACHE_REQUESTS.labels(cache="dashboard", result="miss").value()
+            hits = CACHE_REQUESTS.labels(cache="dashboard", result="hit").value()
+
+            self.assertEqual(storage.get_dashboard(5)["summary"]["expense"], 5.0)
+            storage.save_transactions([
+                {"type": "expense", "item": "午餐", "category": "food", "amount": 120.0},
+                {"type": "income", "item": "紅包", "category": "income", "amount": 600.0},
+            ])
+            dashboard = storage.get_dashboard(2)
+
+            self.assertEqual([t["item"] for t in dashboard["transactions"]], ["紅包", "午餐"])
+            self.assertEqual(dashboard["summary"], storage.get_monthly_summary())
+            self.assertEqual(dashboard["user"], storage.get_data()["user"])
+            self.assertEqual(CACHE_REQUESTS.labels(cache="dashboard", result="miss").value(), misses + 1)
+            self.assertEqual(CACHE_REQUESTS.labels(cache="dashboard", result="hit").value(), hits + 1)
+
+    def test_cache_error_does_not_fail_save(self):
+        """測試快取更新失敗時保存仍然成功，冪等鍵仍然記錄，下次讀取時重建快取"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            storage = PartitionedJsonStorage(os.path.join(temp_dir, "parts"))
+            storage.get_dashboard(5)
+            transaction = {"type": "expense", "item": "咖啡", "category": "food", "amount": 5.0, "idempotency_key": "cafe-1"}
+
+            with patch.object(DashboardCache, 'add_transactions', side_effect=RuntimeError("快取錯誤")):
+                self.assertTrue(storage.save_transactions([dict(transaction)]))
+            self.assertTrue(storage.save_transactions([dict(transaction)]))
+
+            self.assertEqual(len(storage.get_transactions()), 1)
+            self.assertEqual(storage.get_dashboard(5)["summary"]["expense"], 5.0)
+
+    def test_read_error_is_not_cached(self):
+        """測試讀取失敗時不快取空白的首頁數據"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            storage = PartitionedJsonStorage(os.path.join(temp_dir, "parts"))
+            storage.save_transaction({"type": "expense", "item": "咖啡", "category": "food", "amount": 5.0})
+
+            with patch.object(storage, '_read_json', side_effect=OSError("讀取錯誤")):
+                with self.assertRaises(OSError):
+                    storage.get_dashboard(5)
+
+            self.assertEqual(storage.get_dashboard(5)["summary"]["expense"], 5.0)
+
+if __name__ == '__main__':
+    unittest.main()
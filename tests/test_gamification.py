@@ -0,0 +1,77 @@
+import unittest
+import datetime
+from gamification import ActivityBitmap, record_activity, rebuild_activity
+
+class TestGamification(unittest.TestCase):
+    """測試以每日活動點陣圖計算的遊戲化數據"""
+
+    def _bitmap(self, *days):
+        """以 2025-03-01 之後的天數建立點陣圖"""
+        bitmap = ActivityBitmap()
+        for day in days:
+            bitmap.mark(datetime.date(2025, 3, 1) + datetime.timedelta(days=day))
+        return bitmap
+
+    def test_streaks(self):
+        """測試連續天數和最長連續天數"""
+        bitmap = self._bitmap(0, 1, 2, 3, 5, 8, 9)
+
+        self.assertEqual(bitmap.active_days(), 7)
+        self.assertEqual(bitmap.current_streak(), 2)
+        self.assertEqual(bitmap.longest_streak(), 4)
+        self.assertEqual(bitmap.last_active(), datetime.date(2025, 3, 10))
+        self.assertEqual(ActivityBitmap().current_streak(), 0)
+
+    def test_backfill_before_origin(self):
+        """測試補記早於第一筆記錄的日期"""
+        bitmap = self._bitmap(5, 6)
+        bitmap.mark(datetime.date(2025, 3, 5))
+
+        self.assertEqual(bitmap.origin, datetime.date(2025, 3, 5))
+        self.assertEqual(bitmap.current_streak(), 3)
+
+    def test_round_trip(self):
+        """測試序列化後還原"""
+        bitmap = self._bitmap(0, 2, 400)
+        restored = ActivityBitmap.from_dict(bitmap.to_dict())
+
+        self.assertEqual((restored.origin, restored.bits), (bitmap.origin, bitmap.bits))
+
+    def test_record_activity_migrates_legacy_user(self):
+        """測試舊格式的用戶數據轉換後點數和連續天數延續"""
+        user = {"points": 50, "streak": 2, "last_record_date": "2025-03-09"}
+
+        record_activity(user, ["2025-03-10", "2025-03-10"])
+
+        self.assertEqual(user["streak"], 3)
+        self.assertEqual(user["points"], 60)
+        self.assertEqual(user["longest_streak"], 3)
+        self.assertEqual(user["last_record_date"], "2025-03-10")
+
+        # 同一天再記錄不重複計點
+        record_activity(user, ["2025-03-10"])
+        self.assertEqual(user["points"], 60)
+
+    def test_backdated_activity_fills_gap(self):
+        """測試補記的交易填補中斷的連續記錄"""
+        user = {"points": 0, "streak": 0, "last_record_date": None}
+        record_activity(user, ["2025-03-01", "2025-03-03"])
+        self.assertEqual(user["streak"], 1)
+
+        record_activity(user, ["2025-03-02"])
+        self.assertEqual(user["streak"], 3)
+        self.assertEqual(user["points"], 30)
+
+    def test_rebuild_activity(self):
+        """測試以所有交易日期重新計算"""
+        user = {"points": 500, "streak": 9, "last_record_date": "2025-01-01"}
+
+        rebuild_activity(user, ["2025-03-01", "2025-03-02", "2025-02-01"])
+
+        self.assertEqual(user["points"], 30)
+        self.assertEqual(user["streak"], 2)
+        self.assertEqual(user["longest_streak"], 2)
+        self.assertEqual(user["active_days"], 3)
+
+if __name__ == '__main__':
+    unittest.main()
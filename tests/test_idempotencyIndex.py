@@ -0,0 +1,59 @@
+import unittest
+from idempotencyIndex import IdempotencyIndex, date_timestamp
+
+class TestIdempotencyIndex(unittest.TestCase):
+    """測試有界的冪等鍵索引"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.now = 1000000.0
+        self.index = IdempotencyIndex(ttl=100, capacity=3, clock=lambda: self.now)
+
+    def test_contains(self):
+        """測試加入的冪等鍵可以查詢"""
+        self.index.add("k1")
+
+        self.assertIn("k1", self.index)
+        self.assertNotIn("k2", self.index)
+
+    def test_time_based_eviction(self):
+        """測試超過保留時間的冪等鍵被淘汰"""
+        self.index.add("k1")
+        self.now += 50
+        self.index.add("k2")
+        self.now += 60
+
+        self.assertNotIn("k1", self.index)
+        self.assertIn("k2", self.index)
+
+        # 加入新鍵時一併淘汰過期的鍵
+        self.now += 60
+        self.index.add("k3")
+        self.assertEqual(len(self.index), 1)
+
+    def test_capacity_eviction(self):
+        """測試超過容量時淘汰最舊的冪等鍵"""
+        for key in ("k1", "k2", "k3", "k4"):
+            self.index.add(key)
+
+        self.assertEqual(len(self.index), 3)
+        self.assertNotIn("k1", self.index)
+        self.assertIn("k4", self.index)
+
+    def test_add_with_past_timestamp(self):
+        """測試以交易日期建立索引時使用交易日期的時間"""
+        self.index.add("old", self.now - 200)
+        self.index.add("recent", self.now - 10)
+
+        self.assertNotIn("old", self.index)
+        self.assertIn("recent", self.index)
+
+    def test_cutoff_date(self):
+        """測試保留期間的最早日期"""
+        now = date_timestamp("2025-03-06") + 12 * 3600
+        index = IdempotencyIndex(ttl=2 * 86400, clock=lambda: now)
+
+        self.assertEqual(index.cutoff_date(), "2025-03-04")
+
+if __name__ == '__main__':
+    unittest.main()
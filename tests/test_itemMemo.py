@@ -0,0 +1,69 @@
+import unittest
+from unittest.mock import MagicMock
+from itemMemo import ItemMemo, MemoizedParser
+from metrics import CACHE_REQUESTS
+
+class TestItemMemo(unittest.TestCase):
+    """測試項目查詢表和先查詢歷史記錄的解析器"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.memo = ItemMemo()
+        self.memo.add_transactions([
+            {"type": "expense", "item": "拿鐵", "category": "food", "amount": 60},
+            {"type": "expense", "item": "拿鐵", "category": "drinks", "amount": 65},
+            {"type": "expense", "item": "拿鐵", "category": "drinks", "amount": 60},
+            {"type": "income", "item": "家教", "category": "income", "amount": 1200},
+        ])
+        self.parser = MagicMock()
+        self.memoized = MemoizedParser(self.parser, self.memo)
+
+    def test_lookup(self):
+        """測試查詢最常見的類別、類型和金額"""
+        self.assertEqual(self.memo.lookup("拿鐵"), {"category": "drinks", "type": "expense", "amount": 60})
+        self.assertEqual(self.memo.lookup(" 家教 ")["type"], "income")
+        self.assertIsNone(self.memo.lookup("電影票"))
+        self.assertEqual(len(self.memo), 2)
+
+    def test_incremental_update(self):
+        """測試增量更新，次數相同時以最近一次為準"""
+        self.memo.add_transactions([{"type": "expense", "item": "家教", "category": "education", "amount": 800}])
+
+        self.assertEqual(self.memo.lookup("家教"), {"category": "education", "type": "expense", "amount": 800})
+
+    def test_known_item_skips_parser(self):
+        """測試已知項目不呼叫被包裝的解析器"""
+        hits = CACHE_REQUESTS.labels(cache="item_memo", result="hit").value()
+
+        result = self.memoized.parse_transaction("拿鐵 70 元")
+
+        self.assertEqual(result, {"type": "expense", "item": "拿鐵", "category": "drinks", "amount": 70.0})
+        self.parser.parse_transaction.assert_not_called()
+        self.assertEqual(CACHE_REQUESTS.labels(cache="item_memo", result="hit").value(), hits + 1)
+
+        # 沒有金額時使用最常見的金額
+        self.assertEqual(self.memoized.parse_transaction("家教")["amount"], 1200.0)
+
+    def test_parse_transactions(self):
+        """測試多筆交易都是已知項目時不呼叫被包裝的解析器"""
+        results = self.memoized.parse_transactions("拿鐵 70 家教 一千五")
+
+        self.assertEqual([r["item"] for r in results], ["拿鐵", "家教"])
+        self.assertEqual([r["amount"] for r in results], [70.0, 1500.0])
+        self.parser.parse_transactions.assert_not_called()
+
+        # 有未知項目時整段交給被包裝的解析器
+        self.memoized.parse_transactions("拿鐵 70 電影票 250")
+        self.parser.parse_transactions.assert_called_once_with("拿鐵 70 電影票 250")
+
+    def test_unknown_item_uses_parser(self):
+        """測試未知項目交給被包裝的解析器"""
+        self.parser.parse_transaction.return_value = {"type": "expense", "item": "電影票", "category": "entertainment", "amount": 250.0}
+
+        result = self.memoized.parse_transaction("電影票 250 元")
+
+        self.assertEqual(result["category"], "entertainment")
+        self.parser.parse_transaction.assert_called_once_with("電影票 250 元")
+
+if __name__ == '__main__':
+    unittest.main()
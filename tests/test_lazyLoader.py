@@ -0,0 +1,81 @@
+import unittest
+import threading
+from unittest.mock import MagicMock
+from lazyLoader import LazyInstance
+
+class TestLazyInstance(unittest.TestCase):
+    """測試延遲初始化單例"""
+
+    def test_factory_not_called_until_used(self):
+        """測試未使用前不會建立實例"""
+        factory = MagicMock()
+        lazy = LazyInstance(factory)
+
+        self.assertFalse(lazy.initialized)
+        factory.assert_not_called()
+
+        # 存取屬性時才建立
+        factory.return_value.value = 42
+        self.assertEqual(lazy.value, 42)
+        self.assertTrue(lazy.initialized)
+        factory.assert_called_once()
+
+    def test_private_attributes_do_not_initialize(self):
+        """測試存取私有屬性不會觸發初始化"""
+        factory = MagicMock()
+        lazy = LazyInstance(factory)
+
+        self.assertIsNone(getattr(lazy, '_is_coroutine', None))
+        self.assertFalse(lazy.initialized)
+        factory.assert_not_called()
+
+    def test_reset(self):
+        """測試重置後重新建立實例"""
+        factory = MagicMock(side_effect=[object(), object()])
+        lazy = LazyInstance(factory)
+
+        first = lazy.get()
+        self.assertIs(lazy.get(), first)
+
+        lazy.reset()
+        self.assertFalse(lazy.initialized)
+        self.assertIsNot(lazy.get(), first)
+        self.assertEqual(factory.call_count, 2)
+
+    def test_swap(self):
+        """測試原子地替換實例"""
+        lazy = LazyInstance(object)
+        old = lazy.get()
+        new = object()
+
+        self.assertIs(lazy.swap(new), old)
+        self.assertIs(lazy.get(), new)
+        self.assertIsNot(lazy.get(), old)
+
+    def test_concurrent_get_creates_once(self):
+        """測試多個執行緒同時存取只建立一次"""
+        barrier = threading.Barrier(8)
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return object()
+
+        lazy = LazyInstance(factory)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(lazy.get())
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import csv
+import io
+import json
+from unittest.mock import patch
+from ledgerExport import export_chunks, EXPORT_FIELDS
+
+class TestLedgerExport(unittest.TestCase):
+    """測試逐段輸出的匯出格式"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.consumed = 0
+
+    def _transactions(self, count):
+        """產生交易，記錄已經取出的筆數"""
+        for i in range(count):
+            self.consumed += 1
+            yield {"type": "expense", "item": f"項目{i}", "category": "food", "amount": float(i),
+                   "date": "2025-03-01", "idempotency_key": f"k{i}"}
+
+    def test_csv_header_first(self):
+        """測試 CSV 標頭在讀取交易前輸出，第一筆交易立即輸出"""
+        chunks = export_chunks(self._transactions(3), "csv")
+
+        self.assertEqual(next(chunks), "\ufeffdate,type,item,category,amount\r\n")
+        self.assertEqual(self.consumed, 0)
+        self.assertEqual(next(chunks), "2025-03-01,expense,項目0,food,0.0\r\n")
+        self.assertEqual(self.consumed, 1)
+        rows = list(csv.reader(io.StringIO("".join(chunks))))
+        self.assertEqual([row[2] for row in rows], ["項目1", "項目2"])
+
+    def test_chunks_are_bounded(self):
+        """測試每個區塊最多包含 CHUNK_ROWS 筆交易"""
+        with patch('ledgerExport.CHUNK_ROWS', 4):
+            chunks = list(export_chunks(self._transactions(10), "jsonl"))
+
+        self.assertEqual([len(chunk.splitlines()) for chunk in chunks], [1, 3, 4, 2])
+        first = json.loads(chunks[0])
+        self.assertEqual(tuple(first), EXPORT_FIELDS)
+        self.assertEqual(first["item"], "項目0")
+
+    def test_formula_cells_are_escaped(self):
+        """測試公式開頭的文字不會被試算表執行"""
+        transactions = [{"type": "expense", "item": "=SUM(A1)", "category": "@food", "amount": 5.0, "date": "2025-03-01"}]
+        rows = list(csv.reader(io.StringIO("".join(export_chunks(transactions, "csv")).lstrip("\ufeff"))))
+
+        self.assertEqual(rows[1], ["2025-03-01", "expense", "'=SUM(A1)", "'@food", "5.0"])
+
+    def test_empty(self):
+        """測試沒有交易時只輸出標頭"""
+        self.assertEqual(list(export_chunks([], "jsonl")), [])
+        self.assertEqual(len(list(export_chunks([], "csv"))), 1)
+
+if __name__ == '__main__':
+    unittest.main()
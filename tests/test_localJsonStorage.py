@@ -2,6 +2,7 @@ import unittest
 import json
 import os
 import datetime
+import threading
 from unittest.mock import patch, mock_open, MagicMock
 from localJsonStorage import LocalJsonStorage
 
@@ -241,6 +242,24 @@ class TestLocalJsonStorage(unittest.TestCase):
         self.assertEqual(summary["expense"], 5.0)
         self.assertEqual(summary["savings"], 29995.0)
     
+    @patch('localJsonStorage.LocalJsonStorage._read_data')
+    def test_get_transactions(self, mock_read):
+        """測試依日期篩選交易"""
+        mock_read.return_value = {
+            "transactions": [
+                {"type": "expense", "item": "晚餐", "category": "food", "amount": 200.0, "date": "2025-03-10"},
+                {"type": "expense", "item": "午餐", "category": "food", "amount": 120.0, "date": "2025-03-05"},
+                {"type": "expense", "item": "咖啡", "category": "food", "amount": 5.0, "date": "2025-02-28"}
+            ],
+            "user": {"points": 10, "streak": 1, "last_record_date": "2025-03-10"}
+        }
+        
+        items = [t["item"] for t in self.storage.get_transactions("2025-03-01", "2025-03-09")]
+        self.assertEqual(items, ["午餐"])
+        
+        items = [t["item"] for t in self.storage.get_transactions(end_date="2025-03-05")]
+        self.assertEqual(items, ["午餐", "咖啡"])
+    
     @patch('localJsonStorage.LocalJsonStorage._read_data')
     @patch('localJsonStorage.LocalJsonStorage._write_data')
     def test_update_gamification(self, mock_write, mock_read):
@@ -274,5 +293,83 @@ class TestLocalJsonStorage(unittest.TestCase):
         self.assertEqual(write_data["user"]["streak"], 2)
         self.assertEqual(write_data["user"]["last_record_date"], today)
 
+    @patch('localJsonStorage.LocalJsonStorage._read_data')
+    @patch('localJsonStorage.LocalJsonStorage._write_data')
+    @patch('localJsonStorage.LocalJsonStorage._update_gamification_internal')
+    def test_save_transactions(self, mock_update, mock_write, mock_read):
+        """測試在一次寫入中保存多筆交易"""
+        mock_read.return_value = {
+            "transactions": [{"type": "expense", "item": "舊交易", "category": "other", "amount": 1.0, "date": "2025-01-01"}],
+            "user": {"points": 0, "streak": 0, "last_record_date": None}
+        }
+        transactions = [
+            {"type": "expense", "item": "早餐", "category": "food", "amount": 60.0, "date": "2025-02-01"},
+            {"type": "expense", "item": "午餐", "category": "food", "amount": 120.0}
+        ]
+        
+        self.assertTrue(self.storage.save_transactions(transactions))
+        
+        # 只讀寫一次，遊戲化數據只更新一次
+        mock_read.assert_called_once()
+        mock_write.assert_called_once()
+        mock_update.assert_called_once()
+        
+        # 新交易放在最前面，最後說的最新
+        write_data = mock_write.call_args[0][0]
+        self.assertEqual([t["item"] for t in write_data["transactions"]], ["午餐", "早餐", "舊交易"])
+        self.assertTrue(all("date" in t for t in write_data["transactions"]))
+        # 補記的交易保留原有日期
+        self.assertEqual(write_data["transactions"][1]["date"], "2025-02-01")
+    
+    def test_save_transactions_deduplicates_idempotency_keys(self):
+        """測試重送帶有相同冪等鍵的交易不會重複保存"""
+        transaction = {"type": "expense", "item": "咖啡", "category": "food", "amount": 5.0, "idempotency_key": "k1"}
+        self.assertTrue(self.storage.save_transactions([dict(transaction)]))
+        
+        reopened = LocalJsonStorage(self.test_file)
+        self.assertTrue(reopened.save_transactions([dict(transaction), dict(transaction, idempotency_key="k2")]))
+        
+        keys = [t["idempotency_key"] for t in reopened.get_data()["transactions"]]
+        self.assertEqual(keys, ["k2", "k1"])
+    
+    def test_backdated_idempotency_keys_survive_reopen(self):
+        """測試較早日期的離線交易以保存時間建立索引，重新開啟後重送不會重複保存"""
+        old_date = (datetime.date.today() - datetime.timedelta(days=14)).strftime('%Y-%m-%d')
+        transaction = {"type": "expense", "item": "咖啡", "category": "food", "amount": 5.0,
+                       "date": old_date, "idempotency_key": "off-1"}
+        self.assertTrue(self.storage.save_transactions([dict(transaction)]))
+        
+        reopened = LocalJsonStorage(self.test_file)
+        self.assertTrue(reopened.save_transactions([dict(transaction)]))
+        
+        self.assertEqual(len(reopened.get_transactions()), 1)
+    
+    def test_iter_transactions_sorted_by_date(self):
+        """測試補記的交易依日期排列，同一天的交易依保存順序"""
+        for item, date in (("a", "2025-01-20"), ("b", "2025-01-05"), ("c", "2025-01-20")):
+            self.storage.save_transactions([{"type": "expense", "item": item, "category": "other", "amount": 1.0, "date": date}])
+        
+        self.assertEqual([t["item"] for t in self.storage.iter_transactions()], ["b", "a", "c"])
+    
+    def test_concurrent_save_transaction(self):
+        """測試多個執行緒同時保存交易不會遺失或損壞數據"""
+        def worker():
+            for _ in range(10):
+                self.storage.save_transaction({
+                    "type": "expense",
+                    "item": "咖啡",
+                    "category": "food",
+                    "amount": 5.0
+                })
+        
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        data = self.storage._read_data()
+        self.assertEqual(len(data["transactions"]), 40)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,106 @@
+import unittest
+import threading
+from metrics import Registry, Counter, Histogram, CACHE_REQUESTS, record_cache
+
+class TestMetrics(unittest.TestCase):
+    """測試指標"""
+    
+    def setUp(self):
+        """設置測試環境"""
+        self.registry = Registry()
+    
+    def test_counter(self):
+        """測試計數器"""
+        counter = Counter("test_total", "測試計數", ["kind"], registry=self.registry)
+        counter.labels(kind="a").inc()
+        counter.labels(kind="a").inc(2)
+        counter.labels(kind="b").inc()
+        
+        self.assertEqual(counter.labels(kind="a").value(), 3)
+        self.assertEqual(counter.labels(kind="b").value(), 1)
+        
+        output = self.registry.render()
+        self.assertIn("# TYPE test_total counter", output)
+        self.assertIn('test_total{kind="a"} 3', output)
+        self.assertIn('test_total{kind="b"} 1', output)
+    
+    def test_counter_across_threads(self):
+        """測試多個執行緒同時增加計數"""
+        counter = Counter("threaded_total", "多執行緒計數", registry=self.registry)
+        
+        def worker():
+            for _ in range(1000):
+                counter.inc()
+        
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(counter.labels().value(), 8000)
+        self.assertIn("threaded_total 8000", self.registry.render())
+    
+    def test_short_lived_threads(self):
+        """測試大量短暫執行緒記錄數值後，保存的數值數量固定"""
+        histogram = Histogram("short_seconds", "短暫執行緒", buckets=(0.1, 1.0), registry=self.registry)
+        
+        for _ in range(200):
+            thread = threading.Thread(target=histogram.observe, args=(0.5,))
+            thread.start()
+            thread.join()
+        
+        child = histogram.labels()
+        self.assertEqual(len(child._values.totals()), 5)
+        self.assertEqual(child.snapshot(), ([0, 200, 200], 100.0, 200))
+    
+    def test_histogram(self):
+        """測試直方圖"""
+        histogram = Histogram("latency_seconds", "測試延遲", ["route"],
+                              buckets=(0.1, 1.0), registry=self.registry)
+        histogram.labels(route="/x").observe(0.05)
+        histogram.labels(route="/x").observe(0.1)
+        histogram.labels(route="/x").observe(0.5)
+        histogram.labels(route="/x").observe(3)
+        
+        cumulative, total, count = histogram.labels(route="/x").snapshot()
+        self.assertEqual(cumulative, [2, 3, 4])
+        self.assertAlmostEqual(total, 3.65)
+        self.assertEqual(count, 4)
+        
+        output = self.registry.render()
+        self.assertIn('latency_seconds_bucket{route="/x",le="0.1"} 2', output)
+        self.assertIn('latency_seconds_bucket{route="/x",le="1"} 3', output)
+        self.assertIn('latency_seconds_bucket{route="/x",le="+Inf"} 4', output)
+        self.assertIn('latency_seconds_count{route="/x"} 4', output)
+    
+    def test_histogram_timer(self):
+        """測試直方圖計時"""
+        histogram = Histogram("timer_seconds", "計時", registry=self.registry)
+        with histogram.labels().time():
+            pass
+        
+        _, _, count = histogram.labels().snapshot()
+        self.assertEqual(count, 1)
+    
+    def test_label_escaping(self):
+        """測試標籤值跳脫"""
+        counter = Counter("escape_total", "跳脫", ["value"], registry=self.registry)
+        counter.labels(value='a"b').inc()
+        
+        self.assertIn('escape_total{value="a\\"b"} 1', self.registry.render())
+    
+    def test_record_cache(self):
+        """測試記錄快取命中"""
+        hits = CACHE_REQUESTS.labels(cache="test", result="hit").value()
+        misses = CACHE_REQUESTS.labels(cache="test", result="miss").value()
+        
+        record_cache("test", True)
+        record_cache("test", False)
+        record_cache("test", False)
+        
+        self.assertEqual(CACHE_REQUESTS.labels(cache="test", result="hit").value(), hits + 1)
+        self.assertEqual(CACHE_REQUESTS.labels(cache="test", result="miss").value(), misses + 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+import time
+from parseSession import ParseSessionStore
+
+class TestParseSessionStore(unittest.TestCase):
+    """測試解析工作階段"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.store = ParseSessionStore(capacity=2)
+        self.transactions = [{"type": "expense", "item": "咖啡", "category": "food", "amount": 5.0}]
+
+    def test_token_is_single_use(self):
+        """測試權杖只能使用一次，取出的是複本"""
+        token = self.store.create(self.transactions)
+        self.transactions[0]["amount"] = 0
+
+        self.assertEqual(self.store.pop(token)[0]["amount"], 5.0)
+        self.assertIsNone(self.store.pop(token))
+        self.assertIsNone(self.store.pop("unknown"))
+
+    def test_capacity_and_ttl(self):
+        """測試超過容量時移除最舊的工作階段，過期的工作階段失效"""
+        tokens = [self.store.create(self.transactions) for _ in range(3)]
+        self.assertEqual(len(self.store), 2)
+        self.assertIsNone(self.store.pop(tokens[0]))
+
+        self.store.ttl = 0.01
+        time.sleep(0.05)
+        self.assertIsNone(self.store.pop(tokens[1]))
+
+    def test_restore(self):
+        """測試放回的工作階段可以再次使用"""
+        token = self.store.create(self.transactions)
+        transactions = self.store.pop(token)
+        self.store.restore(token, transactions)
+
+        self.assertEqual(self.store.pop(token), transactions)
+
+if __name__ == '__main__':
+    unittest.main()
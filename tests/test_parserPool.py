@@ -0,0 +1,94 @@
+import unittest
+import threading
+from unittest.mock import patch
+from aiParser import LocalRuleParser
+from parserPool import ParserPool
+from metrics import PARSER_FALLBACK
+
+class TestParserPool(unittest.TestCase):
+    """測試多行程解析器"""
+
+    @classmethod
+    def setUpClass(cls):
+        """啟動工作行程，所有測試共用"""
+        cls.pool = ParserPool(workers=2, max_batch=8)
+        cls.local = LocalRuleParser()
+
+    @classmethod
+    def tearDownClass(cls):
+        """關閉工作行程"""
+        cls.pool.close()
+
+    def test_parse_transaction(self):
+        """測試結果與本地規則解析器相同"""
+        for text in ("咖啡 5 元", "薪水 50000 元", "計程車 100 元"):
+            self.assertEqual(self.pool.parse_transaction(text), self.local.parse_transaction(text))
+
+    def test_parse_many_keeps_order(self):
+        """測試批次解析保持輸入順序"""
+        texts = [f"晚餐 {i + 1} 元" for i in range(50)]
+
+        results = self.pool.parse_many(texts)
+
+        self.assertEqual([result["amount"] for result in results], [float(i + 1) for i in range(50)])
+
+    def test_parse_transactions(self):
+        """測試多筆交易的文本在同一批中解析"""
+        results = self.pool.parse_transactions("早餐 60 午餐 120 捷運 30")
+
+        self.assertEqual(results, self.local.parse_transactions("早餐 60 午餐 120 捷運 30"))
+
+    def test_concurrent_requests(self):
+        """測試多個執行緒同時解析"""
+        results = {}
+
+        def worker(index):
+            results[index] = self.pool.parse_transaction(f"午餐 {index + 1} 元")["amount"]
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {i: float(i + 1) for i in range(20)})
+
+    def test_worker_failure_falls_back(self):
+        """測試工作行程失敗時在目前的行程中解析"""
+        fallbacks = PARSER_FALLBACK.labels(provider="pool").value()
+
+        with patch('parserPool.ProcessPoolExecutor.submit', side_effect=RuntimeError("broken")):
+            result = self.pool.parse_transaction("咖啡 5 元")
+
+        self.assertEqual(result, self.local.parse_transaction("咖啡 5 元"))
+        self.assertEqual(PARSER_FALLBACK.labels(provider="pool").value(), fallbacks + 1)
+
+    def test_closed_pool_parses_in_process(self):
+        """測試關閉後仍可在目前的行程中解析"""
+        pool = ParserPool(workers=1)
+        pool.close()
+
+        self.assertEqual(pool.parse_transaction("咖啡 5 元"), self.local.parse_transaction("咖啡 5 元"))
+
+    def test_close_during_requests(self):
+        """測試關閉時同時進行的請求都會完成，不會永遠等待"""
+        pool = ParserPool(workers=1)
+        results = []
+
+        def worker():
+            for _ in range(20):
+                results.append(pool.parse_transaction("咖啡 5 元")["amount"])
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        pool.close()
+        pool.close()
+        for thread in threads:
+            thread.join(30)
+
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertEqual(results, [5.0] * 80)
+
+if __name__ == '__main__':
+    unittest.main()
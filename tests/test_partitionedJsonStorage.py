@@ -0,0 +1,236 @@
+import unittest
+import datetime
+import json
+import os
+import tempfile
+from unittest.mock import patch
+from partitionedJsonStorage import PartitionedJsonStorage
+from dataStorage import create_storage
+
+class TestPartitionedJsonStorage(unittest.TestCase):
+    """測試依月份分割的 JSON 存儲"""
+    
+    def setUp(self):
+        """設置測試環境"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = os.path.join(self.temp_dir.name, "parts")
+        self.storage = PartitionedJsonStorage(self.data_dir)
+    
+    def tearDown(self):
+        """清理測試環境"""
+        self.temp_dir.cleanup()
+    
+    def _save_on(self, date, transaction):
+        """以指定日期保存交易"""
+        now = datetime.datetime.combine(date, datetime.time(12))
+        strptime = datetime.datetime.strptime
+        with patch('partitionedJsonStorage.datetime.datetime') as mock_datetime:
+            mock_datetime.now.return_value = now
+            mock_datetime.strptime = strptime
+            return self.storage.save_transaction(transaction)
+    
+    def test_save_writes_month_partition(self):
+        """測試交易寫入當月分割並更新預先計算的總額"""
+        self.assertTrue(self._save_on(datetime.date(2025, 2, 10), {"type": "expense", "item": "咖啡", "category": "food", "amount": 5.0}))
+        self.assertTrue(self._save_on(datetime.date(2025, 3, 1), {"type": "income", "item": "薪水", "category": "income", "amount": 30000.0}))
+        self.assertTrue(self._save_on(datetime.date(2025, 3, 2), {"type": "expense", "item": "午餐", "category": "food", "amount": 120.0}))
+        
+        self.assertTrue(os.path.exists(os.path.join(self.data_dir, "2025-02.json")))
+        self.assertTrue(os.path.exists(os.path.join(self.data_dir, "2025-03.json")))
+        
+        with open(os.path.join(self.data_dir, "manifest.json"), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest["partitions"]["2025-02"], {"count": 1, "income": 0, "expense": 5.0})
+        self.assertEqual(manifest["partitions"]["2025-03"], {"count": 2, "income": 30000.0, "expense": 120.0})
+    
+    def test_save_transactions(self):
+        """測試一次保存多筆交易，分割寫入一次，manifest 在寫入分割前後各寫入一次"""
+        with patch.object(self.storage, '_write_json', wraps=self.storage._write_json) as mock_write:
+            self.assertTrue(self.storage.save_transactions([
+                {"type": "expense", "item": "早餐", "category": "food", "amount": 60.0},
+                {"type": "income", "item": "紅包", "category": "income", "amount": 600.0},
+            ]))
+        
+        paths = [call.args[0] for call in mock_write.call_args_list]
+        self.assertEqual(paths.count(self.storage.manifest_path), 2)
+        self.assertEqual(len(paths), 3)
+        self.assertEqual([t["item"] for t in self.storage.get_recent_transactions(5)], ["紅包", "早餐"])
+        self.assertEqual(self.storage.get_monthly_summary(), {"income": 600.0, "expense": 60.0, "savings": 540.0})
+    
+    def test_save_coerces_amount_and_rejects_invalid(self):
+        """測試字串金額轉為數字，無效的金額不寫入任何檔案"""
+        self.assertTrue(self.storage.save_transaction({"type": "expense", "item": "早餐", "category": "food", "amount": "60"}))
+        self.assertEqual(self.storage.get_monthly_summary()["expense"], 60.0)
+        
+        with patch.object(self.storage, '_write_json') as mock_write:
+            self.assertFalse(self.storage.save_transactions([
+                {"type": "expense", "item": "午餐", "category": "food", "amount": 120.0},
+                {"type": "expense", "item": "晚餐", "category": "food", "amount": "abc"},
+            ]))
+            self.assertFalse(self.storage.save_transaction({"type": "transfer", "item": "轉帳", "category": "other", "amount": 1.0}))
+        mock_write.assert_not_called()
+        self.assertEqual([t["item"] for t in self.storage.get_transactions()], ["早餐"])
+    
+    def test_interrupted_save_is_repaired(self):
+        """測試寫入分割後中斷時，下次開啟存儲從分割檔案修復總額"""
+        self.storage.save_transactions([{"type": "expense", "item": "早餐", "category": "food", "amount": 60.0, "date": "2025-01-05"}])
+        
+        write_json = self.storage._write_json
+        def crash_on_final_manifest(path, data):
+            if path == self.storage.manifest_path and 'pending' not in data:
+                raise KeyboardInterrupt
+            write_json(path, data)
+        with patch.object(self.storage, '_write_json', side_effect=crash_on_final_manifest):
+            with self.assertRaises(KeyboardInterrupt):
+                self.storage.save_transactions([
+                    {"type": "income", "item": "獎金", "category": "income", "amount": 500.0, "date": "2025-01-06"},
+                    {"type": "expense", "item": "午餐", "category": "food", "amount": 120.0, "date": "2025-02-01"},
+                ])
+        
+        reopened = PartitionedJsonStorage(self.data_dir)
+        self.assertNotIn("pending", reopened._manifest)
+        self.assertEqual(reopened._manifest["partitions"], {
+            "2025-01": {"count": 2, "income": 500.0, "expense": 60.0},
+            "2025-02": {"count": 1, "income": 0, "expense": 120.0},
+        })
+    
+    def test_save_transactions_keeps_past_dates(self):
+        """測試補記過去日期的交易寫入所屬月份的分割"""
+        self.assertTrue(self.storage.save_transactions([
+            {"type": "expense", "item": "房租", "category": "housing", "amount": 8000.0, "date": "2025-01-05"},
+            {"type": "expense", "item": "咖啡", "category": "food", "amount": 5.0},
+        ]))
+        
+        self.assertEqual([t["item"] for t in self.storage.get_transactions("2025-01-01", "2025-01-31")], ["房租"])
+        partition = self.storage._manifest["partitions"]["2025-01"]
+        self.assertEqual((partition["count"], partition["expense"]), (1, 8000.0))
+        # 補記的交易不計入本月總覽
+        self.assertEqual(self.storage.get_monthly_summary(), {"income": 0, "expense": 5.0, "savings": -5.0})
+    
+    def test_save_transactions_deduplicates_idempotency_keys(self):
+        """測試重送帶有相同冪等鍵的交易不會重複保存，也不會再寫入檔案"""
+        transaction = {"type": "expense", "item": "咖啡", "category": "food", "amount": 5.0, "idempotency_key": "k1"}
+        self.assertTrue(self.storage.save_transactions([dict(transaction)]))
+        
+        reopened = PartitionedJsonStorage(self.data_dir)
+        with patch.object(reopened, '_write_json') as mock_write:
+            self.assertTrue(reopened.save_transactions([dict(transaction)]))
+        mock_write.assert_not_called()
+        
+        self.assertTrue(reopened.save_transactions([dict(transaction, idempotency_key="k2")]))
+        self.assertEqual([t["idempotency_key"] for t in reopened.get_transactions()], ["k2", "k1"])
+        self.assertEqual(reopened.get_monthly_summary()["expense"], 10.0)
+    
+    def test_budget_alerts(self):
+        """測試設定預算後保存支出返回門檻提醒，累計支出保存在 manifest"""
+        self.storage.save_transactions([{"type": "expense", "item": "晚餐", "category": "food", "amount": 700.0}])
+        self.storage.set_budget("food", 1000.0)
+        
+        alerts = []
+        self.assertTrue(self.storage.save_transaction({"type": "expense", "item": "午餐", "category": "food", "amount": 150.0}, alerts))
+        self.assertEqual([(alert["threshold"], alert["spent"]) for alert in alerts], [(0.8, 850.0)])
+        
+        reopened = PartitionedJsonStorage(self.data_dir)
+        with patch.object(reopened, '_read_partition') as mock_read:
+            self.assertEqual(reopened.get_budget_status(), [
+                {"category": "food", "limit": 1000.0, "spent": 850.0, "remaining": 150.0, "ratio": 0.85}
+            ])
+        mock_read.assert_not_called()
+        
+        reopened.set_budget("food", 0)
+        self.assertEqual(reopened.get_budget_status(), [])
+    
+    def test_update_gamification_rebuild(self):
+        """測試補記的交易計入連續記錄，重新計算時使用所有交易的日期"""
+        yesterday = (datetime.date.today() - datetime.timedelta(days=1)).strftime('%Y-%m-%d')
+        self.storage.save_transactions([
+            {"type": "expense", "item": "早餐", "category": "food", "amount": 60.0, "date": yesterday},
+            {"type": "expense", "item": "午餐", "category": "food", "amount": 120.0},
+        ])
+        self.assertEqual(self.storage.get_data()["user"]["streak"], 2)
+        
+        self.storage._manifest["user"] = {"points": 0, "streak": 0, "last_record_date": None}
+        user = self.storage.update_gamification(rebuild=True)
+        
+        self.assertEqual((user["points"], user["streak"], user["active_days"]), (20, 2, 2))
+    
+    def test_monthly_summary_reads_no_partitions(self):
+        """測試月度總覽使用預先計算的總額，不開啟分割檔案"""
+        today = datetime.date.today()
+        self._save_on(today, {"type": "expense", "item": "咖啡", "category": "food", "amount": 5.0})
+        self._save_on(today, {"type": "income", "item": "薪水", "category": "income", "amount": 30000.0})
+        
+        with patch.object(self.storage, '_read_json') as mock_read:
+            summary = self.storage.get_monthly_summary()
+        
+        mock_read.assert_not_called()
+        self.assertEqual(summary, {"income": 30000.0, "expense": 5.0, "savings": 29995.0})
+    
+    def test_get_transactions_prunes_partitions(self):
+        """測試日期篩選只開啟範圍內的分割"""
+        for day in (datetime.date(2025, 1, 5), datetime.date(2025, 2, 5), datetime.date(2025, 2, 20), datetime.date(2025, 3, 5)):
+            self._save_on(day, {"type": "expense", "item": day.isoformat(), "category": "other", "amount": 1.0})
+        
+        with patch.object(self.storage, '_read_json', wraps=self.storage._read_json) as mock_read:
+            transactions = self.storage.get_transactions("2025-02-10", "2025-02-28")
+        
+        self.assertEqual([t["item"] for t in transactions], ["2025-02-20"])
+        opened = [call.args[0] for call in mock_read.call_args_list]
+        self.assertEqual(opened, [os.path.join(self.data_dir, "2025-02.json")])
+        
+        # 不限範圍時新到舊排列
+        items = [t["item"] for t in self.storage.get_transactions()]
+        self.assertEqual(items, ["2025-03-05", "2025-02-20", "2025-02-05", "2025-01-05"])
+    
+    def test_iter_transactions(self):
+        """測試逐筆走訪交易時由舊到新逐一開啟分割"""
+        for day in (datetime.date(2025, 1, 5), datetime.date(2025, 2, 5), datetime.date(2025, 2, 20), datetime.date(2025, 3, 5)):
+            self._save_on(day, {"type": "expense", "item": day.isoformat(), "category": "other", "amount": 1.0})
+        
+        with patch.object(self.storage, '_read_json', wraps=self.storage._read_json) as mock_read:
+            iterator = self.storage.iter_transactions("2025-02-01")
+            self.assertEqual(next(iterator)["item"], "2025-02-05")
+            self.assertEqual(mock_read.call_count, 1)
+            self.assertEqual([t["item"] for t in iterator], ["2025-02-20", "2025-03-05"])
+        self.assertEqual(mock_read.call_count, 2)
+        
+        self.assertEqual([t["item"] for t in self.storage.iter_transactions(end_date="2025-02-10")], ["2025-01-05", "2025-02-05"])
+    
+    def test_iter_transactions_sorted_by_date(self):
+        """測試補記的交易依日期排列，而不是依保存順序"""
+        self.storage.save_transactions([
+            {"type": "expense", "item": "a", "category": "other", "amount": 1.0, "date": "2025-01-20"},
+            {"type": "expense", "item": "b", "category": "other", "amount": 1.0, "date": "2025-01-05"},
+            {"type": "expense", "item": "c", "category": "other", "amount": 1.0, "date": "2025-01-20"},
+        ])
+        self.storage.save_transactions([{"type": "expense", "item": "d", "category": "other", "amount": 1.0, "date": "2025-01-01"}])
+        
+        self.assertEqual([t["item"] for t in self.storage.iter_transactions()], ["d", "b", "a", "c"])
+    
+    def test_get_recent_transactions(self):
+        """測試最新交易只讀取需要的分割"""
+        for day in (datetime.date(2025, 1, 5), datetime.date(2025, 2, 5), datetime.date(2025, 2, 6)):
+            self._save_on(day, {"type": "expense", "item": day.isoformat(), "category": "other", "amount": 1.0})
+        
+        with patch.object(self.storage, '_read_json', wraps=self.storage._read_json) as mock_read:
+            recent = self.storage.get_recent_transactions(2)
+        
+        self.assertEqual([t["item"] for t in recent], ["2025-02-06", "2025-02-05"])
+        self.assertEqual(mock_read.call_count, 1)
+    
+    def test_get_data_and_persistence(self):
+        """測試重新開啟後數據仍然存在"""
+        self._save_on(datetime.date.today(), {"type": "expense", "item": "咖啡", "category": "food", "amount": 5.0})
+        
+        data = PartitionedJsonStorage(self.data_dir).get_data()
+        self.assertEqual(len(data["transactions"]), 1)
+        self.assertEqual(data["user"]["points"], 10)
+        self.assertEqual(data["summary"]["expense"], 5.0)
+    
+    def test_create_storage(self):
+        """測試以工廠函數創建分割存儲"""
+        storage = create_storage("partitioned", os.path.join(self.temp_dir.name, "other"))
+        self.assertIsInstance(storage, PartitionedJsonStorage)
+
+if __name__ == '__main__':
+    unittest.main()
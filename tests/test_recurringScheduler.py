@@ -0,0 +1,130 @@
+import unittest
+import datetime
+import os
+import tempfile
+import threading
+from unittest.mock import patch, MagicMock
+from recurringScheduler import RecurringScheduler, due_transactions, new_rule, next_occurrence
+from partitionedJsonStorage import PartitionedJsonStorage
+from localJsonStorage import LocalJsonStorage
+
+RENT = {"type": "expense", "item": "房租", "category": "housing", "amount": "15000"}
+
+class TestRecurringScheduler(unittest.TestCase):
+    """測試定期交易規則和排程器"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """清理測試環境"""
+        self.temp_dir.cleanup()
+
+    def test_monthly_rule_uses_month_end(self):
+        """測試每月 31 日的規則在較短的月份使用月底"""
+        rule = new_rule("r1", RENT, "monthly", "2024-01-31")
+        date = datetime.date(2024, 1, 31)
+        dates = []
+        for _ in range(3):
+            date = next_occurrence(rule, date)
+            dates.append(date)
+
+        self.assertEqual(dates, [datetime.date(2024, 2, 29), datetime.date(2024, 3, 31), datetime.date(2024, 4, 30)])
+        self.assertEqual(next_occurrence(new_rule("r2", RENT, "weekly", "2024-12-30"), datetime.date(2024, 12, 30)),
+                         datetime.date(2025, 1, 6))
+
+    def test_due_transactions_catches_up(self):
+        """測試補上錯過的每一期，交易依日期排列且不修改規則"""
+        rules = [
+            new_rule("rent", RENT, "monthly", "2025-01-05"),
+            new_rule("gym", dict(RENT, item="健身房", amount=50), "weekly", "2025-03-01"),
+        ]
+
+        transactions, next_dates = due_transactions(rules, datetime.date(2025, 3, 10))
+
+        self.assertEqual([(t["item"], t["date"]) for t in transactions], [
+            ("房租", "2025-01-05"), ("房租", "2025-02-05"), ("健身房", "2025-03-01"),
+            ("房租", "2025-03-05"), ("健身房", "2025-03-08"),
+        ])
+        self.assertEqual(transactions[0]["amount"], 15000.0)
+        self.assertEqual(transactions[0]["idempotency_key"], "recurring:rent:2025-01-05")
+        self.assertEqual(next_dates, {"rent": "2025-04-05", "gym": "2025-03-15"})
+        self.assertEqual(rules[0]["next_date"], "2025-01-05")
+
+    def test_materialize_in_one_write(self):
+        """測試停機後在一次 save_transactions 中補上全部到期的交易，重複執行不會重複保存"""
+        storage = PartitionedJsonStorage(os.path.join(self.temp_dir.name, "parts"))
+        storage.add_recurring_rule(new_rule("rent", RENT, "monthly", "2025-01-05"))
+
+        with patch.object(storage, 'save_transactions', wraps=storage.save_transactions) as mock_save:
+            self.assertEqual(storage.materialize_recurring(datetime.date(2025, 4, 1)), 3)
+            self.assertEqual(storage.materialize_recurring(datetime.date(2025, 4, 1)), 0)
+        mock_save.assert_called_once()
+
+        reopened = PartitionedJsonStorage(os.path.join(self.temp_dir.name, "parts"))
+        self.assertEqual(reopened.get_recurring_rules()[0]["next_date"], "2025-04-05")
+        self.assertEqual([t["date"] for t in reopened.get_transactions()], ["2025-03-05", "2025-02-05", "2025-01-05"])
+
+        self.assertTrue(reopened.remove_recurring_rule("rent"))
+        self.assertFalse(reopened.remove_recurring_rule("rent"))
+        self.assertEqual(reopened.materialize_recurring(datetime.date(2025, 6, 1)), 0)
+
+    def test_materialize_after_interrupted_advance(self):
+        """測試保存後推進規則前中斷時，重新執行不會重複保存超過冪等鍵索引保留期間的交易"""
+        storage = PartitionedJsonStorage(os.path.join(self.temp_dir.name, "parts"))
+        storage.add_recurring_rule(new_rule("rent", RENT, "monthly", "2025-01-05"))
+
+        with patch.object(storage, '_write_metadata', side_effect=IOError("中斷")):
+            with self.assertRaises(IOError):
+                storage.materialize_recurring(datetime.date(2025, 4, 1))
+
+        reopened = PartitionedJsonStorage(os.path.join(self.temp_dir.name, "parts"))
+        self.assertEqual(reopened.get_recurring_rules()[0]["next_date"], "2025-01-05")
+        self.assertEqual(reopened.materialize_recurring(datetime.date(2025, 5, 1)), 1)
+
+        self.assertEqual([t["date"] for t in reopened.get_transactions()], ["2025-04-05", "2025-03-05", "2025-02-05", "2025-01-05"])
+        self.assertEqual(reopened.get_recurring_rules()[0]["next_date"], "2025-05-05")
+
+    def test_materialize_does_not_count_as_activity(self):
+        """測試定期交易不計入點數和連續記錄天數"""
+        storage = PartitionedJsonStorage(os.path.join(self.temp_dir.name, "parts"))
+        storage.add_recurring_rule(new_rule("coffee", RENT, "daily", "2025-01-01"))
+        user = storage.get_data()["user"]
+
+        self.assertEqual(storage.materialize_recurring(datetime.date(2025, 3, 31)), 90)
+
+        self.assertEqual(storage.get_data()["user"], user)
+        storage.update_gamification(rebuild=True)
+        self.assertEqual(storage.get_data()["user"]["points"], 0)
+
+    def test_materialize_local_storage(self):
+        """測試本地 JSON 存儲在保存交易後推進規則"""
+        storage = LocalJsonStorage(os.path.join(self.temp_dir.name, "transactions.json"))
+        storage.add_recurring_rule(new_rule("salary", dict(RENT, type="income", item="薪水", category="income"), "monthly", "2025-01-10"))
+
+        self.assertEqual(storage.materialize_recurring(datetime.date(2025, 2, 10)), 2)
+
+        self.assertEqual(storage.get_recurring_rules()[0]["next_date"], "2025-03-10")
+        self.assertEqual(len(storage.get_transactions()), 2)
+
+    def test_scheduler_runs_in_background(self):
+        """測試排程器在背景執行緒中啟動時檢查一次，被喚醒時再檢查"""
+        storage = MagicMock()
+        checked = threading.Semaphore(0)
+        storage.materialize_recurring.side_effect = lambda today: checked.release() or 0
+        scheduler = RecurringScheduler(storage, interval=60)
+
+        scheduler.start()
+        try:
+            self.assertTrue(checked.acquire(timeout=5))
+            scheduler.wake()
+            self.assertTrue(checked.acquire(timeout=5))
+        finally:
+            scheduler.stop()
+
+        self.assertFalse(scheduler.running)
+        storage.materialize_recurring.assert_called_with(datetime.date.today())
+
+if __name__ == '__main__':
+    unittest.main()
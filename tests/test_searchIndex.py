@@ -0,0 +1,71 @@
+import unittest
+import os
+import shutil
+import tempfile
+from searchIndex import NgramSearchIndex, normalize_text, ngrams
+from localJsonStorage import LocalJsonStorage
+
+class TestNgramSearchIndex(unittest.TestCase):
+    """測試交易項目搜尋索引"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.index = NgramSearchIndex()
+        self.index.add_transactions([
+            {"type": "expense", "item": "星巴克咖啡", "category": "food", "amount": 150, "date": "2025-03-01"},
+            {"type": "expense", "item": "午餐便當", "category": "food", "amount": 90, "date": "2025-03-02"},
+            {"type": "expense", "item": "咖啡豆", "category": "food", "amount": 400, "date": "2025-03-03"},
+            {"type": "expense", "item": "計程車", "category": "transport", "amount": 250, "date": "2025-03-04"},
+        ])
+
+    def test_normalize_and_ngrams(self):
+        """測試文字正規化和 n-gram"""
+        self.assertEqual(normalize_text("ＡＢＣ 咖啡"), "abc咖啡")
+        self.assertEqual(ngrams("咖啡豆"), {"咖", "啡", "豆", "咖啡", "啡豆"})
+
+    def test_search_ranks_matches(self):
+        """測試搜尋結果依相關度和新舊排列"""
+        result = self.index.search("咖啡")
+
+        self.assertEqual(result["total"], 2)
+        # 兩筆都包含完整查詢字串，較新的排在前面
+        self.assertEqual([t["item"] for t in result["results"]], ["咖啡豆", "星巴克咖啡"])
+
+        # 完整包含查詢字串的排在部分命中之前，即使部分命中的交易較新
+        result = self.index.search("克咖啡")
+        self.assertEqual([t["item"] for t in result["results"]], ["星巴克咖啡", "咖啡豆"])
+
+    def test_search_no_match(self):
+        """測試沒有符合的結果"""
+        self.assertEqual(self.index.search("電影票"), {"total": 0, "results": []})
+        self.assertEqual(self.index.search("   "), {"total": 0, "results": []})
+
+    def test_pagination(self):
+        """測試分頁"""
+        first = self.index.search("咖啡", page=1, page_size=1)
+        second = self.index.search("咖啡", page=2, page_size=1)
+
+        self.assertEqual(first["total"], 2)
+        self.assertEqual([t["item"] for t in first["results"]], ["咖啡豆"])
+        self.assertEqual([t["item"] for t in second["results"]], ["星巴克咖啡"])
+        self.assertEqual(self.index.search("咖啡", page=3, page_size=1)["results"], [])
+
+    def test_incremental_updates_from_storage(self):
+        """測試以存儲的保存監聽器增量更新索引"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            storage = LocalJsonStorage(os.path.join(temp_dir, "transactions.json"))
+            storage.save_transaction({"type": "expense", "item": "咖啡", "category": "food", "amount": 5.0})
+
+            index = NgramSearchIndex()
+            storage.add_save_listener(index.add_transactions, replay=True)
+            self.assertEqual(len(index), 1)
+
+            storage.save_transaction({"type": "expense", "item": "冰咖啡", "category": "food", "amount": 6.0})
+            self.assertEqual(len(index), 2)
+            self.assertEqual(index.search("冰咖啡")["results"][0]["item"], "冰咖啡")
+        finally:
+            shutil.rmtree(temp_dir)
+
+if __name__ == '__main__':
+    unittest.main()
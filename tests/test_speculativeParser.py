@@ -0,0 +1,99 @@
+import unittest
+import threading
+import time
+from unittest.mock import MagicMock
+from speculativeParser import SpeculativeParseCache, normalize_utterance
+from metrics import CACHE_REQUESTS
+
+class TestSpeculativeParseCache(unittest.TestCase):
+    """測試推測解析快取"""
+
+    def setUp(self):
+        """設置測試環境"""
+        self.parse = MagicMock(side_effect=lambda text: [{"type": "expense", "item": text, "category": "food", "amount": 5.0}])
+        self.cache = SpeculativeParseCache(self.parse)
+
+    def test_normalize_utterance(self):
+        """測試合併空白並去除句尾標點"""
+        self.assertEqual(normalize_utterance("  咖啡   5 元。"), "咖啡 5 元")
+        self.assertEqual(normalize_utterance(None), "")
+
+    def test_final_text_reuses_speculative_result(self):
+        """測試最終文本與中間結果相同時不再解析"""
+        hits = CACHE_REQUESTS.labels(cache="speculative_parse", result="hit").value()
+
+        self.assertTrue(self.cache.speculate("咖啡 5 元"))
+        result = self.cache.get("咖啡 5 元。")
+
+        self.assertEqual(result[0]["item"], "咖啡 5 元")
+        self.parse.assert_called_once_with("咖啡 5 元")
+        self.assertEqual(CACHE_REQUESTS.labels(cache="speculative_parse", result="hit").value(), hits + 1)
+
+        # 返回的是複本，修改不影響快取
+        result[0]["amount"] = 0
+        self.assertEqual(self.cache.get("咖啡 5 元")[0]["amount"], 5.0)
+
+    def test_waits_for_in_flight_parse(self):
+        """測試最終文本到達時等待進行中的推測解析，而不是重新解析"""
+        release = threading.Event()
+        def slow_parse(text):
+            release.wait(5)
+            return [{"item": text}]
+        self.parse.side_effect = slow_parse
+
+        self.cache.speculate("午餐 120")
+        threading.Timer(0.05, release.set).start()
+
+        self.assertEqual(self.cache.get("午餐 120"), [{"item": "午餐 120"}])
+        self.parse.assert_called_once()
+
+    def test_miss_parses_directly(self):
+        """測試沒有推測結果時直接解析"""
+        self.cache.speculate("咖啡")
+        self.cache.get("咖啡 5 元")
+
+        self.assertEqual(self.parse.call_count, 2)
+
+    def test_peek_does_not_parse(self):
+        """測試 peek 只返回推測解析的結果，沒有結果時不解析"""
+        self.assertIsNone(self.cache.peek("咖啡 5 元"))
+        self.parse.assert_not_called()
+
+        self.cache.speculate("咖啡 5 元")
+        self.assertEqual(self.cache.peek("咖啡 5 元。")[0]["item"], "咖啡 5 元")
+        self.parse.assert_called_once()
+
+    def test_failed_speculation_falls_back(self):
+        """測試推測解析失敗時重新解析"""
+        self.parse.side_effect = [Exception("解析錯誤"), [{"item": "咖啡"}]]
+
+        self.cache.speculate("咖啡")
+        self.assertEqual(self.cache.get("咖啡"), [{"item": "咖啡"}])
+
+    def test_ttl_and_clear(self):
+        """測試過期和清除的結果不再使用"""
+        self.cache.ttl = 0.01
+        self.cache.speculate("咖啡")
+        time.sleep(0.05)
+        self.cache.get("咖啡")
+        self.assertEqual(self.parse.call_count, 2)
+
+        self.cache.ttl = 30.0
+        self.cache.speculate("茶")
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+    def test_pending_limit(self):
+        """測試進行中的推測解析達到上限時不再接受新的推測"""
+        release = threading.Event()
+        self.parse.side_effect = lambda text: release.wait(5) and []
+        try:
+            accepted = [self.cache.speculate(f"項目 {i}") for i in range(self.cache.max_pending + 1)]
+        finally:
+            release.set()
+
+        self.assertEqual(accepted.count(False), 1)
+        self.assertFalse(self.cache.speculate(""))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import json
+import os
+import tempfile
+from unittest.mock import patch
+from tracing import Tracer, span, traced, current_span
+
+class TestTracing(unittest.TestCase):
+    """測試追蹤"""
+    
+    def setUp(self):
+        """設置測試環境"""
+        self.tracer = Tracer()
+    
+    def test_unsampled_span_is_noop(self):
+        """測試未取樣時子 span 不做任何事"""
+        self.assertIsNone(self.tracer.start_trace("root", sample_rate=0.0))
+        
+        with span("child") as child:
+            child.set_attribute("key", "value")
+        self.assertIsNone(current_span())
+    
+    @patch('tracing.random.random')
+    def test_sampling(self, mock_random):
+        """測試依取樣率決定是否追蹤"""
+        mock_random.return_value = 0.3
+        self.assertIsNone(self.tracer.start_trace("root", sample_rate=0.2))
+        
+        root = self.tracer.start_trace("root", sample_rate=0.5)
+        self.assertIsNotNone(root)
+        self.tracer.finish_trace(root)
+    
+    def test_child_spans(self):
+        """測試子 span 的父子關係"""
+        @traced("inner")
+        def inner():
+            return current_span().name
+        
+        root = self.tracer.start_trace("root", force=True)
+        with span("outer", size=3) as outer:
+            self.assertEqual(inner(), "inner")
+        trace = self.tracer.finish_trace(root)
+        
+        self.assertIsNone(current_span())
+        names = [s.name for s in trace.spans]
+        self.assertEqual(names, ["inner", "outer", "root"])
+        
+        spans = {s.name: s for s in trace.spans}
+        self.assertIsNone(spans["root"].parent_id)
+        self.assertEqual(spans["outer"].parent_id, spans["root"].span_id)
+        self.assertEqual(spans["inner"].parent_id, outer.span_id)
+        self.assertEqual(spans["outer"].attributes, {"size": 3})
+        self.assertIn("root;dur=", trace.server_timing())
+    
+    def test_span_records_error(self):
+        """測試 span 記錄例外"""
+        root = self.tracer.start_trace("root", force=True)
+        with self.assertRaises(ValueError):
+            with span("failing"):
+                raise ValueError("壞掉了")
+        trace = self.tracer.finish_trace(root)
+        
+        self.assertEqual(trace.spans[0].attributes["error"], "ValueError: 壞掉了")
+    
+    def test_export_json_lines(self):
+        """測試以 JSON lines 輸出追蹤"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            export_path = os.path.join(temp_dir, "traces.jsonl")
+            for _ in range(2):
+                root = self.tracer.start_trace("root", force=True)
+                with span("child"):
+                    pass
+                self.tracer.finish_trace(root, export_path)
+            
+            with open(export_path, 'r', encoding='utf-8') as f:
+                lines = [json.loads(line) for line in f]
+        
+        self.assertEqual(len(lines), 2)
+        self.assertNotEqual(lines[0]["trace_id"], lines[1]["trace_id"])
+        self.assertEqual([s["name"] for s in lines[0]["spans"]], ["child", "root"])
+        self.assertIsInstance(lines[0]["spans"][0]["duration_ms"], float)
+
+if __name__ == '__main__':
+    unittest.main()
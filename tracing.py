@@ -0,0 +1,188 @@
+import contextvars
+import functools
+import json
+import random
+import threading
+import time
+import uuid
+
+# 目前執行中的 span，未取樣的請求為 None
+_current_span = contextvars.ContextVar('fintrack_current_span', default=None)
+
+class Span:
+    """
+    追蹤中的一個區段
+    以 with 區塊使用，結束時記錄耗時並加入所屬的追蹤
+    """
+
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'attributes',
+                 'start', 'duration', '_perf_start', '_token')
+
+    def __init__(self, trace, name, parent_id=None, attributes=None):
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = dict(attributes) if attributes else {}
+        self.start = None
+        self.duration = None
+
+    def set_attribute(self, key, value):
+        """設置 span 屬性"""
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self.start = time.time()
+        self._perf_start = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.duration = time.perf_counter() - self._perf_start
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attributes["error"] = f"{exc_type.__name__}: {exc_value}"
+        self.trace.spans.append(self)
+        return False
+
+    def to_dict(self):
+        """轉換為可序列化的字典"""
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "attributes": self.attributes,
+        }
+
+class Trace:
+    """一次請求的追蹤，包含所有已結束的 span"""
+
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex
+        self.spans = []
+
+    def to_dict(self):
+        """轉換為可序列化的字典"""
+        return {"trace_id": self.trace_id, "spans": [span.to_dict() for span in self.spans]}
+
+    def server_timing(self):
+        """
+        以 Server-Timing 標頭格式輸出各 span 的耗時
+
+        Returns:
+            str: Server-Timing 標頭值
+        """
+        entries = []
+        for span in self.spans:
+            name = span.name.replace(' ', '_').replace(',', '_').replace(';', '_')
+            entries.append(f"{name};dur={span.duration * 1000:.3f}")
+        return ", ".join(entries)
+
+class _NoopSpan:
+    """未取樣時使用的空 span，不做任何事"""
+
+    def set_attribute(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_NOOP_SPAN = _NoopSpan()
+
+class Tracer:
+    """
+    追蹤器
+    依取樣率決定是否追蹤請求，並將完成的追蹤以 JSON lines 格式輸出到檔案
+    """
+
+    def __init__(self):
+        self._export_lock = threading.Lock()
+
+    def start_trace(self, name, sample_rate=0.0, force=False):
+        """
+        開始一次追蹤
+
+        Args:
+            name (str): 根 span 名稱
+            sample_rate (float): 取樣率，0 到 1 之間
+            force (bool): 是否強制取樣
+
+        Returns:
+            Span: 已開始的根 span，未取樣時返回 None
+        """
+        if not force and (sample_rate <= 0 or random.random() >= sample_rate):
+            return None
+        root = Span(Trace(), name)
+        root.__enter__()
+        return root
+
+    def finish_trace(self, root, export_path=None):
+        """
+        結束追蹤並輸出
+
+        Args:
+            root (Span): start_trace 返回的根 span
+            export_path (str): JSON lines 輸出檔案路徑，為 None 時不輸出
+
+        Returns:
+            Trace: 完成的追蹤
+        """
+        root.__exit__(None, None, None)
+        if export_path:
+            self.export(root.trace, export_path)
+        return root.trace
+
+    def export(self, trace, export_path):
+        """將追蹤以一行 JSON 附加到檔案"""
+        line = json.dumps(trace.to_dict(), ensure_ascii=False)
+        try:
+            with self._export_lock:
+                with open(export_path, 'a', encoding='utf-8') as f:
+                    f.write(line + "\n")
+        except Exception as e:
+            print(f"輸出追蹤錯誤: {str(e)}")
+
+def span(name, **attributes):
+    """
+    在目前的追蹤中建立子 span
+
+    Args:
+        name (str): span 名稱
+        **attributes: span 屬性
+
+    Returns:
+        Span: 子 span；目前的請求未取樣時返回不做任何事的空 span
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return _NOOP_SPAN
+    return Span(parent.trace, name, parent.span_id, attributes)
+
+def traced(name):
+    """
+    將函數執行包在子 span 中的裝飾器
+
+    Args:
+        name (str): span 名稱
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def current_span():
+    """獲取目前執行中的 span，未取樣時返回 None"""
+    return _current_span.get()
+
+# 預設追蹤器
+tracer = Tracer()